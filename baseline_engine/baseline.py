@@ -3,8 +3,9 @@ from __future__ import annotations
 from collections import defaultdict
 from datetime import datetime, timezone
 from statistics import median
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Tuple, Union
 
+from baseline_engine.batch import EventBatch
 from baseline_engine.config import BaselineConfig
 from baseline_engine.models import BaselineKey, BaselineStats, Event
 
@@ -57,12 +58,76 @@ def compute_median_and_mad(values: List[float], *, min_mad: float) -> Tuple[floa
     return m, mad
 
 
-def train_baselines(events: Iterable[Event], config: BaselineConfig) -> List[BaselineStats]:
+def group_batch_rows(batch: EventBatch, config: BaselineConfig) -> Dict[str, List[int]]:
+    """
+    Columnar counterpart of group_events(): row indexes grouped by BaselineKey string.
+
+    Rows are grouped by integer codes first and only turned into key strings once per
+    group. Distinct (entity, metric) pairs that happen to render to the same key string
+    are merged, exactly as group_events() would.
+    """
+    by_codes: Dict[Tuple[int, int, int], List[int]] = defaultdict(list)
+    for i, codes in enumerate(batch.key_codes(config)):
+        by_codes[codes].append(i)
+
+    groups: Dict[str, List[int]] = {}
+    for rows in by_codes.values():
+        key_str = batch.key(rows[0], config).as_str()
+        existing = groups.get(key_str)
+        if existing is None:
+            groups[key_str] = rows
+        else:
+            groups[key_str] = sorted(existing + rows)
+    return groups
+
+
+def _train_batch(batch: EventBatch, config: BaselineConfig) -> List[BaselineStats]:
+    ts = batch.timestamps
+    baselines: List[BaselineStats] = []
+
+    for rows in group_batch_rows(batch, config).values():
+        if len(rows) < config.min_samples:
+            continue
+
+        values = [batch.values[i] for i in rows]
+        med, mad = compute_median_and_mad(values, min_mad=config.min_mad)
+
+        # Same picks as a stable sort by timestamp: first of the earliest, last of the latest.
+        first = min(rows, key=ts.__getitem__)
+        last = max(reversed(rows), key=ts.__getitem__)
+
+        baselines.append(
+            BaselineStats(
+                key=batch.key(rows[0], config),
+                median=med,
+                mad=mad,
+                sample_count=len(values),
+                training_start=batch.timestamp(first),
+                training_end=batch.timestamp(last),
+                created_at=_utc_now(),
+                version=1,
+            )
+        )
+
+    return baselines
+
+
+def train_baselines(
+    events: Union[Iterable[Event], EventBatch],
+    config: BaselineConfig,
+) -> List[BaselineStats]:
     """
     Train baselines from a set of events.
 
+    `events` may be any iterable, including the streaming iterator returned by
+    ingest.iter_events(); it is consumed once and never copied into a list.
+    An EventBatch is trained directly from its columns without building Events.
+
     Returns BaselineStats objects (baseline artifacts) that can be persisted.
     """
+    if isinstance(events, EventBatch):
+        return _train_batch(events, config)
+
     groups = group_events(events, config)
     baselines: List[BaselineStats] = []
 
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import math
+import os
+import pickle
+import tempfile
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+from baseline_engine.baseline import train_baselines
+from baseline_engine.baseline_numpy import NUMPY_MIN_ROWS, numpy_available, train_baselines_numpy
+from baseline_engine.baseline_parallel import shard_batch
+from baseline_engine.batch import EventBatch
+from baseline_engine.config import BaselineConfig
+from baseline_engine.models import BaselineStats
+
+# Rough peak memory per row while an exact engine trains a partition: the batch columns
+# plus per-group index lists and the value copies median() sorts.
+BYTES_PER_ROW = 120
+
+# Typical size of one CSV/JSONL event line, used to size the first split from a file size.
+INPUT_BYTES_PER_ROW = 60
+
+# How many times an oversized partition is re-split before it is trained as-is.
+_MAX_SPLIT_DEPTH = 4
+
+
+def estimate_rows(path: str) -> int:
+    return os.path.getsize(path) // INPUT_BYTES_PER_ROW
+
+
+def _spill(batches: Iterable[EventBatch], config: BaselineConfig, files: List[BinaryIO], salt: int) -> List[int]:
+    """
+    Hash-partition every batch by key and append each piece to its partition file.
+    Returns the number of rows written per partition.
+
+    Pieces are trimmed to the codes they use, so spill files (and the partitions loaded
+    back from them) grow with their own rows, not with every key of the input batch.
+    """
+    rows = [0] * len(files)
+    for batch in batches:
+        for n, piece in enumerate(shard_batch(batch, config, len(files), salt=salt)):
+            if len(piece):
+                pickle.dump(piece.trimmed(), files[n], protocol=pickle.HIGHEST_PROTOCOL)
+                rows[n] += len(piece)
+    return rows
+
+
+def _read_partition(path: str) -> Iterator[EventBatch]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _train_partition(batch: EventBatch, config: BaselineConfig, engine: str) -> List[BaselineStats]:
+    if engine == "numpy" or (engine == "auto" and numpy_available() and len(batch) >= NUMPY_MIN_ROWS):
+        return train_baselines_numpy(batch, config)
+    return train_baselines(batch, config)
+
+
+def _train_spilled(
+    batches: Iterable[EventBatch],
+    config: BaselineConfig,
+    *,
+    partitions: int,
+    budget_rows: int,
+    tmp_dir: str,
+    engine: str,
+    depth: int,
+) -> List[BaselineStats]:
+    paths = [os.path.join(tmp_dir, f"part-{depth}-{n}.bin") for n in range(partitions)]
+    files = [open(p, "wb") for p in paths]
+    try:
+        rows = _spill(batches, config, files, salt=depth)
+    finally:
+        for f in files:
+            f.close()
+
+    baselines: List[BaselineStats] = []
+    for path, n_rows in zip(paths, rows):
+        if n_rows == 0:
+            os.remove(path)
+            continue
+
+        if n_rows > budget_rows and depth < _MAX_SPLIT_DEPTH:
+            # Too big for the budget: split again with an independent hash.
+            sub_dir = tempfile.mkdtemp(dir=tmp_dir)
+            baselines.extend(
+                _train_spilled(
+                    _read_partition(path),
+                    config,
+                    partitions=math.ceil(n_rows / budget_rows),
+                    budget_rows=budget_rows,
+                    tmp_dir=sub_dir,
+                    engine=engine,
+                    depth=depth + 1,
+                )
+            )
+        else:
+            # A single key larger than the budget can't be split further; it is trained
+            # as-is (use the sketch engine if one key alone exceeds available memory).
+            baselines.extend(_train_partition(EventBatch.concat(_read_partition(path)), config, engine))
+        os.remove(path)
+    return baselines
+
+
+def train_baselines_external(
+    batches: Iterable[EventBatch],
+    config: BaselineConfig,
+    *,
+    memory_budget_bytes: int,
+    expected_rows: Optional[int] = None,
+    tmp_dir: Optional[str] = None,
+    engine: str = "auto",
+) -> List[BaselineStats]:
+    """
+    Out-of-core exact training.
+
+    Input batches are streamed once and spilled to temporary partition files by key hash;
+    each partition is then loaded and trained on its own, so peak memory is bounded by
+    `memory_budget_bytes` instead of the input size. Partitions that turn out larger than
+    the budget are re-split with a different hash. Results equal train_baselines().
+
+    expected_rows (e.g. estimated from the file size) only sizes the first split.
+    """
+    budget_rows = max(1, memory_budget_bytes // BYTES_PER_ROW)
+    partitions = max(1, math.ceil((expected_rows or 0) / budget_rows))
+
+    with tempfile.TemporaryDirectory(prefix="baseline-spill-", dir=tmp_dir) as spill_dir:
+        return _train_spilled(
+            batches,
+            config,
+            partitions=partitions,
+            budget_rows=budget_rows,
+            tmp_dir=spill_dir,
+            engine=engine,
+            depth=0,
+        )
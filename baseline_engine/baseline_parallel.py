@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from baseline_engine.baseline import train_baselines
+from baseline_engine.baseline_numpy import train_baselines_numpy
+from baseline_engine.batch import EventBatch
+from baseline_engine.config import BaselineConfig
+from baseline_engine.models import BaselineStats
+
+
+def shard_for_key(key_str: str, shards: int, salt: int = 0) -> int:
+    """
+    Stable shard assignment (unlike hash(), crc32 doesn't change between processes).
+
+    A non-zero salt gives an independent assignment, for re-splitting a shard.
+    """
+    data = key_str.encode("utf-8")
+    if salt:
+        data = f"{salt}:".encode("ascii") + data
+    return zlib.crc32(data) % shards
+
+
+def shard_batch(batch: EventBatch, config: BaselineConfig, shards: int, *, salt: int = 0) -> List[EventBatch]:
+    """
+    Hash-partition rows by baseline key string into `shards` sub-batches.
+
+    All rows of a key land in the same shard, so every shard trains independently.
+    """
+    by_codes: Dict[Tuple[int, int, int], int] = {}
+    assignment: List[int] = []
+    for i, codes in enumerate(batch.key_codes(config)):
+        shard = by_codes.get(codes)
+        if shard is None:
+            shard = by_codes[codes] = shard_for_key(batch.key(i, config).as_str(), shards, salt)
+        assignment.append(shard)
+
+    rows: List[List[int]] = [[] for _ in range(shards)]
+    for i, shard in enumerate(assignment):
+        rows[shard].append(i)
+    return [batch.take(r) for r in rows]
+
+
+def _train_shard(batch: EventBatch, config: BaselineConfig, engine: str) -> List[BaselineStats]:
+    if engine == "numpy":
+        return train_baselines_numpy(batch, config)
+    return train_baselines(batch, config)
+
+
+def train_baselines_parallel(
+    batch: EventBatch,
+    config: BaselineConfig,
+    *,
+    workers: int,
+    engine: str = "python",
+) -> List[BaselineStats]:
+    """
+    Train key shards in a process pool with the given exact engine ("python" or "numpy").
+
+    Results are identical to training the whole batch in one process; only the order of
+    the returned baselines differs (grouped by shard).
+    """
+    if engine not in ("python", "numpy"):
+        raise ValueError(f"Unsupported engine for parallel training: {engine}")
+    if workers <= 1:
+        return _train_shard(batch, config, engine)
+
+    shards = [s for s in shard_batch(batch, config, workers) if len(s)]
+    baselines: List[BaselineStats] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(_train_shard, shards, [config] * len(shards), [engine] * len(shards)):
+            baselines.extend(result)
+    return baselines
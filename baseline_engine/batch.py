@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from baseline_engine.config import BaselineConfig
+from baseline_engine.models import BaselineKey, Event
+
+# Sentinel stored in EventBatch.utc_offsets for naive (offset-less) timestamps.
+NAIVE = -(2**31)
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+_US_PER_HOUR = 3_600_000_000
+_US_PER_DAY = 24 * _US_PER_HOUR
+
+
+def datetime_to_epoch_us(dt: datetime) -> Tuple[int, int]:
+    """
+    Split a datetime into (UTC epoch microseconds, UTC offset in seconds).
+
+    Naive datetimes are treated as UTC for ordering and get the NAIVE offset,
+    so they round-trip back to naive datetimes.
+    """
+    off = dt.utcoffset()
+    if off is None:
+        return (dt - _EPOCH) // _US, NAIVE
+    # Subtract the offset in microseconds, not as a datetime: near datetime.max/min the
+    # UTC instant itself is not a representable datetime (e.g. 9999-12-31T23:00-05:00).
+    return (dt.replace(tzinfo=None) - _EPOCH) // _US - off // _US, int(off.total_seconds())
+
+
+def epoch_us_to_datetime(us: int, utc_offset: int) -> datetime:
+    """
+    Inverse of datetime_to_epoch_us().
+    """
+    if utc_offset == NAIVE:
+        return _EPOCH + timedelta(microseconds=us)
+    tz = timezone.utc if utc_offset == 0 else timezone(timedelta(seconds=utc_offset))
+    return (_EPOCH + timedelta(microseconds=us + utc_offset * 1_000_000)).replace(tzinfo=tz)
+
+
+def wall_clock_hour(us: int, utc_offset: int) -> int:
+    """
+    Hour of day as seen in the timestamp's own offset (matches datetime.hour).
+    """
+    if utc_offset != NAIVE:
+        us += utc_offset * 1_000_000
+    return (us // _US_PER_HOUR) % 24
+
+
+def wall_clock_date(us: int, utc_offset: int) -> date:
+    """
+    Calendar date as seen in the timestamp's own offset (matches datetime.date()).
+    """
+    if utc_offset != NAIVE:
+        us += utc_offset * 1_000_000
+    return _EPOCH.date() + timedelta(days=us // _US_PER_DAY)
+
+
+@dataclass
+class EventBatch:
+    """
+    Columnar, compact representation of many events.
+
+    Timestamps are UTC epoch microseconds (plus the original UTC offset so hour-of-day
+    and round-tripping stay exact), entity_id/metric are interned to integer codes, and
+    values are a float64 array. Event objects are only built on demand via event(i).
+    """
+
+    timestamps: array = field(default_factory=lambda: array("q"))
+    utc_offsets: array = field(default_factory=lambda: array("i"))
+    entity_codes: array = field(default_factory=lambda: array("i"))
+    metric_codes: array = field(default_factory=lambda: array("i"))
+    values: array = field(default_factory=lambda: array("d"))
+
+    entities: List[str] = field(default_factory=list)
+    metrics: List[str] = field(default_factory=list)
+
+    # Sparse: only rows that actually carry tags are stored.
+    tags: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+
+    _entity_index: Dict[str, int] = field(default_factory=dict, repr=False)
+    _metric_index: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def entity_code(self, entity_id: str) -> int:
+        code = self._entity_index.get(entity_id)
+        if code is None:
+            code = len(self.entities)
+            self._entity_index[entity_id] = code
+            self.entities.append(entity_id)
+        return code
+
+    def metric_code(self, metric: str) -> int:
+        code = self._metric_index.get(metric)
+        if code is None:
+            code = len(self.metrics)
+            self._metric_index[metric] = code
+            self.metrics.append(metric)
+        return code
+
+    def append(
+        self,
+        timestamp: datetime,
+        entity_id: str,
+        metric: str,
+        value: float,
+        tags: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        us, offset = datetime_to_epoch_us(timestamp)
+        if tags:
+            self.tags[len(self.values)] = tags
+        self.timestamps.append(us)
+        self.utc_offsets.append(offset)
+        self.entity_codes.append(self.entity_code(entity_id))
+        self.metric_codes.append(self.metric_code(metric))
+        self.values.append(value)
+
+    def append_event(self, event: Event) -> None:
+        self.append(event.timestamp, event.entity_id, event.metric, event.value, event.tags)
+
+    @classmethod
+    def from_events(cls, events: Iterable[Event]) -> "EventBatch":
+        batch = cls()
+        for e in events:
+            batch.append_event(e)
+        return batch
+
+    def extend(self, other: "EventBatch") -> None:
+        """
+        Append all rows of another batch, re-mapping its interned codes onto ours.
+        """
+        offset = len(self)
+        entity_map = [self.entity_code(s) for s in other.entities]
+        metric_map = [self.metric_code(s) for s in other.metrics]
+
+        self.timestamps.extend(other.timestamps)
+        self.utc_offsets.extend(other.utc_offsets)
+        self.entity_codes.extend(array("i", [entity_map[c] for c in other.entity_codes]))
+        self.metric_codes.extend(array("i", [metric_map[c] for c in other.metric_codes]))
+        self.values.extend(other.values)
+        for i, t in other.tags.items():
+            self.tags[offset + i] = t
+
+    def take(self, rows: Sequence[int]) -> "EventBatch":
+        """
+        New batch holding only `rows` (in the given order). Code tables are shared copies,
+        so codes stay valid without re-interning.
+        """
+        ts, offs, ents, mets, vals = self.timestamps, self.utc_offsets, self.entity_codes, self.metric_codes, self.values
+        out = EventBatch(
+            timestamps=array("q", [ts[i] for i in rows]),
+            utc_offsets=array("i", [offs[i] for i in rows]),
+            entity_codes=array("i", [ents[i] for i in rows]),
+            metric_codes=array("i", [mets[i] for i in rows]),
+            values=array("d", [vals[i] for i in rows]),
+            entities=list(self.entities),
+            metrics=list(self.metrics),
+            _entity_index=dict(self._entity_index),
+            _metric_index=dict(self._metric_index),
+        )
+        if self.tags:
+            out.tags = {j: self.tags[i] for j, i in enumerate(rows) if i in self.tags}
+        return out
+
+    def trimmed(self) -> "EventBatch":
+        """
+        Copy whose code tables hold only the entities/metrics its rows use, e.g. before
+        pickling a small piece taken from a batch with many keys.
+        """
+        entity_map = {c: n for n, c in enumerate(dict.fromkeys(self.entity_codes))}
+        metric_map = {c: n for n, c in enumerate(dict.fromkeys(self.metric_codes))}
+        entities = [self.entities[c] for c in entity_map]
+        metrics = [self.metrics[c] for c in metric_map]
+        return EventBatch(
+            timestamps=array("q", self.timestamps),
+            utc_offsets=array("i", self.utc_offsets),
+            entity_codes=array("i", [entity_map[c] for c in self.entity_codes]),
+            metric_codes=array("i", [metric_map[c] for c in self.metric_codes]),
+            values=array("d", self.values),
+            entities=entities,
+            metrics=metrics,
+            tags=dict(self.tags),
+            _entity_index={s: n for n, s in enumerate(entities)},
+            _metric_index={s: n for n, s in enumerate(metrics)},
+        )
+
+    @classmethod
+    def concat(cls, batches: Iterable["EventBatch"]) -> "EventBatch":
+        merged = cls()
+        for b in batches:
+            merged.extend(b)
+        return merged
+
+    def timestamp(self, i: int) -> datetime:
+        return epoch_us_to_datetime(self.timestamps[i], self.utc_offsets[i])
+
+    def hour_of_day(self, i: int) -> int:
+        return wall_clock_hour(self.timestamps[i], self.utc_offsets[i])
+
+    def key(self, i: int, config: BaselineConfig) -> BaselineKey:
+        """
+        Same key ingest + key_from_event() would derive for row i.
+        """
+        return BaselineKey(
+            entity_id=self.entities[self.entity_codes[i]],
+            metric=self.metrics[self.metric_codes[i]],
+            hour_of_day=self.hour_of_day(i) if config.use_hour_of_day else None,
+        )
+
+    def key_codes(self, config: BaselineConfig) -> List[Tuple[int, int, int]]:
+        """
+        Per-row (entity_code, metric_code, hour) tuples; hour is -1 when bucketing is off.
+        """
+        if not config.use_hour_of_day:
+            return list(zip(self.entity_codes, self.metric_codes, [-1] * len(self)))
+        hours = [wall_clock_hour(us, off) for us, off in zip(self.timestamps, self.utc_offsets)]
+        return list(zip(self.entity_codes, self.metric_codes, hours))
+
+    def event(self, i: int) -> Event:
+        """
+        Materialize row i as a full Event (e.g. to explain or print it).
+        """
+        return Event(
+            timestamp=self.timestamp(i),
+            entity_id=self.entities[self.entity_codes[i]],
+            metric=self.metrics[self.metric_codes[i]],
+            value=self.values[i],
+            tags=self.tags.get(i, {}),
+        )
+
+    def iter_events(self) -> Iterator[Event]:
+        for i in range(len(self)):
+            yield self.event(i)
+
+    def find(self, *, timestamp: datetime, entity_id: str, metric: str) -> Optional[int]:
+        """
+        Row index of the first event matching timestamp + entity_id + metric, if any.
+        """
+        e_code = self._entity_index.get(entity_id)
+        m_code = self._metric_index.get(metric)
+        if e_code is None or m_code is None:
+            return None
+
+        us, offset = datetime_to_epoch_us(timestamp)
+        for i, (t, e, m) in enumerate(zip(self.timestamps, self.entity_codes, self.metric_codes)):
+            # Naive and aware timestamps never compare equal, same as datetime.__eq__.
+            if t == us and e == e_code and m == m_code and (self.utc_offsets[i] == NAIVE) == (offset == NAIVE):
+                return i
+        return None
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from baseline_engine.models import BaselineStats
+from baseline_engine.storage_sqlite import BaselineStore
+
+DEFAULT_CACHE_SIZE = 100_000
+DEFAULT_NEGATIVE_TTL = 60.0
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class BaselineCache:
+    """
+    Size-bounded LRU cache over BaselineStore.get_latest().
+
+    For key spaces too large to snapshot. "No baseline" answers are cached too, for
+    `negative_ttl` seconds, so keys that are always skipped stop hitting SQLite on every
+    event while a baseline trained meanwhile is still picked up. Positive entries stay
+    until evicted. Lookups go through get_latest(), like the store and BaselineSnapshot,
+    as of a pinned `generation` when one is given.
+    """
+
+    def __init__(
+        self,
+        store: BaselineStore,
+        *,
+        max_size: int = DEFAULT_CACHE_SIZE,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        generation: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.store = store
+        self.generation = generation
+        self.max_size = max_size
+        self.negative_ttl = negative_ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        # key_str -> (baseline or None, expiry); positive entries never expire.
+        self._entries: "OrderedDict[str, Tuple[Optional[BaselineStats], float]]" = OrderedDict()
+
+    def _lookup(self, key_str: str) -> Tuple[bool, Optional[BaselineStats]]:
+        """
+        (cached?, baseline) for one key, counting a hit when cached.
+        """
+        entry = self._entries.get(key_str)
+        if entry is None:
+            return False, None
+
+        baseline, expires = entry
+        if baseline is None and self._clock() >= expires:
+            del self._entries[key_str]
+            return False, None
+
+        self._entries.move_to_end(key_str)
+        self.stats.hits += 1
+        if baseline is None:
+            self.stats.negative_hits += 1
+        return True, baseline
+
+    def get_latest(self, key_str: str) -> Optional[BaselineStats]:
+        cached, baseline = self._lookup(key_str)
+        if cached:
+            return baseline
+
+        self.stats.misses += 1
+        baseline = self.store.get_latest(key_str, generation=self.generation)
+        self._put(key_str, baseline)
+        return baseline
+
+    def get_latest_many(self, key_strs: Iterable[str]) -> Dict[str, BaselineStats]:
+        """
+        Batched get_latest(): all cache misses are resolved in one store round trip.
+        """
+        found: Dict[str, BaselineStats] = {}
+        missing: List[str] = []
+        for key_str in dict.fromkeys(key_strs):
+            cached, baseline = self._lookup(key_str)
+            if not cached:
+                missing.append(key_str)
+            elif baseline is not None:
+                found[key_str] = baseline
+
+        if missing:
+            self.stats.misses += len(missing)
+            fetched = self.store.get_latest_many(missing, generation=self.generation)
+            for key_str in missing:
+                self._put(key_str, fetched.get(key_str))
+            found.update(fetched)
+        return found
+
+    def _put(self, key_str: str, baseline: Optional[BaselineStats]) -> None:
+        expires = math.inf if baseline is not None else self._clock() + self.negative_ttl
+        self._entries[key_str] = (baseline, expires)
+        self._entries.move_to_end(key_str)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, key_str: Optional[str] = None) -> None:
+        """
+        Drop one key (or everything), e.g. after publishing new baselines.
+        """
+        if key_str is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key_str, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
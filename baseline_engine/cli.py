@@ -2,21 +2,40 @@ from __future__ import annotations
 
 import argparse
 import json
-from typing import List
-from datetime import datetime
-
-from baseline_engine.baseline import key_from_event, train_baselines
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+
+from baseline_engine.baseline import train_baselines
+from baseline_engine.cache import DEFAULT_NEGATIVE_TTL
+from baseline_engine.baseline_external import estimate_rows, train_baselines_external
+from baseline_engine.baseline_numpy import NUMPY_MIN_ROWS, numpy_available, train_baselines_numpy
+from baseline_engine.baseline_parallel import train_baselines_parallel
+from baseline_engine.batch import EventBatch
 from baseline_engine.config import BaselineConfig
-from baseline_engine.ingest import load_events
-from baseline_engine.scoring import score_event
+from baseline_engine.ingest import load_event_batch, peek_event_batches
+from baseline_engine.models import BaselineStats
+from baseline_engine.server import DEFAULT_MAX_BATCH, DEFAULT_MAX_DELAY_MS, ScoringServer, run_server
+from baseline_engine.scoring_parallel import (
+    BaselineViewSpec,
+    ScoreCounts,
+    ViewStats,
+    score_file_parallel,
+    write_batch_scores,
+)
+from baseline_engine.snapshot_file import write_snapshot_file
+from baseline_engine.incremental import update_baselines
+from baseline_engine.output import FORMATS, open_result_writer
+from baseline_engine.partials import merge_partial_files, write_partials
+from baseline_engine.rolling import update_rolling_baselines
+from baseline_engine.sketch import DEFAULT_RANK_ERROR, KeySketch, baselines_from_sketches, train_sketches
 from baseline_engine.storage_sqlite import BaselineStore
 from baseline_engine.demo_data import DemoConfig, generate_train_and_score
-from baseline_engine.explain import explain_event, find_event
+from baseline_engine.explain import explain_event
 from baseline_engine.reporting import (
     aggregate_anomalies_by_entity,
     aggregate_anomalies_by_hour,
     render_markdown_report,
-    score_events_with_store,
+    score_batches_lazy_with_store,
     top_anomalies,
 )
 
@@ -27,6 +46,82 @@ def cmd_hello(_: argparse.Namespace) -> int:
     return 0
 
 
+def _resolve_engine(engine: str, rows: int) -> str:
+    if engine == "auto":
+        return "numpy" if numpy_available() and rows >= NUMPY_MIN_ROWS else "python"
+    return engine
+
+
+def _train_from_input(
+    args: argparse.Namespace,
+    cfg: BaselineConfig,
+) -> Optional[Tuple[List[BaselineStats], List[KeySketch]]]:
+    """
+    Run the selected training engine over args.input.
+
+    Returns (baselines, per-key training state) or None if there are no events. The
+    sketch engine's state comes for free; the exact engines only build it (KLL sketches
+    at --sketch-error, an extra pass over the input) with --keep-state, so `baseline
+    update` can fold later events into the full history.
+    """
+    rank_error = args.sketch_error
+    if args.engine == "sketch":
+        # Streams batches through per-key sketches: memory is bounded by the key count.
+        batches = peek_event_batches(args.input, workers=args.workers)
+        if batches is None:
+            return None
+        states = train_sketches(batches, cfg, rank_error=rank_error)
+        return baselines_from_sketches(states, cfg), list(states.values())
+
+    states: Dict[str, KeySketch] = {}
+    if args.memory_budget_mb is not None:
+        # Out-of-core: stream + spill partitions to disk, train each within the budget.
+        batches = peek_event_batches(args.input, workers=args.workers)
+        if batches is None:
+            return None
+        if args.keep_state:
+            batches = _with_state(batches, cfg, rank_error, states)
+        baselines = train_baselines_external(
+            batches,
+            cfg,
+            memory_budget_bytes=args.memory_budget_mb * 1024 * 1024,
+            expected_rows=estimate_rows(args.input),
+            tmp_dir=args.tmp_dir,
+            engine=args.engine,
+        )
+        return baselines, list(states.values())
+
+    batch = load_event_batch(args.input, workers=args.workers)
+    if not len(batch):
+        return None
+    if args.keep_state:
+        train_sketches(batch, cfg, rank_error=rank_error, into=states)
+
+    engine = _resolve_engine(args.engine, len(batch))
+    if args.workers > 1:
+        # Shard keys across processes; each worker runs the chosen exact engine.
+        baselines = train_baselines_parallel(batch, cfg, workers=args.workers, engine=engine)
+    elif engine == "numpy":
+        baselines = train_baselines_numpy(batch, cfg)
+    else:
+        baselines = train_baselines(batch, cfg)
+    return baselines, list(states.values())
+
+
+def _with_state(
+    batches: Iterable[EventBatch],
+    cfg: BaselineConfig,
+    rank_error: float,
+    states: Dict[str, KeySketch],
+) -> Iterator[EventBatch]:
+    """
+    Pass batches through unchanged while folding each one into `states`.
+    """
+    for batch in batches:
+        train_sketches(batch, cfg, rank_error=rank_error, into=states)
+        yield batch
+
+
 def cmd_train(args: argparse.Namespace) -> int:
     cfg = BaselineConfig(
         use_hour_of_day=not args.no_hour_of_day,
@@ -35,22 +130,44 @@ def cmd_train(args: argparse.Namespace) -> int:
         min_mad=args.min_mad,
     )
 
-    events = load_events(args.input)
-    if not events:
+    if args.window_days is not None:
+        return _train_rolling(args, cfg)
+    if args.emit_partials is not None:
+        return _train_partials(args, cfg)
+
+    trained = _train_from_input(args, cfg)
+    if trained is None:
         print("No events found. Nothing to train.")
         return 0
 
-    baselines = train_baselines(events, cfg)
+    baselines, states = trained
     store = BaselineStore(args.db)
     store.init_db()
-    store.insert_many(baselines)
+    published = store.insert_many(baselines, training_state=states, label="train")
 
-    print(f"Trained baselines: {len(baselines)}")
+    print(f"Trained baselines: {len(baselines)} | Generation: {published.generation}")
+    print(f"Written: {published.written} | Unchanged (re-validated): {published.unchanged}")
     print(f"DB: {args.db}")
     return 0
 
 
-def cmd_score(args: argparse.Namespace) -> int:
+def _train_partials(args: argparse.Namespace, cfg: BaselineConfig) -> int:
+    batches = peek_event_batches(args.input, workers=args.workers)
+    if batches is None:
+        print("No events found. Nothing to train.")
+        return 0
+
+    # Exact partials unless the sketch engine was asked for (bounded size, approximate).
+    rank_error = args.sketch_error if args.engine == "sketch" else None
+    states = train_sketches(batches, cfg, rank_error=rank_error)
+    write_partials(args.emit_partials, states, cfg)
+
+    print(f"Wrote partials: {len(states)} keys")
+    print(f"Partials: {args.emit_partials}")
+    return 0
+
+
+def cmd_merge_partials(args: argparse.Namespace) -> int:
     cfg = BaselineConfig(
         use_hour_of_day=not args.no_hour_of_day,
         mad_threshold=args.mad_threshold,
@@ -58,37 +175,273 @@ def cmd_score(args: argparse.Namespace) -> int:
         min_mad=args.min_mad,
     )
 
-    events = load_events(args.input)
-    if not events:
-        print("No events found. Nothing to score.")
+    states = merge_partial_files(args.input, cfg)
+    baselines = baselines_from_sketches(states, cfg)
+
+    store = BaselineStore(args.db)
+    store.init_db()
+    published = store.insert_many(baselines, label="merge-partials")
+
+    print(f"Merged partial files: {len(args.input)} | keys: {len(states)}")
+    print(f"Trained baselines: {len(baselines)} | Generation: {published.generation}")
+    print(f"Written: {published.written} | Unchanged (re-validated): {published.unchanged}")
+    print(f"DB: {args.db}")
+    return 0
+
+
+def _train_rolling(args: argparse.Namespace, cfg: BaselineConfig) -> int:
+    batches = peek_event_batches(args.input, workers=args.workers)
+    if batches is None:
+        print("No events found. Nothing to train.")
         return 0
 
     store = BaselineStore(args.db)
     store.init_db()
+    as_of = date.fromisoformat(args.as_of) if args.as_of else None
+    result = update_rolling_baselines(
+        batches,
+        store,
+        cfg,
+        window_days=args.window_days,
+        as_of=as_of,
+        rank_error=args.sketch_error,
+    )
 
-    scored = 0
-    skipped = 0
+    print(f"Window: {result.window_start.isoformat()} .. {result.window_end.isoformat()} ({args.window_days} days)")
+    print(f"Day partitions written: {result.partitions_written} | expired: {result.partitions_expired}")
+    print(f"Trained baselines: {len(result.baselines)}")
+    if result.retired:
+        print(f"Retired keys (no data left in the window): {len(result.retired)}")
+    print(f"DB: {args.db}")
+    return 0
 
-    # Output as JSONL (one result per line) so you can pipe it later.
-    for e in events:
-        k = key_from_event(e, cfg).as_str()
-        baseline = store.get_latest(k)
 
-        if baseline is None:
-            skipped += 1
-            if args.verbose:
-                print(f"SKIP (no baseline): {k}")
-            continue
+def cmd_update(args: argparse.Namespace) -> int:
+    cfg = BaselineConfig(
+        use_hour_of_day=not args.no_hour_of_day,
+        mad_threshold=args.mad_threshold,
+        min_samples=args.min_samples,
+        min_mad=args.min_mad,
+    )
 
-        result = score_event(e, baseline, cfg)
-        scored += 1
+    batches = peek_event_batches(args.input, workers=args.workers)
+    if batches is None:
+        print("No events found. Nothing to update.")
+        return 0
 
-        if args.only_anomalies and not result.is_anomaly:
-            continue
+    store = BaselineStore(args.db)
+    store.init_db()
+    result = update_baselines(batches, store, cfg, rank_error=args.sketch_error)
+
+    print(f"Updated keys: {result.keys} | Published baselines: {len(result.baselines)}")
+    if result.skipped:
+        print(
+            f"Skipped keys without training state: {len(result.skipped)} "
+            "(retrain them with `baseline train --keep-state` to start updating them)"
+        )
+    print(f"DB: {args.db}")
+    return 0
 
-        print(result.model_dump_json())
 
-    print(f"Scored: {scored} | Skipped (no baseline): {skipped}")
+def _pin_generation(store: BaselineStore, requested: Optional[int]) -> Optional[int]:
+    """
+    The requested generation (or the current one), checked to still be pinnable.
+    """
+    generation = requested if requested is not None else store.current_generation()
+    if generation is not None:
+        store.check_pinnable(generation)
+    return generation
+
+
+def cmd_score(args: argparse.Namespace) -> int:
+    cfg = BaselineConfig(
+        use_hour_of_day=not args.no_hour_of_day,
+        mad_threshold=args.mad_threshold,
+        min_samples=args.min_samples,
+        min_mad=args.min_mad,
+    )
+
+    if args.snapshot_file is None:
+        # Workers only read, so the schema is brought up to date once, here.
+        store = BaselineStore(args.db)
+        store.init_db()
+        # Pinned to one generation, so a concurrent train can't mix old and new baselines
+        # (and every worker scores against the same one).
+        try:
+            generation = _pin_generation(store, args.generation)
+        except ValueError as e:
+            print(str(e))
+            return 1
+    else:
+        # Exported snapshot: mapped, not loaded, and the DB is not touched at all.
+        generation = None
+
+    # Only the keys present in the input are loaded, one query per batch of new keys.
+    # With --cache-size, memory is bounded instead by an LRU over per-key lookups.
+    spec = BaselineViewSpec(
+        db_path=args.db,
+        snapshot_file=args.snapshot_file,
+        cache_size=args.cache_size,
+        negative_ttl=args.negative_ttl,
+        generation=generation,
+    )
+    # SKIP notes stay in input order: on stdout they are interleaved with the results.
+    note = print if args.verbose else None
+    inline_notes = args.output is None
+
+    if args.workers > 1:
+        with open_result_writer(args.output, args.format) as out:
+            result = score_file_parallel(
+                args.input,
+                spec,
+                cfg,
+                out,
+                workers=args.workers,
+                only_anomalies=args.only_anomalies,
+                note=note,
+                inline_notes=inline_notes,
+            )
+        if not result.ranges:
+            print("No events found. Nothing to score.")
+            return 0
+        counts, stats = result.counts, result.stats
+    else:
+        batches = peek_event_batches(args.input)
+        if batches is None:
+            print("No events found. Nothing to score.")
+            return 0
+
+        view = spec.open()
+        counts = ScoreCounts()
+        # Output as JSONL (one result per line, or CSV/TSV) so you can pipe it later.
+        # Events are streamed in columnar batches, each scored in one vectorized pass, and
+        # results are serialized straight from the columns into a buffered writer.
+        with open_result_writer(args.output, args.format) as out:
+            if note is not None and inline_notes:
+                note = out.write_line
+            for batch in batches:
+                c = write_batch_scores(out, batch, view, cfg, only_anomalies=args.only_anomalies, note=note)
+                counts.scored += c.scored
+                counts.skipped += c.skipped
+        stats = ViewStats.of(view)
+
+    if args.verbose and stats is not None:
+        print(stats.describe())
+    print(f"Scored: {counts.scored} | Skipped (no baseline): {counts.skipped}")
+    return 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    cfg = BaselineConfig(
+        use_hour_of_day=not args.no_hour_of_day,
+        mad_threshold=args.mad_threshold,
+        min_samples=args.min_samples,
+        min_mad=args.min_mad,
+    )
+
+    generation = None
+    if args.snapshot_file is None:
+        store = BaselineStore(args.db)
+        store.init_db()
+        try:
+            generation = _pin_generation(store, args.generation)
+        except ValueError as e:
+            print(str(e))
+            return 1
+
+    # Every baseline is loaded (or mapped) once, up front, and stays resident.
+    spec = BaselineViewSpec(
+        db_path=args.db,
+        snapshot_file=args.snapshot_file,
+        generation=generation,
+        preload=True,
+    )
+    view = spec.open()
+    server = ScoringServer(
+        view,
+        cfg,
+        socket_path=args.socket,
+        host=args.host,
+        port=args.port,
+        max_batch=args.max_batch,
+        max_delay_ms=args.max_delay_ms,
+    )
+
+    print(f"Serving {view.key_count} baselines on {server.address} (generation: {generation or '-'})", flush=True)
+    run_server(server)
+
+    s = server.stats
+    print(
+        f"Connections: {s.connections} | Events: {s.events} | Scored: {s.scored} | "
+        f"Skipped (no baseline): {s.skipped} | Errors: {s.errors} | Batches: {s.batches}"
+    )
+    return 0
+
+
+def cmd_export_snapshot(args: argparse.Namespace) -> int:
+    store = BaselineStore(args.db)
+    store.init_db()
+
+    written = write_snapshot_file(args.output, store.latest_baselines().values())
+    print(f"Exported baselines: {written}")
+    print(f"Snapshot: {args.output}")
+    return 0
+
+
+def cmd_generations(args: argparse.Namespace) -> int:
+    store = BaselineStore(args.db)
+    store.init_db()
+
+    generations = store.list_generations()
+    for g in generations:
+        print(
+            f"{g.id}\t{g.created_at.isoformat()}\t{g.status}\t{g.label or '-'}\t"
+            f"{g.baseline_count}\t{g.unchanged_count}" + ("\tcompacted" if g.compacted else "")
+        )
+
+    print(f"Generations: {len(generations)} | current: {store.current_generation()}")
+    return 0
+
+
+def cmd_rollback(args: argparse.Namespace) -> int:
+    store = BaselineStore(args.db)
+    store.init_db()
+
+    try:
+        rolled_back = store.rollback(args.to)
+    except ValueError as e:
+        print(str(e))
+        return 1
+
+    print(f"Rolled back generations: {', '.join(map(str, rolled_back)) or 'none'}")
+    print(f"Current generation: {store.current_generation()}")
+    return 0
+
+
+def cmd_compact(args: argparse.Namespace) -> int:
+    if args.keep_last is None and args.max_age_days is None:
+        print("Nothing to do: pass --keep-last and/or --max-age-days.")
+        return 1
+
+    store = BaselineStore(args.db)
+    store.init_db()
+
+    older_than = None
+    if args.max_age_days is not None:
+        older_than = datetime.now(timezone.utc) - timedelta(days=args.max_age_days)
+    result = store.compact(
+        keep_last=args.keep_last,
+        older_than=older_than,
+        archive_path=args.archive,
+        vacuum=not args.no_vacuum,
+    )
+
+    print(f"Pruned baseline versions: {result.pruned} | keys: {result.keys}")
+    if result.archive_path:
+        print(f"Archive: {result.archive_path}")
+    if result.horizon is not None:
+        print(f"Generations before {result.horizon} can no longer be pinned or rolled back to")
+    print(f"DB size: {result.bytes_before} -> {result.bytes_after} bytes (reclaimed {result.reclaimed})")
     return 0
 
 
@@ -157,15 +510,16 @@ def cmd_report(args: argparse.Namespace) -> int:
         min_mad=args.min_mad,
     )
 
-    events = load_events(args.input)
-    if not events:
+    batches = peek_event_batches(args.input, workers=args.workers)
+    if batches is None:
         print("No events found. Nothing to report.")
         return 0
 
     store = BaselineStore(args.db)
     store.init_db()
 
-    results, stats = score_events_with_store(events, store, cfg)
+    # The report only looks at anomalies, so don't hold on to normal results.
+    results, stats = score_batches_lazy_with_store(batches, store, cfg, only_anomalies=True)
 
     by_entity = aggregate_anomalies_by_entity(results)
     by_hour = aggregate_anomalies_by_hour(results, enabled=cfg.use_hour_of_day)
@@ -198,14 +552,20 @@ def cmd_explain(args: argparse.Namespace) -> int:
         min_mad=args.min_mad,
     )
 
-    events = load_events(args.input)
-    if not events:
+    batches = peek_event_batches(args.input)
+    if batches is None:
         print("No events found.")
         return 1
 
     ts = datetime.fromisoformat(args.timestamp)
 
-    e = find_event(events, timestamp=ts, entity_id=args.entity, metric=args.metric)
+    # Only the matching row is ever turned into an Event.
+    e = None
+    for batch in batches:
+        row = batch.find(timestamp=ts, entity_id=args.entity, metric=args.metric)
+        if row is not None:
+            e = batch.event(row)
+            break
     if e is None:
         print("Event not found with the given timestamp/entity/metric.")
         print("Tip: ensure the timestamp exactly matches what's in the file (ISO format).")
@@ -223,6 +583,34 @@ def cmd_explain(args: argparse.Namespace) -> int:
     return 0
 
 
+def _positive_int(raw: str) -> int:
+    value = int(raw)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1, got {value}")
+    return value
+
+
+def _rank_error(raw: str) -> float:
+    value = float(raw)
+    if not 0 < value < 1:
+        raise argparse.ArgumentTypeError(f"must be between 0 and 1 (exclusive), got {raw}")
+    return value
+
+
+def _check_train_args(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """
+    Reject option combinations where one option would silently override another.
+    """
+    if args.engine == "sketch" and args.memory_budget_mb is not None:
+        parser.error("--memory-budget-mb does not apply to --engine sketch (already bounded by the key count)")
+    if args.window_days is not None and args.engine in ("python", "numpy"):
+        parser.error(f"--window-days always trains from per-day sketches; --engine {args.engine} does not apply")
+    if args.keep_state and (args.window_days is not None or args.emit_partials is not None):
+        parser.error("--keep-state does not apply to --window-days or --emit-partials")
+    if args.as_of is not None and args.window_days is None:
+        parser.error("--as-of requires --window-days")
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="baseline",
@@ -241,7 +629,84 @@ def build_parser() -> argparse.ArgumentParser:
     train.add_argument("--mad-threshold", type=float, default=3.5, help="Threshold (in MAD units) for anomaly flagging")
     train.add_argument("--min-mad", type=float, default=1e-6, help="Clamp MAD to at least this value")
     train.add_argument("--no-hour-of-day", action="store_true", help="Disable hour-of-day bucketing")
-    train.set_defaults(func=cmd_train)
+    train.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=1,
+        help="Processes used to parse the input file and to train key shards in parallel",
+    )
+    train.add_argument(
+        "--engine",
+        choices=["auto", "python", "numpy", "sketch"],
+        default="auto",
+        help="Training engine (auto uses numpy for large inputs when it is installed; "
+        "sketch estimates median/MAD in bounded memory)",
+    )
+    train.add_argument(
+        "--sketch-error",
+        type=_rank_error,
+        default=DEFAULT_RANK_ERROR,
+        help="Target normalized rank error for --engine sketch and for --keep-state (e.g. 0.01 = 1%%)",
+    )
+    train.add_argument(
+        "--keep-state",
+        action="store_true",
+        help="Also store per-key sketch state so `baseline update` can extend these baselines "
+        "(always on with --engine sketch; costs an extra pass and memory with the exact engines)",
+    )
+    # Training modes; at most one applies to a run.
+    mode = train.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--memory-budget-mb",
+        type=_positive_int,
+        default=None,
+        help="Out-of-core mode: spill key partitions to disk and train each within this budget",
+    )
+    mode.add_argument(
+        "--window-days",
+        type=_positive_int,
+        default=None,
+        help="Rolling-window mode: store per-day partials and train on the last N days only",
+    )
+    mode.add_argument(
+        "--emit-partials",
+        default=None,
+        help="Write per-key partial training state to this file instead of the DB (see merge-partials)",
+    )
+    train.add_argument("--tmp-dir", default=None, help="Directory for out-of-core spill files (default: system temp)")
+    train.add_argument("--as-of", default=None, help="Last day (YYYY-MM-DD) of the rolling window; defaults to the newest day stored")
+    train.set_defaults(func=cmd_train, check=lambda args: _check_train_args(train, args))
+
+    update = sub.add_parser(
+        "update",
+        help="Fold new events into stored training state and publish the next baseline version.",
+    )
+    update.add_argument("--input", required=True, help="Path to new events file (.csv or .jsonl)")
+    update.add_argument("--db", default="baselines.db", help="SQLite db file path")
+    update.add_argument("--min-samples", type=int, default=30, help="Minimum samples required per baseline key")
+    update.add_argument("--mad-threshold", type=float, default=3.5, help="Threshold (in MAD units) for anomaly flagging")
+    update.add_argument("--min-mad", type=float, default=1e-6, help="Clamp MAD to at least this value")
+    update.add_argument("--no-hour-of-day", action="store_true", help="Disable hour-of-day bucketing")
+    update.add_argument("--workers", type=_positive_int, default=1, help="Processes used to parse the input file")
+    update.add_argument(
+        "--sketch-error",
+        type=_rank_error,
+        default=DEFAULT_RANK_ERROR,
+        help="Target normalized rank error for keys that have no stored state yet",
+    )
+    update.set_defaults(func=cmd_update)
+
+    merge = sub.add_parser(
+        "merge-partials",
+        help="Merge partial files from `train --emit-partials` into baselines in the DB.",
+    )
+    merge.add_argument("--input", required=True, nargs="+", help="Partials files to merge")
+    merge.add_argument("--db", default="baselines.db", help="SQLite db file path")
+    merge.add_argument("--min-samples", type=int, default=30, help="Minimum samples required per baseline key")
+    merge.add_argument("--mad-threshold", type=float, default=3.5, help="Threshold (in MAD units) for anomaly flagging")
+    merge.add_argument("--min-mad", type=float, default=1e-6, help="Clamp MAD to at least this value")
+    merge.add_argument("--no-hour-of-day", action="store_true", help="Partials were built without hour-of-day bucketing")
+    merge.set_defaults(func=cmd_merge_partials)
 
     score = sub.add_parser("score", help="Score events against the latest stored baseline per key.")
     score.add_argument("--input", required=True, help="Path to events file (.csv or .jsonl)")
@@ -251,9 +716,103 @@ def build_parser() -> argparse.ArgumentParser:
     score.add_argument("--min-mad", type=float, default=1e-6, help="Clamp MAD to at least this value")
     score.add_argument("--no-hour-of-day", action="store_true", help="Disable hour-of-day bucketing")
     score.add_argument("--only-anomalies", action="store_true", help="Only print anomalous results")
-    score.add_argument("--verbose", action="store_true", help="Print skipped keys (no baseline)")
+    score.add_argument("--format", choices=FORMATS, default="jsonl", help="Result format (default: jsonl)")
+    score.add_argument("--output", default=None, help="Write results to this file instead of stdout")
+    score.add_argument("--verbose", action="store_true", help="Print skipped keys (no baseline) and lookup stats")
+    score.add_argument(
+        "--cache-size",
+        type=_positive_int,
+        default=None,
+        help="Bound baseline lookups with an LRU cache of this many keys (default: index every key seen)",
+    )
+    score.add_argument(
+        "--negative-ttl",
+        type=float,
+        default=DEFAULT_NEGATIVE_TTL,
+        help="Seconds to cache 'no baseline' answers when --cache-size is set",
+    )
+    score.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=1,
+        help="Processes used to parse and score the input file (output stays in input order)",
+    )
+    score.add_argument(
+        "--generation",
+        type=_positive_int,
+        default=None,
+        help="Score against baselines as of this generation (default: the current one)",
+    )
+    score.add_argument(
+        "--snapshot-file",
+        default=None,
+        help="Score against a file from `export-snapshot` (memory-mapped) instead of the DB",
+    )
     score.set_defaults(func=cmd_score)
 
+    serve = sub.add_parser(
+        "serve",
+        help="Run a scoring service: JSONL events in, one JSON result per line back.",
+    )
+    serve.add_argument("--db", default="baselines.db", help="SQLite db file path")
+    serve.add_argument("--snapshot-file", default=None, help="Serve from a file from `export-snapshot` instead of the DB")
+    serve.add_argument(
+        "--generation",
+        type=_positive_int,
+        default=None,
+        help="Serve baselines as of this generation (default: the current one)",
+    )
+    serve.add_argument("--socket", default=None, help="Listen on this Unix socket path instead of TCP")
+    serve.add_argument("--host", default="127.0.0.1", help="TCP host to bind (default: localhost only)")
+    serve.add_argument("--port", type=int, default=7878, help="TCP port to bind")
+    serve.add_argument(
+        "--max-batch",
+        type=_positive_int,
+        default=DEFAULT_MAX_BATCH,
+        help="Score as soon as this many events are waiting",
+    )
+    serve.add_argument(
+        "--max-delay-ms",
+        type=float,
+        default=DEFAULT_MAX_DELAY_MS,
+        help="Score waiting events after at most this many milliseconds",
+    )
+    serve.add_argument("--min-samples", type=int, default=30, help="Minimum samples required per baseline key (kept for parity)")
+    serve.add_argument("--mad-threshold", type=float, default=3.5, help="Threshold (in MAD units) for anomaly flagging")
+    serve.add_argument("--min-mad", type=float, default=1e-6, help="Clamp MAD to at least this value")
+    serve.add_argument("--no-hour-of-day", action="store_true", help="Disable hour-of-day bucketing")
+    serve.set_defaults(func=cmd_serve)
+
+    export = sub.add_parser(
+        "export-snapshot",
+        help="Write the latest baseline per key to a compact, memory-mappable snapshot file.",
+    )
+    export.add_argument("--db", default="baselines.db", help="SQLite db file path")
+    export.add_argument("--output", required=True, help="Snapshot file path")
+    export.set_defaults(func=cmd_export_snapshot)
+
+    gens = sub.add_parser("generations", help="List published training generations.")
+    gens.add_argument("--db", default="baselines.db", help="SQLite db file path")
+    gens.set_defaults(func=cmd_generations)
+
+    rollback = sub.add_parser("rollback", help="Make an earlier generation current again.")
+    rollback.add_argument("--db", default="baselines.db", help="SQLite db file path")
+    rollback.add_argument("--to", required=True, type=_positive_int, help="Generation id to roll back to")
+    rollback.set_defaults(func=cmd_rollback)
+
+    compact = sub.add_parser("compact", help="Prune old baseline versions and reclaim DB space.")
+    compact.add_argument("--db", default="baselines.db", help="SQLite db file path")
+    compact.add_argument("--keep-last", type=_positive_int, default=None, help="Keep this many newest versions per key")
+    compact.add_argument(
+        "--max-age-days",
+        type=float,
+        default=None,
+        help="Keep versions created within this many days",
+    )
+    compact.add_argument("--archive", default=None, help="Append pruned rows to this gzip-compressed JSONL file")
+    compact.add_argument("--no-vacuum", action="store_true", help="Skip VACUUM/ANALYZE after pruning")
+    compact.set_defaults(func=cmd_compact)
+
     keys = sub.add_parser("keys", help="Print distinct baseline keys in the DB.")
     keys.add_argument("--db", default="baselines.db", help="SQLite db file path")
     keys.set_defaults(func=cmd_keys)
@@ -287,6 +846,7 @@ def build_parser() -> argparse.ArgumentParser:
     report.add_argument("--mad-threshold", type=float, default=3.5, help="Threshold (in MAD units) for anomaly flagging")
     report.add_argument("--min-mad", type=float, default=1e-6, help="Clamp MAD to at least this value")
     report.add_argument("--no-hour-of-day", action="store_true", help="Disable hour-of-day bucketing")
+    report.add_argument("--workers", type=_positive_int, default=1, help="Processes used to parse the input file")
     report.set_defaults(func=cmd_report)
 
     explain = sub.add_parser("explain", help="Explain how a single event was scored (baseline used + score + why).")
@@ -311,6 +871,9 @@ def build_parser() -> argparse.ArgumentParser:
 def main(argv: List[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    check = getattr(args, "check", None)
+    if check is not None:
+        check(args)
     return int(args.func(args))
 
 
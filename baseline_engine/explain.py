@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Iterable, Optional, Tuple
 
 from baseline_engine.baseline import key_from_event
 from baseline_engine.config import BaselineConfig
@@ -11,7 +11,7 @@ from baseline_engine.storage_sqlite import BaselineStore
 
 
 def find_event(
-    events: List[Event],
+    events: Iterable[Event],
     *,
     timestamp: datetime,
     entity_id: str,
@@ -20,6 +20,8 @@ def find_event(
     """
     Find the first event matching timestamp + entity_id + metric.
     Timestamp match is exact ISO equality (so it should match your CSV/JSONL values).
+
+    Stops consuming `events` at the first match, so a streaming iterator is fine.
     """
     for e in events:
         if e.timestamp == timestamp and e.entity_id == entity_id and e.metric == metric:
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List, Union
+
+from baseline_engine.batch import EventBatch
+from baseline_engine.config import BaselineConfig
+from baseline_engine.models import BaselineStats
+from baseline_engine.sketch import DEFAULT_RANK_ERROR, merge_sketches, train_sketches
+from baseline_engine.storage_sqlite import BaselineStore
+
+
+@dataclass(frozen=True)
+class UpdateResult:
+    baselines: List[BaselineStats]
+    keys: int
+    # Keys with a published baseline but no training state that describes it; left as is.
+    skipped: List[str]
+
+
+def update_baselines(
+    batches: Union[EventBatch, Iterable[EventBatch]],
+    store: BaselineStore,
+    config: BaselineConfig,
+    *,
+    rank_error: float = DEFAULT_RANK_ERROR,
+) -> UpdateResult:
+    """
+    Fold new events into the stored per-key training state and publish the next version.
+
+    Only keys present in the new events are loaded, updated and re-published, so the cost
+    is O(new data) no matter how much history the state summarizes. Keys never seen
+    before start fresh. Keys whose latest baseline was published without matching state
+    (a rolling or merge-partials run, or a store trained before state was kept) are
+    skipped rather than replaced by a baseline built from the new events alone.
+    """
+    fresh = train_sketches(batches, config, rank_error=rank_error)
+    skipped = store.keys_without_training_state(fresh.keys())
+    for key_str in skipped:
+        del fresh[key_str]
+    if not fresh:
+        return UpdateResult([], 0, skipped)
+
+    states = store.load_training_state(fresh.keys())
+    merge_sketches(states, fresh)
+    touched = [states[k] for k in fresh]
+
+    versions = store.latest_versions(fresh.keys())
+    baselines: List[BaselineStats] = []
+    for state in touched:
+        stats = state.to_stats(config)
+        if stats is None:
+            # Still short of min_samples; the state is kept and keeps accumulating.
+            continue
+        stats.version = versions.get(state.key.as_str(), 0) + 1
+        baselines.append(stats)
+
+    store.insert_many(baselines, training_state=touched, label="update")
+    return UpdateResult(baselines, len(touched), skipped)
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
 import csv
+import io
 import json
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import chain, islice
 from pathlib import Path
-from typing import Iterable, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from baseline_engine.batch import EventBatch
 from baseline_engine.models import Event
 
+DEFAULT_BATCH_SIZE = 65536
 
-def _read_jsonl(path: Path) -> List[Event]:
-    events: List[Event] = []
+# Byte-range sizing for parallel parsing (see _plan_ranges).
+_MIN_RANGE_BYTES = 1 << 20
+_MAX_RANGE_BYTES = 32 << 20
+
+
+def _iter_jsonl(path: Path) -> Iterator[Event]:
     with path.open("r", encoding="utf-8") as f:
         for lineno, line in enumerate(f, start=1):
             line = line.strip()
@@ -19,18 +31,16 @@ def _read_jsonl(path: Path) -> List[Event]:
                 obj = json.loads(line)
             except json.JSONDecodeError as e:
                 raise ValueError(f"Invalid JSON on line {lineno} in {path}: {e}") from e
-            events.append(Event.model_validate(obj))
-    return events
+            yield Event.model_validate(obj)
 
 
-def _read_csv(path: Path) -> List[Event]:
+def _iter_csv(path: Path) -> Iterator[Event]:
     """
     Expected headers:
       timestamp,entity_id,metric,value
     Optional:
       tags (JSON object as a string)
     """
-    events: List[Event] = []
     with path.open("r", encoding="utf-8", newline="") as f:
         reader = csv.DictReader(f)
         required = {"timestamp", "entity_id", "metric", "value"}
@@ -56,19 +66,349 @@ def _read_csv(path: Path) -> List[Event]:
                     # If tags are malformed, fail loudly (baseline-first systems hate ambiguity).
                     raise ValueError(f"Invalid tags JSON in CSV row: {tags_raw}")
 
-            events.append(Event.model_validate(obj))
-    return events
+            yield Event.model_validate(obj)
 
 
-def load_events(path_str: str) -> List[Event]:
+# YYYY-MM-DD[T ]HH:MM[:SS[.ffffff]] plus an optional Z / ±HH:MM / ±HHMM offset: the
+# shapes where datetime.fromisoformat() and pydantic agree on what is valid.
+_FAST_TIMESTAMP = re.compile(
+    r"\d{4}-\d{2}-\d{2}[Tt ]\d{2}:\d{2}(?::\d{2}(?:[.,]\d{1,6})?)?(?:Z|[+-]\d{2}:?\d{2})?"
+)
+
+
+def _fast_timestamp(raw: Any) -> Optional[datetime]:
+    """
+    Parse the common ISO 8601 shapes without pydantic.
+
+    Returns None for anything unusual (epoch numbers, week dates, hour-only offsets,
+    garbage), in which case the caller falls back to full Event validation so accepted
+    inputs and error messages stay identical to the pydantic path.
+    """
+    if type(raw) is not str or not _FAST_TIMESTAMP.fullmatch(raw):
+        return None
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError:
+        return None
+
+
+def _append_row(batch: EventBatch, obj: Dict[str, Any]) -> None:
+    ts = _fast_timestamp(obj.get("timestamp"))
+    entity_id = obj.get("entity_id")
+    metric = obj.get("metric")
+    value = obj.get("value")
+    tags = obj.get("tags", {})
+
+    if (
+        ts is not None
+        and type(entity_id) is str
+        and type(metric) is str
+        and type(value) in (float, int)
+        and type(tags) is dict
+    ):
+        try:
+            value = float(value)
+        except OverflowError:
+            pass  # an int too large for a float: pydantic decides below
+        else:
+            batch.append(ts, entity_id, metric, value, tags)
+            return
+
+    # Slow path: let pydantic coerce (or reject) the row exactly as load_events() would.
+    batch.append_event(Event.model_validate(obj))
+
+
+class _BadJSONLine(Exception):
+    """
+    Raised by the batch parsers with a line number relative to the lines they were given.
+
+    Callers add their own line offset and turn it into the public ValueError.
+    """
+
+    def __init__(self, lineno: int, error: str) -> None:
+        super().__init__(lineno, error)
+        self.lineno = lineno
+        self.error = error
+
+
+def _jsonl_batches(lines: Iterable[str], batch_size: int) -> Iterator[EventBatch]:
+    batch = EventBatch()
+    for lineno, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise _BadJSONLine(lineno, str(e)) from e
+        if type(obj) is dict:
+            _append_row(batch, obj)
+        else:
+            batch.append_event(Event.model_validate(obj))
+
+        if len(batch) >= batch_size:
+            yield batch
+            batch = EventBatch()
+    if len(batch):
+        yield batch
+
+
+def _csv_batches(rows: Iterable[List[str]], header: List[str], batch_size: int) -> Iterator[EventBatch]:
+    # DictReader semantics: the last column with a given name wins.
+    col = {name: i for i, name in enumerate(header)}
+    ts_i, ent_i, met_i, val_i = col["timestamp"], col["entity_id"], col["metric"], col["value"]
+    tags_i = col.get("tags")
+    width = len(header)
+
+    batch = EventBatch()
+    for row in rows:
+        if not row:
+            continue
+        if len(row) < width:
+            row = row + [None] * (width - len(row))
+
+        obj: Dict[str, Any] = {
+            "timestamp": row[ts_i],
+            "entity_id": row[ent_i],
+            "metric": row[met_i],
+            "value": float(row[val_i]),
+        }
+
+        tags_raw = row[tags_i] if tags_i is not None else None
+        if tags_raw:
+            try:
+                obj["tags"] = json.loads(tags_raw)
+            except json.JSONDecodeError:
+                raise ValueError(f"Invalid tags JSON in CSV row: {tags_raw}")
+
+        _append_row(batch, obj)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = EventBatch()
+    if len(batch):
+        yield batch
+
+
+def _check_csv_header(header: Optional[List[str]], path: Path) -> List[str]:
+    if header is None:
+        raise ValueError(f"CSV file has no header row: {path}")
+    required = {"timestamp", "entity_id", "metric", "value"}
+    missing = required - set(header)
+    if missing:
+        raise ValueError(f"CSV missing required columns {sorted(missing)} in {path}")
+    return header
+
+
+def _iter_jsonl_batches(path: Path, batch_size: int) -> Iterator[EventBatch]:
+    with path.open("r", encoding="utf-8") as f:
+        try:
+            yield from _jsonl_batches(f, batch_size)
+        except _BadJSONLine as e:
+            raise ValueError(f"Invalid JSON on line {e.lineno} in {path}: {e.error}") from e.__cause__
+
+
+def _iter_csv_batches(path: Path, batch_size: int) -> Iterator[EventBatch]:
+    with path.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = _check_csv_header(next(reader, None), path)
+        yield from _csv_batches(reader, header, batch_size)
+
+
+def _plan_ranges(path: Path, workers: int) -> Tuple[Optional[List[str]], List[Tuple[int, int]]]:
+    """
+    Split a file into newline-aligned byte ranges for parallel parsing.
+
+    For CSV the header line is parsed here and excluded from the ranges. Ranges are
+    sized so every worker gets a few of them (for load balancing) while each stays
+    small enough that streaming consumers keep a bounded amount in flight.
+    """
+    size = path.stat().st_size
+    header: Optional[List[str]] = None
+
+    with path.open("rb") as f:
+        data_start = 0
+        if path.suffix.lower() == ".csv":
+            first = f.readline()
+            header = _check_csv_header(next(csv.reader([first.decode("utf-8")]), None), path)
+            data_start = f.tell()
+
+        chunk = max(_MIN_RANGE_BYTES, min(_MAX_RANGE_BYTES, -(-(size - data_start) // (workers * 4))))
+        bounds = [data_start]
+        pos = data_start + chunk
+        while pos < size:
+            f.seek(pos - 1)
+            f.readline()  # advance to the byte after the next newline
+            end = f.tell()
+            if end >= size:
+                break
+            bounds.append(end)
+            pos = end + chunk
+        bounds.append(size)
+
+    ranges = [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+    return header, ranges
+
+
+def _parse_range(
+    path_str: str,
+    header: Optional[List[str]],
+    start: int,
+    end: int,
+) -> Tuple[EventBatch, int]:
+    """
+    Worker entry point: parse one byte range into a single EventBatch.
+
+    Returns the batch plus the number of lines in the range, so the parent can
+    translate range-relative line numbers into file line numbers.
+    """
+    with open(path_str, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+
+    if header is None:
+        lines = io.StringIO(text, newline=None).readlines()
+        batch = next(_jsonl_batches(lines, batch_size=len(lines) + 1), None)
+        return batch or EventBatch(), len(lines)
+
+    lines = io.StringIO(text, newline="").readlines()
+    batch = next(_csv_batches(csv.reader(lines), header, batch_size=len(lines) + 1), None)
+    return batch or EventBatch(), len(lines)
+
+
+def _iter_parallel_batches(path: Path, workers: int) -> Iterator[EventBatch]:
+    header, ranges = _plan_ranges(path, workers)
+    lines_before = 0 if header is None else 1
+
+    if len(ranges) <= 1:
+        # Not worth a process pool; parse in-process with the same code path.
+        for start, end in ranges:
+            try:
+                batch, _ = _parse_range(str(path), header, start, end)
+            except _BadJSONLine as e:
+                raise ValueError(f"Invalid JSON on line {lines_before + e.lineno} in {path}: {e.error}") from None
+            if len(batch):
+                yield batch
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        todo = iter(ranges)
+        # Keep a bounded number of ranges in flight so memory doesn't grow with file size.
+        pending = deque(pool.submit(_parse_range, str(path), header, a, b) for a, b in islice(todo, workers * 2))
+        while pending:
+            fut = pending.popleft()
+            try:
+                batch, n_lines = fut.result()
+            except _BadJSONLine as e:
+                raise ValueError(f"Invalid JSON on line {lines_before + e.lineno} in {path}: {e.error}") from None
+
+            nxt = next(todo, None)
+            if nxt is not None:
+                pending.append(pool.submit(_parse_range, str(path), header, *nxt))
+
+            lines_before += n_lines
+            if len(batch):
+                yield batch
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _resolve_input(path_str: str) -> Path:
     path = Path(path_str)
     if not path.exists():
         raise FileNotFoundError(f"Input file not found: {path}")
 
     suffix = path.suffix.lower()
-    if suffix == ".jsonl":
-        return _read_jsonl(path)
-    if suffix == ".csv":
-        return _read_csv(path)
+    if suffix not in (".jsonl", ".csv"):
+        raise ValueError(f"Unsupported input format '{suffix}'. Use .csv or .jsonl")
+    return path
+
+
+def iter_events(path_str: str) -> Iterator[Event]:
+    """
+    Stream events from a .csv or .jsonl file one at a time.
+
+    The path and format are validated eagerly (so a bad path fails at call time),
+    but rows are only parsed as the iterator is consumed. Memory stays flat no
+    matter how large the input is.
+    """
+    path = _resolve_input(path_str)
+    if path.suffix.lower() == ".jsonl":
+        return _iter_jsonl(path)
+    return _iter_csv(path)
+
 
-    raise ValueError(f"Unsupported input format '{suffix}'. Use .csv or .jsonl")
+def peek_events(path_str: str) -> Optional[Iterator[Event]]:
+    """
+    Like iter_events(), but returns None when the file contains no events.
+
+    The first event is read ahead and chained back on, so nothing is lost.
+    """
+    events = iter_events(path_str)
+    first = next(events, None)
+    if first is None:
+        return None
+    return chain([first], events)
+
+
+def load_events(path_str: str) -> List[Event]:
+    """
+    Load every event into memory. Prefer iter_events() for large inputs.
+    """
+    return list(iter_events(path_str))
+
+
+def iter_event_batches(
+    path_str: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    *,
+    workers: int = 1,
+) -> Iterator[EventBatch]:
+    """
+    Stream a .csv or .jsonl file as columnar EventBatch chunks of up to batch_size rows.
+
+    This is the fast path: well-formed rows skip per-row pydantic validation entirely.
+    Rows the fast parser doesn't recognise fall back to Event.model_validate, so the
+    accepted inputs and error messages match iter_events().
+
+    With workers > 1 the file is split into newline-aligned byte ranges that are parsed
+    in a process pool; batches then follow range boundaries (batch_size is ignored) but
+    are still yielded in file order. This requires one record per line, so CSV fields
+    must not contain embedded newlines.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    path = _resolve_input(path_str)
+    if workers > 1:
+        return _iter_parallel_batches(path, workers)
+    if path.suffix.lower() == ".jsonl":
+        return _iter_jsonl_batches(path, batch_size)
+    return _iter_csv_batches(path, batch_size)
+
+
+def peek_event_batches(
+    path_str: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    *,
+    workers: int = 1,
+) -> Optional[Iterator[EventBatch]]:
+    """
+    Like iter_event_batches(), but returns None when the file contains no events.
+    """
+    batches = iter_event_batches(path_str, batch_size, workers=workers)
+    first = next(batches, None)
+    if first is None:
+        return None
+    return chain([first], batches)
+
+
+def load_event_batch(path_str: str, *, workers: int = 1) -> EventBatch:
+    """
+    Load a whole file as a single EventBatch (parsed across `workers` processes).
+    """
+    if workers > 1:
+        return EventBatch.concat(iter_event_batches(path_str, workers=workers))
+    batches = iter_event_batches(path_str, batch_size=2**62)
+    return next(batches, None) or EventBatch()
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import csv
+import sys
+from datetime import datetime
+from json.encoder import encode_basestring
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+
+from pydantic_core import to_json
+
+from baseline_engine.models import AnomalyResult, BaselineStats
+from baseline_engine.scoring import BatchScores, ScoredEvent, render_explanation
+
+FORMATS = ("jsonl", "csv", "tsv")
+
+# Lines are joined and written in chunks of this size, then flushed, so a downstream
+# pipe sees steady output without a syscall per line.
+DEFAULT_CHUNK_LINES = 4096
+
+_FILE_BUFFER_BYTES = 1 << 20
+
+DELIMITED_COLUMNS = (
+    "timestamp",
+    "entity_id",
+    "metric",
+    "value",
+    "key",
+    "median",
+    "mad",
+    "score",
+    "is_anomaly",
+    "explanation",
+)
+
+
+def json_float(value: float) -> str:
+    """
+    Float formatted exactly like pydantic's JSON output (non-finite values become null).
+    """
+    r = repr(value)
+    if "e" in r:
+        if r.endswith("e-05"):
+            # Python switches to exponent notation one decade earlier than pydantic.
+            sign = "-" if r[0] == "-" else ""
+            return f"{sign}0.0000{r[len(sign) : -4].replace('.', '')}"
+        return r.replace("e-0", "e-")
+    if "n" in r:  # nan, inf, -inf
+        return "null"
+    return r
+
+
+def json_datetime(dt: datetime) -> str:
+    """
+    Quoted ISO timestamp, as pydantic writes it (UTC as a trailing "Z").
+    """
+    s = dt.isoformat()
+    if s.endswith("+00:00"):
+        s = s[:-6] + "Z"
+    return f'"{s}"'
+
+
+def baseline_json(b: BaselineStats) -> str:
+    key = b.key
+    hour = "null" if key.hour_of_day is None else str(key.hour_of_day)
+    return (
+        f'{{"key":{{"entity_id":{encode_basestring(key.entity_id)},"metric":{encode_basestring(key.metric)},'
+        f'"hour_of_day":{hour}}},"median":{json_float(b.median)},"mad":{json_float(b.mad)},'
+        f'"sample_count":{b.sample_count},"training_start":{json_datetime(b.training_start)},'
+        f'"training_end":{json_datetime(b.training_end)},"created_at":{json_datetime(b.created_at)},'
+        f'"version":{b.version}}}'
+    )
+
+
+def _key_fragments(entity: str, metric: str, b: BaselineStats) -> Tuple[str, str, float, str]:
+    """
+    Pre-serialized pieces of a JSON result line that are the same for every row of a key.
+    """
+    # Everything in the explanation before the key is ASCII digits and words.
+    tail = encode_basestring(f" baseline median {b.median:.2f} for {b.key.as_str()}")[1:-1]
+    return (
+        f'"entity_id":{encode_basestring(entity)},"metric":{encode_basestring(metric)}',
+        f'"baseline":{baseline_json(b)}',
+        b.median,
+        tail,
+    )
+
+
+def _row_baseline(scores: BatchScores, i: int) -> BaselineStats:
+    b = scores.baseline(i)
+    if b is None:
+        raise ValueError(f"Row {i} has no baseline ({scores.key_str(i)})")
+    return b
+
+
+def json_result_lines(scores: BatchScores, rows: Iterable[int]) -> Iterator[str]:
+    """
+    JSONL result lines (newline included) for rows of a scored batch, in order.
+
+    Each line is what AnomalyResult.model_dump_json() gives for the row.
+    """
+    batch = scores.batch
+    values = batch.values
+    # Everything that only depends on the key is serialized once per call.
+    fragments: Dict[int, Tuple[str, str, float, str]] = {}
+    for i in rows:
+        b = _row_baseline(scores, i)
+        frag = fragments.get(id(b))
+        if frag is None:
+            frag = fragments[id(b)] = _key_fragments(
+                batch.entities[batch.entity_codes[i]], batch.metrics[batch.metric_codes[i]], b
+            )
+        event_names, baseline_tail, median, explanation_tail = frag
+
+        value = values[i]
+        score = float(scores.scores[i])
+        tags = batch.tags.get(i)
+        direction = "above" if value > median else "below"
+        yield (
+            f'{{"event":{{"timestamp":{json_datetime(batch.timestamp(i))},{event_names},'
+            f'"value":{json_float(value)},"tags":{to_json(tags).decode() if tags else "{}"}}},'
+            f'{baseline_tail},"score":{json_float(score)},'
+            f'"is_anomaly":{"true" if scores.is_anomaly[i] else "false"},'
+            f'"explanation":"Value {value:.2f} is {score:.2f} MAD {direction}{explanation_tail}"}}\n'
+        )
+
+
+class ResultWriter:
+    """
+    Buffered output stage for scoring results.
+
+    "jsonl" lines are byte-for-byte what AnomalyResult.model_dump_json() produces, built
+    by a hand-rolled serializer for the fixed result shape (each baseline is serialized
+    once per batch, not once per row). "csv" and "tsv" write one flat row per result
+    with a header line.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        fmt: str = "jsonl",
+        *,
+        chunk_lines: int = DEFAULT_CHUNK_LINES,
+        header: bool = True,
+    ) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format: {fmt} (expected one of {', '.join(FORMATS)})")
+        self.stream = stream
+        self.format = fmt
+        self.chunk_lines = chunk_lines
+        self.lines_written = 0
+        self._pending: List[str] = []
+
+        self._csv = None
+        if fmt != "jsonl":
+            self._csv = csv.writer(self, delimiter="," if fmt == "csv" else "\t", lineterminator="\n")
+            if header:
+                self._csv.writerow(DELIMITED_COLUMNS)
+
+    # csv.writer target: every row arrives here as one complete line.
+    def write(self, line: str) -> None:
+        self._pending.append(line)
+        if len(self._pending) >= self.chunk_lines:
+            self.flush()
+
+    def write_chunk(self, text: str) -> None:
+        """
+        Already-serialized lines (e.g. from a scoring worker), written and flushed as one.
+        """
+        self.flush()
+        if text:
+            self.stream.write(text)
+            self.lines_written += text.count("\n")
+            self.stream.flush()
+
+    def write_line(self, text: str) -> None:
+        """
+        Pass-through line (e.g. a SKIP note), kept in order with the results.
+        """
+        self.write(text + "\n")
+
+    def write_rows(self, scores: BatchScores, rows: Sequence[int]) -> None:
+        """
+        Write rows of a scored batch straight from its columns (no Event objects).
+        """
+        batch = scores.batch
+        values = batch.values
+        if self._csv is not None:
+            for i in rows:
+                b = _row_baseline(scores, i)
+                self._write_delimited(
+                    batch.timestamp(i),
+                    batch.entities[batch.entity_codes[i]],
+                    batch.metrics[batch.metric_codes[i]],
+                    values[i],
+                    b,
+                    float(scores.scores[i]),
+                    bool(scores.is_anomaly[i]),
+                )
+            return
+
+        for line in json_result_lines(scores, rows):
+            self.write(line)
+
+    def write_result(self, result: Union[ScoredEvent, AnomalyResult]) -> None:
+        e = result.event
+        b = result.baseline
+        if self._csv is not None:
+            self._write_delimited(e.timestamp, e.entity_id, e.metric, e.value, b, result.score, result.is_anomaly)
+            return
+        self.write(
+            f'{{"event":{{"timestamp":{json_datetime(e.timestamp)},"entity_id":{encode_basestring(e.entity_id)},'
+            f'"metric":{encode_basestring(e.metric)},"value":{json_float(e.value)},'
+            f'"tags":{to_json(e.tags).decode() if e.tags else "{}"}}},"baseline":{baseline_json(b)},'
+            f'"score":{json_float(result.score)},"is_anomaly":{"true" if result.is_anomaly else "false"},'
+            f'"explanation":{encode_basestring(render_explanation(e.value, result.score, b))}}}\n'
+        )
+
+    def _write_delimited(
+        self,
+        timestamp: datetime,
+        entity: str,
+        metric: str,
+        value: float,
+        b: BaselineStats,
+        score: float,
+        is_anomaly: bool,
+    ) -> None:
+        self._csv.writerow(
+            (
+                timestamp.isoformat(),
+                entity,
+                metric,
+                repr(value),
+                b.key.as_str(),
+                repr(b.median),
+                repr(b.mad),
+                repr(score),
+                "true" if is_anomaly else "false",
+                render_explanation(value, score, b),
+            )
+        )
+
+    def flush(self) -> None:
+        if self._pending:
+            self.stream.write("".join(self._pending))
+            self.lines_written += len(self._pending)
+            self._pending.clear()
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.flush()
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_result_writer(
+    path: Optional[str],
+    fmt: str = "jsonl",
+    *,
+    chunk_lines: int = DEFAULT_CHUNK_LINES,
+) -> ResultWriter:
+    """
+    ResultWriter over a file (large write buffer), or over stdout when path is None.
+    """
+    if path is None:
+        return ResultWriter(sys.stdout, fmt, chunk_lines=chunk_lines)
+    stream = open(path, "w", encoding="utf-8", newline="", buffering=_FILE_BUFFER_BYTES)
+    return ResultWriter(stream, fmt, chunk_lines=chunk_lines)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterable
+
+from baseline_engine.config import BaselineConfig
+from baseline_engine.models import BaselineKey
+from baseline_engine.sketch import KeySketch, KLLSketch, merge_sketches
+
+# File layout:
+#   magic, then header (flags, record count), then one record per key:
+#   fixed part (string/sketch lengths, hour, count, training window) followed by the
+#   UTF-8 entity_id, UTF-8 metric and the serialized sketch.
+_MAGIC = b"BBEPART\x01"
+_HEADER = struct.Struct("<BQ")
+_RECORD = struct.Struct("<IIiQqiqiI")
+
+_FLAG_HOUR_OF_DAY = 0x01
+
+
+@dataclass(frozen=True)
+class PartialsFile:
+    use_hour_of_day: bool
+    states: Dict[str, KeySketch]
+
+
+def write_partials(path: str, states: Dict[str, KeySketch], config: BaselineConfig) -> None:
+    """
+    Write per-key partial training state to a compact binary file.
+
+    All keys are written, including ones below min_samples: the threshold is applied
+    after merging, since a key can be sparse on every node yet sufficient overall.
+    """
+    flags = _FLAG_HOUR_OF_DAY if config.use_hour_of_day else 0
+    with open(path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(_HEADER.pack(flags, len(states)))
+        for s in states.values():
+            entity = s.key.entity_id.encode("utf-8")
+            metric = s.key.metric.encode("utf-8")
+            sketch = s.sketch.to_bytes()
+            hour = -1 if s.key.hour_of_day is None else s.key.hour_of_day
+            f.write(
+                _RECORD.pack(
+                    len(entity),
+                    len(metric),
+                    hour,
+                    s.count,
+                    s.start_us,
+                    s.start_offset,
+                    s.end_us,
+                    s.end_offset,
+                    len(sketch),
+                )
+            )
+            f.write(entity)
+            f.write(metric)
+            f.write(sketch)
+
+
+def _read_exact(f: BinaryIO, n: int, path: str) -> bytes:
+    data = f.read(n)
+    if len(data) != n:
+        raise ValueError(f"Truncated partials file: {path}")
+    return data
+
+
+def read_partials(path: str) -> PartialsFile:
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"Not a baseline partials file: {path}")
+        flags, count = _HEADER.unpack(_read_exact(f, _HEADER.size, path))
+
+        states: Dict[str, KeySketch] = {}
+        for _ in range(count):
+            (
+                entity_len,
+                metric_len,
+                hour,
+                n,
+                start_us,
+                start_offset,
+                end_us,
+                end_offset,
+                sketch_len,
+            ) = _RECORD.unpack(_read_exact(f, _RECORD.size, path))
+            key = BaselineKey(
+                entity_id=_read_exact(f, entity_len, path).decode("utf-8"),
+                metric=_read_exact(f, metric_len, path).decode("utf-8"),
+                hour_of_day=None if hour < 0 else hour,
+            )
+            states[key.as_str()] = KeySketch(
+                key=key,
+                sketch=KLLSketch.from_bytes(_read_exact(f, sketch_len, path)),
+                count=n,
+                start_us=start_us,
+                start_offset=start_offset,
+                end_us=end_us,
+                end_offset=end_offset,
+            )
+
+    return PartialsFile(use_hour_of_day=bool(flags & _FLAG_HOUR_OF_DAY), states=states)
+
+
+def merge_partial_files(paths: Iterable[str], config: BaselineConfig) -> Dict[str, KeySketch]:
+    """
+    Merge partial files (in the given order) into one state per key.
+
+    Exact partials merge into exactly the state a single training run over the combined
+    input would build; sketch partials stay within the sketch's documented rank error.
+    """
+    merged: Dict[str, KeySketch] = {}
+    for path in paths:
+        part = read_partials(path)
+        if part.use_hour_of_day != config.use_hour_of_day:
+            raise ValueError(
+                f"Partials file {path} was built with use_hour_of_day={part.use_hour_of_day}, "
+                f"but merging with use_hour_of_day={config.use_hour_of_day}"
+            )
+        merge_sketches(merged, part.states)
+    return merged
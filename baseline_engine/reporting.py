@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
 
 from baseline_engine.baseline import key_from_event
+from baseline_engine.batch import EventBatch
 from baseline_engine.config import BaselineConfig
 from baseline_engine.models import AnomalyResult, Event
-from baseline_engine.scoring import score_event
+from baseline_engine.scoring import ScoredEvent, score_event_batch, score_value
+from baseline_engine.snapshot import BaselineSnapshot
 from baseline_engine.storage_sqlite import BaselineStore
 
 
@@ -19,30 +21,64 @@ class ReportStats:
 
 
 def score_events_with_store(
-    events: List[Event],
+    events: Union[Iterable[Event], EventBatch],
     store: BaselineStore,
     config: BaselineConfig,
+    *,
+    only_anomalies: bool = False,
 ) -> Tuple[List[AnomalyResult], ReportStats]:
-    results: List[AnomalyResult] = []
+    """
+    Score events against the latest stored baselines.
+
+    `events` is consumed once, so a streaming iterator works. With only_anomalies=True,
+    normal results are counted but not kept, which bounds memory by the anomaly count
+    rather than the input size (the report only ever looks at anomalies).
+    """
+    results, stats = score_events_lazy_with_store(events, store, config, only_anomalies=only_anomalies)
+    return [r.to_result() for r in results], stats
+
+
+def score_events_lazy_with_store(
+    events: Union[Iterable[Event], EventBatch],
+    store: BaselineStore,
+    config: BaselineConfig,
+    *,
+    only_anomalies: bool = False,
+) -> Tuple[List[ScoredEvent], ReportStats]:
+    """
+    Like score_events_with_store(), but keeps ScoredEvents (explanations are only
+    rendered, and batch rows only turned into Events, when looked at).
+    """
+    if isinstance(events, EventBatch):
+        return score_batches_lazy_with_store([events], store, config, only_anomalies=only_anomalies)
+
+    # Each distinct key is looked up once, not once per event.
+    baselines = BaselineSnapshot.load(store, key_strs=())
+
+    results: List[ScoredEvent] = []
+    total = 0
     scored = 0
     skipped = 0
     anomalies = 0
 
     for e in events:
+        total += 1
         key_str = key_from_event(e, config).as_str()
-        baseline = store.get_latest(key_str)
+        baseline = baselines.get_latest(key_str)
         if baseline is None:
             skipped += 1
             continue
 
-        r = score_event(e, baseline, config)
-        results.append(r)
+        score, is_anomaly = score_value(e.value, baseline, config)
         scored += 1
-        if r.is_anomaly:
+        if is_anomaly:
             anomalies += 1
+        elif only_anomalies:
+            continue
+        results.append(ScoredEvent(e, baseline, score, is_anomaly))
 
     stats = ReportStats(
-        total_events=len(events),
+        total_events=total,
         scored=scored,
         skipped_no_baseline=skipped,
         anomalies=anomalies,
@@ -50,29 +86,89 @@ def score_events_with_store(
     return results, stats
 
 
-def aggregate_anomalies_by_entity(results: List[AnomalyResult]) -> Dict[str, int]:
+def score_batches_with_store(
+    batches: Iterable[EventBatch],
+    store: BaselineStore,
+    config: BaselineConfig,
+    *,
+    only_anomalies: bool = False,
+) -> Tuple[List[AnomalyResult], ReportStats]:
+    """
+    Columnar counterpart of score_events_with_store().
+    """
+    results, stats = score_batches_lazy_with_store(batches, store, config, only_anomalies=only_anomalies)
+    return [r.to_result() for r in results], stats
+
+
+def score_batches_lazy_with_store(
+    batches: Iterable[EventBatch],
+    store: BaselineStore,
+    config: BaselineConfig,
+    *,
+    only_anomalies: bool = False,
+) -> Tuple[List[ScoredEvent], ReportStats]:
+    """
+    Columnar counterpart of score_events_lazy_with_store().
+
+    Event objects are only built for kept rows whose event is actually looked at.
+    """
+    baselines = BaselineSnapshot.load(store, key_strs=())
+    results: List[ScoredEvent] = []
+    total = 0
+    scored = 0
+    skipped = 0
+    anomalies = 0
+
+    for batch in batches:
+        total += len(batch)
+        scores = score_event_batch(batch, baselines, config)
+        missing = len(scores.skipped_rows())
+        skipped += missing
+        scored += len(batch) - missing
+
+        flagged = scores.anomaly_rows()
+        anomalies += len(flagged)
+        for i in flagged if only_anomalies else scores.scored_rows():
+            results.append(scores.scored(i))
+
+    stats = ReportStats(
+        total_events=total,
+        scored=scored,
+        skipped_no_baseline=skipped,
+        anomalies=anomalies,
+    )
+    return results, stats
+
+
+# Results are ScoredEvents or AnomalyResults; both expose the same attributes.
+Results = Sequence[Union[ScoredEvent, AnomalyResult]]
+
+
+def aggregate_anomalies_by_entity(results: Results) -> Dict[str, int]:
     counts: Dict[str, int] = {}
     for r in results:
         if not r.is_anomaly:
             continue
-        ent = r.event.entity_id
+        # Same as r.event.entity_id, without materializing the event.
+        ent = r.baseline.key.entity_id
         counts[ent] = counts.get(ent, 0) + 1
     return dict(sorted(counts.items(), key=lambda x: (-x[1], x[0])))
 
 
-def aggregate_anomalies_by_hour(results: List[AnomalyResult], *, enabled: bool) -> Dict[int, int]:
+def aggregate_anomalies_by_hour(results: Results, *, enabled: bool) -> Dict[int, int]:
     if not enabled:
         return {}
     counts: Dict[int, int] = {}
     for r in results:
         if not r.is_anomaly:
             continue
-        h = r.event.timestamp.hour
+        # With hour-of-day bucketing on, the key's hour is the event's wall-clock hour.
+        h = r.baseline.key.hour_of_day
         counts[h] = counts.get(h, 0) + 1
     return dict(sorted(counts.items(), key=lambda x: x[0]))
 
 
-def top_anomalies(results: List[AnomalyResult], n: int = 10) -> List[AnomalyResult]:
+def top_anomalies(results: Results, n: int = 10) -> List[Union[ScoredEvent, AnomalyResult]]:
     anoms = [r for r in results if r.is_anomaly]
     anoms.sort(key=lambda r: r.score, reverse=True)
     return anoms[:n]
@@ -86,7 +182,7 @@ def render_markdown_report(
     stats: ReportStats,
     by_entity: Dict[str, int],
     by_hour: Dict[int, int],
-    top: List[AnomalyResult],
+    top: Results,
 ) -> str:
     scored_rate = (stats.scored / stats.total_events * 100.0) if stats.total_events else 0.0
     anomaly_rate = (stats.anomalies / stats.scored * 100.0) if stats.scored else 0.0
@@ -1,7 +1,31 @@
 from __future__ import annotations
 
+import math
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from baseline_engine.batch import EventBatch
+from baseline_engine.cache import BaselineCache
 from baseline_engine.config import BaselineConfig
 from baseline_engine.models import AnomalyResult, BaselineStats, Event
+from baseline_engine.snapshot import BaselineSnapshot
+from baseline_engine.snapshot_file import MappedSnapshot
+from baseline_engine.storage_sqlite import BaselineStore
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without the optional extra
+    np = None
+
+BaselineSource = Union[BaselineStore, BaselineSnapshot, BaselineCache, MappedSnapshot]
+
+
+def score_value(value: float, baseline: BaselineStats, config: BaselineConfig) -> Tuple[float, bool]:
+    """
+    Distance of a raw value from "normal", in MAD units, plus the anomaly decision.
+    """
+    score = abs(value - baseline.median) / baseline.mad
+    return score, score >= config.mad_threshold
 
 
 def score_event(
@@ -16,23 +40,269 @@ def score_event(
     """
 
     # Distance from "normal", expressed in MAD units
-    deviation = abs(event.value - baseline.median)
-    score = deviation / baseline.mad
-
-    is_anomaly = score >= config.mad_threshold
-
-    direction = "above" if event.value > baseline.median else "below"
-
-    explanation = (
-        f"Value {event.value:.2f} is {score:.2f} MAD {direction} "
-        f"baseline median {baseline.median:.2f} "
-        f"for {baseline.key.as_str()}"
-    )
+    score, is_anomaly = score_value(event.value, baseline, config)
 
     return AnomalyResult(
         event=event,
         baseline=baseline,
         score=score,
         is_anomaly=is_anomaly,
-        explanation=explanation,
+        explanation=render_explanation(event.value, score, baseline),
+    )
+
+
+def render_explanation(value: float, score: float, baseline: BaselineStats) -> str:
+    direction = "above" if value > baseline.median else "below"
+    return (
+        f"Value {value:.2f} is {score:.2f} MAD {direction} "
+        f"baseline median {baseline.median:.2f} "
+        f"for {baseline.key.as_str()}"
     )
+
+
+class ScoredEvent:
+    """
+    Lightweight scoring outcome: the score, the flag and references to the event and
+    baseline. The explanation string is only rendered when asked for, and an event that
+    came from an EventBatch is only materialized when .event is accessed.
+
+    Exposes the same attributes as AnomalyResult; to_result() converts for JSON output.
+    """
+
+    __slots__ = ("_event", "_batch", "_row", "baseline", "score", "is_anomaly")
+
+    def __init__(self, event: Optional[Event], baseline: BaselineStats, score: float, is_anomaly: bool) -> None:
+        self._event = event
+        self._batch: Optional[EventBatch] = None
+        self._row = -1
+        self.baseline = baseline
+        self.score = score
+        self.is_anomaly = is_anomaly
+
+    @classmethod
+    def from_row(
+        cls,
+        batch: EventBatch,
+        row: int,
+        baseline: BaselineStats,
+        score: float,
+        is_anomaly: bool,
+    ) -> "ScoredEvent":
+        scored = cls(None, baseline, score, is_anomaly)
+        scored._batch = batch
+        scored._row = row
+        return scored
+
+    @property
+    def event(self) -> Event:
+        if self._event is None:
+            self._event = self._batch.event(self._row)
+        return self._event
+
+    @property
+    def value(self) -> float:
+        if self._event is None:
+            return self._batch.values[self._row]
+        return self._event.value
+
+    @property
+    def explanation(self) -> str:
+        return render_explanation(self.value, self.score, self.baseline)
+
+    def to_result(self) -> AnomalyResult:
+        return AnomalyResult(
+            event=self.event,
+            baseline=self.baseline,
+            score=self.score,
+            is_anomaly=self.is_anomaly,
+            explanation=self.explanation,
+        )
+
+    def __repr__(self) -> str:
+        return f"ScoredEvent(key={self.baseline.key.as_str()!r}, score={self.score!r}, is_anomaly={self.is_anomaly!r})"
+
+
+def score_event_lazy(event: Event, baseline: BaselineStats, config: BaselineConfig) -> ScoredEvent:
+    """
+    Like score_event(), but returns a ScoredEvent (no explanation string, no model).
+    """
+    score, is_anomaly = score_value(event.value, baseline, config)
+    return ScoredEvent(event, baseline, score, is_anomaly)
+
+
+class RowScore(NamedTuple):
+    """
+    Outcome for one EventBatch row. baseline is None when the row was skipped.
+    """
+
+    row: int
+    key_str: str
+    baseline: Optional[BaselineStats]
+    score: float
+    is_anomaly: bool
+
+
+def _resolve_batch(
+    batch: EventBatch,
+    store: BaselineSource,
+    config: BaselineConfig,
+) -> Tuple[List[int], List[str], List[Optional[BaselineStats]]]:
+    """
+    Per-row group index, plus each group's key string and baseline (None if missing).
+
+    Key strings are built once per distinct key in the batch, and all of the batch's
+    baselines are resolved with a single get_latest_many() call.
+    """
+    group_of: Dict[Tuple[int, int, int], int] = {}
+    groups: List[int] = []
+    key_strs: List[str] = []
+    for i, codes in enumerate(batch.key_codes(config)):
+        g = group_of.get(codes)
+        if g is None:
+            g = group_of[codes] = len(key_strs)
+            key_strs.append(batch.key(i, config).as_str())
+        groups.append(g)
+
+    found = store.get_latest_many(key_strs)
+    return groups, key_strs, [found.get(k) for k in key_strs]
+
+
+def iter_batch_scores(
+    batch: EventBatch,
+    store: BaselineSource,
+    config: BaselineConfig,
+) -> Iterator[RowScore]:
+    """
+    Score every row of an EventBatch without building Event objects.
+
+    Key strings and baselines are resolved once per distinct key in the batch.
+    Use score_event(batch.event(i), ...) for the rows you actually need to render.
+    """
+    groups, key_strs, baselines = _resolve_batch(batch, store, config)
+    values = batch.values
+
+    for i, g in enumerate(groups):
+        key_str, baseline = key_strs[g], baselines[g]
+        if baseline is None:
+            yield RowScore(i, key_str, None, float("nan"), False)
+            continue
+
+        score, is_anomaly = score_value(values[i], baseline, config)
+        yield RowScore(i, key_str, baseline, score, is_anomaly)
+
+
+def score_batch(
+    values: Sequence[float],
+    medians: Sequence[float],
+    mads: Sequence[float],
+    config: BaselineConfig,
+) -> Tuple[Sequence[float], Sequence[int], Sequence[int]]:
+    """
+    Vectorized score_value() over aligned per-row columns.
+
+    Returns (scores, above, is_anomaly): MAD-unit scores, 1 where the value is above the
+    median, and 1 for anomalies. Rows whose median is NaN (no baseline) get a NaN score
+    and are never anomalous. Results are NumPy arrays when NumPy is installed (one pass
+    per column) and array.array columns otherwise; values match score_value() exactly,
+    and a zero MAD raises ZeroDivisionError on both paths, as it does there.
+    """
+    threshold = config.mad_threshold
+    if np is not None:
+        v = np.asarray(values, dtype=np.float64)
+        med = np.asarray(medians, dtype=np.float64)
+        mad = np.asarray(mads, dtype=np.float64)
+        if not mad.all():
+            # NumPy would quietly give inf (or NaN); score_value() raises.
+            raise ZeroDivisionError("float division by zero")
+        scores = np.abs(v - med) / mad
+        # NaN >= threshold is False, so rows without a baseline are never flagged.
+        return scores, (v > med).astype(np.int8), (scores >= threshold).astype(np.int8)
+
+    scores = array("d", [abs(v - m) / d for v, m, d in zip(values, medians, mads)])
+    above = array("b", [v > m for v, m in zip(values, medians)])
+    flags = array("b", [s >= threshold for s in scores])
+    return scores, above, flags
+
+
+class BatchScores:
+    """
+    Scores for every row of one EventBatch, kept as compact columns.
+
+    Nothing per row is materialized until asked for: scored(i) wraps one row in a
+    ScoredEvent, and result(i) builds the full AnomalyResult for just the rows you render.
+    """
+
+    def __init__(
+        self,
+        batch: EventBatch,
+        config: BaselineConfig,
+        groups: Sequence[int],
+        key_strs: List[str],
+        baselines: List[Optional[BaselineStats]],
+    ) -> None:
+        self.batch = batch
+        self.config = config
+        self._groups = groups
+        self._key_strs = key_strs
+        self._baselines = baselines
+
+        nan = math.nan
+        group_medians = [b.median if b is not None else nan for b in baselines]
+        group_mads = [b.mad if b is not None else 1.0 for b in baselines]
+        if np is not None:
+            g = np.asarray(groups, dtype=np.intp)
+            medians = np.asarray(group_medians, dtype=np.float64)[g]
+            mads = np.asarray(group_mads, dtype=np.float64)[g]
+            values = np.frombuffer(batch.values, dtype=np.float64)
+        else:
+            medians = array("d", [group_medians[g] for g in groups])
+            mads = array("d", [group_mads[g] for g in groups])
+            values = batch.values
+
+        self.has_baseline = [b is not None for b in baselines]
+        self.scores, self.above, self.is_anomaly = score_batch(values, medians, mads, config)
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def key_str(self, i: int) -> str:
+        return self._key_strs[self._groups[i]]
+
+    def baseline(self, i: int) -> Optional[BaselineStats]:
+        return self._baselines[self._groups[i]]
+
+    def scored_rows(self) -> List[int]:
+        has = self.has_baseline
+        return [i for i, g in enumerate(self._groups) if has[g]]
+
+    def skipped_rows(self) -> List[int]:
+        has = self.has_baseline
+        return [i for i, g in enumerate(self._groups) if not has[g]]
+
+    def anomaly_rows(self) -> List[int]:
+        if np is not None:
+            return np.flatnonzero(self.is_anomaly).tolist()
+        return [i for i, flag in enumerate(self.is_anomaly) if flag]
+
+    def scored(self, i: int) -> ScoredEvent:
+        """
+        ScoredEvent for row i (which must have a baseline).
+        """
+        baseline = self.baseline(i)
+        if baseline is None:
+            raise ValueError(f"Row {i} has no baseline ({self.key_str(i)})")
+        return ScoredEvent.from_row(self.batch, i, baseline, float(self.scores[i]), bool(self.is_anomaly[i]))
+
+    def result(self, i: int) -> AnomalyResult:
+        """
+        Full AnomalyResult for row i (which must have a baseline).
+        """
+        return self.scored(i).to_result()
+
+
+def score_event_batch(batch: EventBatch, store: BaselineSource, config: BaselineConfig) -> BatchScores:
+    """
+    Resolve baselines for a whole EventBatch and score it in one vectorized pass.
+    """
+    groups, key_strs, baselines = _resolve_batch(batch, store, config)
+    return BatchScores(batch, config, groups, key_strs, baselines)
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from baseline_engine.batch import EventBatch
+from baseline_engine.cache import DEFAULT_NEGATIVE_TTL, BaselineCache
+from baseline_engine.config import BaselineConfig
+from baseline_engine.ingest import _BadJSONLine, _parse_range, _plan_ranges, _resolve_input
+from baseline_engine.output import ResultWriter
+from baseline_engine.scoring import score_event_batch
+from baseline_engine.snapshot import BaselineSnapshot
+from baseline_engine.snapshot_file import MappedSnapshot
+from baseline_engine.storage_sqlite import BaselineStore
+
+BaselineView = Union[BaselineSnapshot, BaselineCache, MappedSnapshot]
+
+
+@dataclass(frozen=True)
+class BaselineViewSpec:
+    """
+    Picklable recipe for a read-only baseline view, so every scoring process can open
+    its own: a memory-mapped snapshot file, an LRU cache over the store, or a lazy
+    snapshot pinned to one generation (fully loaded up front with preload=True).
+
+    The store is expected to be initialized already (open() never migrates it).
+    """
+
+    db_path: str
+    snapshot_file: Optional[str] = None
+    cache_size: Optional[int] = None
+    negative_ttl: float = DEFAULT_NEGATIVE_TTL
+    generation: Optional[int] = None
+    preload: bool = False
+
+    def open(self) -> BaselineView:
+        if self.snapshot_file is not None:
+            return MappedSnapshot(self.snapshot_file)
+        store = BaselineStore(self.db_path)
+        if self.cache_size is not None:
+            return BaselineCache(
+                store, max_size=self.cache_size, negative_ttl=self.negative_ttl, generation=self.generation
+            )
+        return BaselineSnapshot.load(store, key_strs=None if self.preload else (), generation=self.generation)
+
+
+@dataclass
+class ViewStats:
+    """
+    Lookup figures of one or more baseline views. Merging across worker processes sums
+    cache counters; snapshot sizes are per process, so the largest one is kept.
+    """
+
+    kind: str  # "cache" or "snapshot"
+    values: Tuple[int, ...] = ()
+
+    @classmethod
+    def of(cls, view: BaselineView) -> "ViewStats":
+        if isinstance(view, BaselineCache):
+            c = view.stats
+            return cls("cache", (c.hits, c.negative_hits, c.misses, c.evictions))
+        return cls("snapshot", (view.key_count, view.nbytes()))
+
+    def merge(self, other: "ViewStats") -> "ViewStats":
+        combine = max if self.kind == "snapshot" else sum
+        return ViewStats(self.kind, tuple(combine(pair) for pair in zip(self.values, other.values)))
+
+    def describe(self) -> str:
+        if self.kind == "cache":
+            hits, negative, misses, evictions = self.values
+            rate = hits / (hits + misses) * 100 if hits + misses else 0.0
+            return (
+                f"Baseline cache: hits={hits} (negative={negative}) misses={misses} "
+                f"evictions={evictions} | hit rate: {rate:.1f}%"
+            )
+        keys, nbytes = self.values
+        return f"Baseline snapshot: {keys} keys | {nbytes} bytes"
+
+
+@dataclass
+class ScoreCounts:
+    scored: int = 0
+    skipped: int = 0
+
+
+def write_batch_scores(
+    out: ResultWriter,
+    batch: EventBatch,
+    view: BaselineView,
+    config: BaselineConfig,
+    *,
+    only_anomalies: bool = False,
+    note: Optional[Callable[[str], None]] = None,
+) -> ScoreCounts:
+    """
+    Score one batch and write its results in row order.
+
+    With `note`, a "SKIP (no baseline)" line is passed to it for every skipped row, in
+    order with the results.
+    """
+    scores = score_event_batch(batch, view, config)
+    missing = scores.skipped_rows()
+    counts = ScoreCounts(scored=len(scores) - len(missing), skipped=len(missing))
+
+    rows = scores.anomaly_rows() if only_anomalies else scores.scored_rows()
+    if note is None or not missing:
+        out.write_rows(scores, rows)
+        return counts
+
+    for i in sorted(rows + missing):
+        if scores.baseline(i) is None:
+            note(f"SKIP (no baseline): {scores.key_str(i)}")
+        else:
+            out.write_rows(scores, (i,))
+    return counts
+
+
+@dataclass
+class _RangeResult:
+    text: str
+    notes: List[str]
+    n_lines: int
+    counts: ScoreCounts
+    pid: int = 0
+    stats: Optional[ViewStats] = None
+
+
+@dataclass(frozen=True)
+class _RangeTask:
+    config: BaselineConfig
+    fmt: str
+    only_anomalies: bool
+    # "inline": SKIP notes go into the result text; "collect": returned separately.
+    notes: Optional[str] = None
+
+
+def _score_range(
+    view: BaselineView,
+    task: _RangeTask,
+    path_str: str,
+    header: Optional[List[str]],
+    start: int,
+    end: int,
+) -> _RangeResult:
+    batch, n_lines = _parse_range(path_str, header, start, end)
+
+    buf = io.StringIO()
+    out = ResultWriter(buf, task.fmt, header=False, chunk_lines=1 << 30)
+    notes: List[str] = []
+    note = {"inline": out.write_line, "collect": notes.append}.get(task.notes)
+    counts = write_batch_scores(out, batch, view, task.config, only_anomalies=task.only_anomalies, note=note)
+    out.flush()
+    return _RangeResult(buf.getvalue(), notes, n_lines, counts)
+
+
+# Each pool process opens its own view once (see _init_worker) and reuses it for every range.
+_WORKER_VIEW: Optional[BaselineView] = None
+
+
+def _init_worker(spec: BaselineViewSpec) -> None:
+    global _WORKER_VIEW
+    _WORKER_VIEW = spec.open()
+
+
+def _score_range_in_worker(
+    task: _RangeTask,
+    path_str: str,
+    header: Optional[List[str]],
+    start: int,
+    end: int,
+) -> _RangeResult:
+    result = _score_range(_WORKER_VIEW, task, path_str, header, start, end)
+    # Counters are cumulative per process; the parent keeps the latest per pid.
+    result.pid = os.getpid()
+    result.stats = ViewStats.of(_WORKER_VIEW)
+    return result
+
+
+@dataclass
+class ParallelScoreResult:
+    counts: ScoreCounts = field(default_factory=ScoreCounts)
+    stats: Optional[ViewStats] = None
+    ranges: int = 0
+
+
+def score_file_parallel(
+    path_str: str,
+    spec: BaselineViewSpec,
+    config: BaselineConfig,
+    out: ResultWriter,
+    *,
+    workers: int,
+    only_anomalies: bool = False,
+    note: Optional[Callable[[str], None]] = None,
+    inline_notes: bool = False,
+) -> ParallelScoreResult:
+    """
+    Parse and score a file's newline-aligned byte ranges in a process pool.
+
+    Every worker holds its own read-only baseline view opened from `spec`, and sends
+    back its range already serialized; results are written in input order, with a
+    bounded number of ranges in flight. With `note`, SKIP lines are reported too,
+    either inside the output (inline_notes=True) or through `note` after each range.
+    """
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    path = _resolve_input(path_str)
+    header, ranges = _plan_ranges(path, workers)
+
+    task = _RangeTask(
+        config=config,
+        fmt=out.format,
+        only_anomalies=only_anomalies,
+        notes=None if note is None else ("inline" if inline_notes else "collect"),
+    )
+    result = ParallelScoreResult(ranges=len(ranges))
+    stats_by_pid: Dict[int, ViewStats] = {}
+    lines_before = 0 if header is None else 1
+
+    def consume(r: _RangeResult) -> None:
+        nonlocal lines_before
+        lines_before += r.n_lines
+        out.write_chunk(r.text)
+        for line in r.notes:
+            note(line)
+        result.counts.scored += r.counts.scored
+        result.counts.skipped += r.counts.skipped
+        if r.stats is not None:
+            stats_by_pid[r.pid] = r.stats
+
+    def bad_line(e: _BadJSONLine) -> ValueError:
+        return ValueError(f"Invalid JSON on line {lines_before + e.lineno} in {path}: {e.error}")
+
+    if len(ranges) <= 1:
+        # Not worth a process pool; score in-process with the same code path.
+        view = spec.open()
+        for start, end in ranges:
+            try:
+                consume(_score_range(view, task, str(path), header, start, end))
+            except _BadJSONLine as e:
+                raise bad_line(e) from None
+        result.stats = ViewStats.of(view)
+        return result
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(spec,))
+    try:
+        todo = iter(ranges)
+        pending = deque(
+            pool.submit(_score_range_in_worker, task, str(path), header, a, b) for a, b in islice(todo, workers * 2)
+        )
+        while pending:
+            fut = pending.popleft()
+            try:
+                r = fut.result()
+            except _BadJSONLine as e:
+                raise bad_line(e) from None
+
+            nxt = next(todo, None)
+            if nxt is not None:
+                pending.append(pool.submit(_score_range_in_worker, task, str(path), header, *nxt))
+            consume(r)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    for stats in stats_by_pid.values():
+        result.stats = stats if result.stats is None else result.stats.merge(stats)
+    return result
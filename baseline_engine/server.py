@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import signal
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from baseline_engine.batch import EventBatch
+from baseline_engine.config import BaselineConfig
+from baseline_engine.ingest import _append_row
+from baseline_engine.models import Event
+from baseline_engine.output import json_result_lines
+from baseline_engine.scoring import score_event_batch
+from baseline_engine.scoring_parallel import BaselineView
+
+DEFAULT_MAX_BATCH = 1024
+DEFAULT_MAX_DELAY_MS = 1.0
+
+_READ_CHUNK_BYTES = 1 << 16
+
+
+@dataclass
+class ServerStats:
+    connections: int = 0
+    events: int = 0
+    scored: int = 0
+    skipped: int = 0
+    errors: int = 0
+    batches: int = 0
+
+
+class ScoringServer:
+    """
+    Long-running scoring service over a Unix socket or a local TCP port.
+
+    Clients send events as JSONL and get exactly one JSON line back per input line, in
+    order: the AnomalyResult for scored events, {"skipped": true, "key": ...} when the
+    key has no baseline, or {"error": ...} for lines that are not a valid event.
+
+    Lines from all connections are pooled into micro-batches, scored in one vectorized
+    pass as soon as `max_batch` events are waiting or the oldest has waited `max_delay_ms`.
+    Baselines stay resident in `view` for the life of the server.
+    """
+
+    def __init__(
+        self,
+        view: BaselineView,
+        config: BaselineConfig,
+        *,
+        socket_path: Optional[str] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_delay_ms: float = DEFAULT_MAX_DELAY_MS,
+    ) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        if max_delay_ms < 0:
+            raise ValueError("max_delay_ms must be >= 0")
+        self.view = view
+        self.config = config
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self.stats = ServerStats()
+        # Set once the listener is bound (port then holds the actual TCP port).
+        self.ready = threading.Event()
+
+        self._pending: List[Tuple[asyncio.StreamWriter, bytes]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    @property
+    def address(self) -> str:
+        if self.socket_path is not None:
+            return f"unix:{self.socket_path}"
+        return f"{self.host}:{self.port}"
+
+    async def serve(self) -> None:
+        """
+        Accept connections until stop() is called.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        if self.socket_path is not None:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        else:
+            server = await asyncio.start_server(self._handle, host=self.host, port=self.port)
+            self.port = server.sockets[0].getsockname()[1]
+
+        if threading.current_thread() is threading.main_thread():
+            self._loop.add_signal_handler(signal.SIGTERM, self._stopping.set)
+
+        self.ready.set()
+        try:
+            async with server:
+                await self._stopping.wait()
+        finally:
+            self._flush()
+            if self.socket_path is not None and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def stop(self) -> None:
+        """
+        Ask a running server to shut down (safe to call from any thread).
+        """
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        partial = b""
+        try:
+            while True:
+                chunk = await reader.read(_READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                lines = (partial + chunk).split(b"\n")
+                partial = lines.pop()
+                for line in lines:
+                    if line.strip():
+                        self._submit(writer, line)
+                await writer.drain()
+
+            if partial.strip():
+                self._submit(writer, partial)
+            # The client is done sending: answer what it is still waiting for right away.
+            self._flush()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _submit(self, writer: asyncio.StreamWriter, line: bytes) -> None:
+        self._pending.append((writer, line))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = self._loop.call_later(self.max_delay, self._flush)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        self.stats.batches += 1
+        self.stats.events += len(pending)
+
+        # One response slot per input line; parse errors are answered in place. Any
+        # failure is caught (e.g. RecursionError on deeply nested JSON): one bad line
+        # must not abort the batch and leave every other client waiting.
+        responses: List[Optional[str]] = [None] * len(pending)
+        rows: List[int] = []
+        batch = EventBatch()
+        for slot, (_, line) in enumerate(pending):
+            try:
+                obj = json.loads(line)
+                if type(obj) is dict:
+                    _append_row(batch, obj)
+                else:
+                    batch.append_event(Event.model_validate(obj))
+            except Exception as e:
+                self.stats.errors += 1
+                responses[slot] = _error_line(e)
+                continue
+            rows.append(slot)
+
+        if rows:
+            try:
+                scores = score_event_batch(batch, self.view, self.config)
+                scored = scores.scored_rows()
+                answers = dict(zip(scored, json_result_lines(scores, scored)))
+                for i in scores.skipped_rows():
+                    answers[i] = json.dumps({"skipped": True, "key": scores.key_str(i)}) + "\n"
+            except Exception as e:
+                self.stats.errors += len(rows)
+                for slot in rows:
+                    responses[slot] = _error_line(e)
+            else:
+                self.stats.scored += len(scored)
+                self.stats.skipped += len(rows) - len(scored)
+                for i, line in answers.items():
+                    responses[rows[i]] = line
+
+        # One write per connection per batch, in input order.
+        out: Dict[asyncio.StreamWriter, List[str]] = {}
+        for (writer, _), response in zip(pending, responses):
+            out.setdefault(writer, []).append(response)
+        for writer, lines in out.items():
+            if not writer.is_closing():
+                writer.write("".join(lines).encode("utf-8"))
+
+
+def _error_line(e: Exception) -> str:
+    return json.dumps({"error": str(e) or type(e).__name__}) + "\n"
+
+
+def run_server(server: ScoringServer) -> None:
+    """
+    Run a ScoringServer in the current thread until interrupted or stopped.
+    """
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import math
+import random
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from baseline_engine.baseline import _utc_now, group_batch_rows
+from baseline_engine.batch import EventBatch, epoch_us_to_datetime
+from baseline_engine.config import BaselineConfig
+from baseline_engine.models import BaselineKey, BaselineStats
+
+# Empirical normalized rank error of a KLL sketch is about 1.65 / k (99% confidence).
+_KLL_ERROR_CONSTANT = 1.65
+
+DEFAULT_RANK_ERROR = 0.01
+
+# Serialized sketch layout: format version, k, n, level count; then per level a
+# uint32 item count followed by that many little-endian float64 values.
+_SKETCH_FORMAT = 1
+_SKETCH_HEADER = struct.Struct("<BIQH")
+_LEVEL_HEADER = struct.Struct("<I")
+
+
+def k_for_rank_error(rank_error: float) -> int:
+    """
+    Sketch size parameter needed for a target normalized rank error (e.g. 0.01 = 1%).
+    """
+    if not 0 < rank_error < 1:
+        raise ValueError("rank_error must be between 0 and 1")
+    return max(8, math.ceil(_KLL_ERROR_CONSTANT / rank_error))
+
+
+def weighted_median(items: Sequence[Tuple[float, int]]) -> float:
+    """
+    Median of a multiset given as (value, weight) pairs.
+
+    With all weights equal to 1 this is exactly statistics.median (the two middle values
+    are averaged for an even total weight).
+    """
+    if not items:
+        raise ValueError("weighted_median() requires at least one item")
+
+    ordered = sorted(items)
+    total = sum(w for _, w in ordered)
+    lo_rank = (total - 1) // 2
+    hi_rank = total // 2
+
+    lo: Optional[float] = None
+    seen = 0
+    for value, weight in ordered:
+        seen += weight
+        if lo is None and seen > lo_rank:
+            lo = value
+        if seen > hi_rank:
+            return value if lo == value else (lo + value) / 2
+    raise AssertionError("unreachable: ranks are within total weight")
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (Karnin, Lang & Liberty) with a fixed memory footprint.
+
+    Values live in a stack of compactors; level h holds items of weight 2**h. When the
+    sketch is full, the lowest full level is sorted and every other item (random offset)
+    is promoted one level up. Until the first compaction the sketch is exact.
+
+    k=None gives an exact "sketch" that never compacts (memory grows with the input);
+    it is used where merged results must be identical to training over all the data.
+    """
+
+    def __init__(self, k: Optional[int] = 200, *, seed: int = 0) -> None:
+        if k is not None and k < 2:
+            raise ValueError("k must be >= 2")
+        self.k = k
+        self.n = 0
+        self.compactors: List[List[float]] = [[]]
+        self._size = 0
+        self._max_size = self._capacity(0) if k is not None else math.inf
+        self._rng = random.Random(seed)
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.compactors) - h - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _grow(self) -> None:
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _compress(self) -> None:
+        for h in range(len(self.compactors)):
+            level = self.compactors[h]
+            if len(level) < self._capacity(h):
+                continue
+            if h + 1 >= len(self.compactors):
+                self._grow()
+
+            level.sort()
+            # An odd leftover stays at this level; the rest is halved into the next one.
+            keep = level[:1] if len(level) % 2 else []
+            pairs = level[len(keep):]
+            self.compactors[h + 1].extend(pairs[self._rng.random() < 0.5 :: 2])
+            self.compactors[h] = keep
+
+            self._size = sum(len(c) for c in self.compactors)
+            if self._size < self._max_size:
+                break
+
+    def update(self, value: float) -> None:
+        self.compactors[0].append(value)
+        self._size += 1
+        self.n += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def extend(self, values: Iterable[float]) -> None:
+        for v in values:
+            self.update(v)
+
+    def merge(self, other: "KLLSketch") -> None:
+        """
+        Fold another sketch into this one. Sketches built on different shards combine
+        into the same error guarantee as a single sketch over all of the data.
+        """
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for h, level in enumerate(other.compactors):
+            self.compactors[h].extend(level)
+        self.n += other.n
+        self._size = sum(len(c) for c in self.compactors)
+        while self._size >= self._max_size:
+            self._compress()
+
+    def to_bytes(self) -> bytes:
+        # k is stored as 0 for exact sketches.
+        parts = [_SKETCH_HEADER.pack(_SKETCH_FORMAT, self.k or 0, self.n, len(self.compactors))]
+        for level in self.compactors:
+            values = array("d", level)
+            if sys.byteorder == "big":
+                values.byteswap()
+            parts.append(_LEVEL_HEADER.pack(len(values)))
+            parts.append(values.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KLLSketch":
+        fmt, k, n, levels = _SKETCH_HEADER.unpack_from(data, 0)
+        if fmt != _SKETCH_FORMAT:
+            raise ValueError(f"Unsupported sketch format version: {fmt}")
+
+        sketch = cls(k or None, seed=n)
+        sketch.compactors = []
+        pos = _SKETCH_HEADER.size
+        for _ in range(levels):
+            (count,) = _LEVEL_HEADER.unpack_from(data, pos)
+            pos += _LEVEL_HEADER.size
+            values = array("d")
+            values.frombytes(data[pos : pos + 8 * count])
+            if sys.byteorder == "big":
+                values.byteswap()
+            pos += 8 * count
+            sketch.compactors.append(values.tolist())
+
+        sketch.n = n
+        sketch._size = sum(len(c) for c in sketch.compactors)
+        if sketch.k is not None:
+            sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch.compactors)))
+        return sketch
+
+    def weighted_items(self) -> List[Tuple[float, int]]:
+        return [(v, 1 << h) for h, level in enumerate(self.compactors) for v in level]
+
+    def retained(self) -> int:
+        return self._size
+
+    def median(self) -> float:
+        return weighted_median(self.weighted_items())
+
+    def mad(self, center: float) -> float:
+        """
+        Median absolute deviation around `center`, estimated from the retained items.
+
+        The CDF of |x - center| is a difference of two CDF values of x, so its rank
+        error is at most about twice the sketch's rank error.
+        """
+        return weighted_median([(abs(v - center), w) for v, w in self.weighted_items()])
+
+
+@dataclass
+class KeySketch:
+    """
+    Bounded-memory training state for one BaselineKey.
+
+    Count and training window are exact; median and MAD come from the sketch.
+    """
+
+    key: BaselineKey
+    sketch: KLLSketch
+    count: int = 0
+    start_us: int = 0
+    start_offset: int = 0
+    end_us: int = 0
+    end_offset: int = 0
+
+    def add_rows(self, batch: EventBatch, rows: Iterable[int]) -> None:
+        ts = batch.timestamps
+        for i in rows:
+            us = ts[i]
+            # Earliest keeps the first of ties, latest keeps the last (stable-sort semantics).
+            if self.count == 0 or us < self.start_us:
+                self.start_us, self.start_offset = us, batch.utc_offsets[i]
+            if self.count == 0 or us >= self.end_us:
+                self.end_us, self.end_offset = us, batch.utc_offsets[i]
+            self.count += 1
+            self.sketch.update(batch.values[i])
+
+    def merge(self, other: "KeySketch") -> None:
+        """
+        Fold in state built from later input (another file, shard or day).
+        """
+        if other.count == 0:
+            return
+        if self.count == 0 or other.start_us < self.start_us:
+            self.start_us, self.start_offset = other.start_us, other.start_offset
+        if self.count == 0 or other.end_us >= self.end_us:
+            self.end_us, self.end_offset = other.end_us, other.end_offset
+        self.count += other.count
+        self.sketch.merge(other.sketch)
+
+    def to_stats(self, config: BaselineConfig) -> Optional[BaselineStats]:
+        if self.count < config.min_samples:
+            return None
+
+        med = self.sketch.median()
+        mad = self.sketch.mad(med)
+        if mad < config.min_mad:
+            mad = float(config.min_mad)
+
+        return BaselineStats(
+            key=self.key,
+            median=med,
+            mad=mad,
+            sample_count=self.count,
+            training_start=epoch_us_to_datetime(self.start_us, self.start_offset),
+            training_end=epoch_us_to_datetime(self.end_us, self.end_offset),
+            created_at=_utc_now(),
+            version=1,
+        )
+
+
+def train_sketches(
+    batches: Union[EventBatch, Iterable[EventBatch]],
+    config: BaselineConfig,
+    *,
+    rank_error: Optional[float] = DEFAULT_RANK_ERROR,
+    into: Optional[Dict[str, KeySketch]] = None,
+) -> Dict[str, KeySketch]:
+    """
+    Build (or extend `into`) per-key sketches from one or more EventBatches.
+
+    Batches are consumed one at a time, so memory is bounded by the number of keys,
+    not the number of events. rank_error=None keeps every value (exact state).
+    """
+    if isinstance(batches, EventBatch):
+        batches = [batches]
+
+    k = k_for_rank_error(rank_error) if rank_error is not None else None
+    states: Dict[str, KeySketch] = into if into is not None else {}
+    for batch in batches:
+        for key_str, rows in group_batch_rows(batch, config).items():
+            state = states.get(key_str)
+            if state is None:
+                state = states[key_str] = KeySketch(key=batch.key(rows[0], config), sketch=KLLSketch(k))
+            state.add_rows(batch, rows)
+    return states
+
+
+def merge_sketches(target: Dict[str, KeySketch], other: Dict[str, KeySketch]) -> Dict[str, KeySketch]:
+    """
+    Merge per-key sketches from another shard into `target` (in place) and return it.
+    """
+    for key_str, state in other.items():
+        existing = target.get(key_str)
+        if existing is None:
+            target[key_str] = state
+        else:
+            existing.merge(state)
+    return target
+
+
+def baselines_from_sketches(states: Dict[str, KeySketch], config: BaselineConfig) -> List[BaselineStats]:
+    baselines: List[BaselineStats] = []
+    for state in states.values():
+        stats = state.to_stats(config)
+        if stats is not None:
+            baselines.append(stats)
+    return baselines
+
+
+def train_baselines_sketch(
+    batches: Union[EventBatch, Iterable[EventBatch]],
+    config: BaselineConfig,
+    *,
+    rank_error: float = DEFAULT_RANK_ERROR,
+) -> List[BaselineStats]:
+    """
+    Bounded-memory training: median and MAD are estimated from per-key KLL sketches.
+
+    The median is within `rank_error` (normalized rank) of the exact one and the MAD
+    within roughly twice that. Keys with fewer samples than the sketch size are exact.
+    """
+    return baselines_from_sketches(train_sketches(batches, config, rank_error=rank_error), config)
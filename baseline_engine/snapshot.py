@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+
+from baseline_engine.models import BaselineStats
+from baseline_engine.storage_sqlite import BaselineStore
+
+
+def _sizeof(obj: object, seen: Set[int]) -> int:
+    """
+    Approximate deep size of the objects a snapshot holds (models, dicts, scalars).
+    """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_sizeof(k, seen) + _sizeof(v, seen) for k, v in obj.items())
+    elif hasattr(obj, "__dict__") and not isinstance(obj, (str, datetime)):
+        size += _sizeof(obj.__dict__, seen)
+    return size
+
+
+class BaselineSnapshot:
+    """
+    In-memory index of the latest baseline per key, for scoring without a query per event.
+
+    A snapshot is either complete (every key in the store, loaded in one query) or
+    lazy: keys are fetched on demand with prefetch(), one query per group of new keys,
+    and keys without a baseline are remembered so they are not looked up again.
+    Lookups go through get_latest(), the same call BaselineStore offers.
+
+    A lazy snapshot is pinned to one generation (the current one when loaded), so keys
+    fetched while a training run publishes still come from a single, consistent run.
+    """
+
+    def __init__(
+        self,
+        baselines: Optional[Dict[str, BaselineStats]] = None,
+        *,
+        store: Optional[BaselineStore] = None,
+        complete: bool = True,
+        generation: Optional[int] = None,
+    ) -> None:
+        self._baselines: Dict[str, BaselineStats] = dict(baselines or {})
+        self._absent: Set[str] = set()
+        self._store = store
+        self.complete = complete
+        self.generation = generation
+
+    @classmethod
+    def load(
+        cls,
+        store: BaselineStore,
+        key_strs: Optional[Iterable[str]] = None,
+        *,
+        generation: Optional[int] = None,
+    ) -> "BaselineSnapshot":
+        """
+        Load every key (key_strs=None) or start a lazy snapshot primed with `key_strs`,
+        as of `generation` (default: the current one).
+        """
+        if generation is None:
+            generation = store.current_generation()
+        if key_strs is None:
+            return cls(store.latest_baselines(generation=generation), store=store, generation=generation)
+
+        snapshot = cls(store=store, complete=False, generation=generation)
+        snapshot.prefetch(key_strs)
+        return snapshot
+
+    def prefetch(self, key_strs: Iterable[str]) -> int:
+        """
+        Fetch the keys not seen yet in one query. Returns how many were looked up.
+        """
+        if self.complete or self._store is None:
+            return 0
+
+        missing = [k for k in dict.fromkeys(key_strs) if k not in self._baselines and k not in self._absent]
+        if not missing:
+            return 0
+
+        found = self._store.get_latest_many(missing, generation=self.generation)
+        self._baselines.update(found)
+        self._absent.update(k for k in missing if k not in found)
+        return len(missing)
+
+    def get_latest(self, key_str: str) -> Optional[BaselineStats]:
+        baseline = self._baselines.get(key_str)
+        if baseline is None and not self.complete:
+            self.prefetch([key_str])
+            baseline = self._baselines.get(key_str)
+        return baseline
+
+    def get_latest_many(self, key_strs: Iterable[str]) -> Dict[str, BaselineStats]:
+        keys = list(dict.fromkeys(key_strs))
+        self.prefetch(keys)
+        return {k: self._baselines[k] for k in keys if k in self._baselines}
+
+    def __contains__(self, key_str: str) -> bool:
+        return self.get_latest(key_str) is not None
+
+    def __len__(self) -> int:
+        return len(self._baselines)
+
+    @property
+    def key_count(self) -> int:
+        """
+        Number of keys with a loaded baseline.
+        """
+        return len(self._baselines)
+
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by the index (keys, baselines and negative entries).
+        """
+        seen: Set[int] = set()
+        return _sizeof(self._baselines, seen) + _sizeof(self._absent, seen) + sum(
+            _sizeof(k, seen) for k in self._absent
+        )
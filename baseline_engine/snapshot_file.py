@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from baseline_engine.batch import datetime_to_epoch_us, epoch_us_to_datetime
+from baseline_engine.models import BaselineKey, BaselineStats
+
+# File layout:
+#   header: magic, format version, record count, records offset, heap offset
+#   records: fixed-width, sorted by (64-bit key hash, key_str)
+#   heap: UTF-8 entity_id + metric bytes referenced by (offset, length) from each record
+#
+# Lookups binary-search the record array in place, so opening a file only maps it;
+# nothing is parsed until a key is looked up, and processes mapping the same file
+# share its pages through the OS page cache.
+_MAGIC = b"BBESNAP\x00"
+_FORMAT = 1
+_HEADER = struct.Struct("<8sHQQQ")
+
+# hash, heap offset, entity length, metric length, hour (-1 = None),
+# median, mad, sample_count, training_start (us, offset), training_end (us, offset),
+# created_at (us, offset), version
+_RECORD = struct.Struct("<QQIIiddQqiqiqiI")
+_HASH = struct.Struct("<Q")
+
+
+def key_hash(key_str: str) -> int:
+    """
+    Stable (process-independent) 64-bit hash of a key string.
+    """
+    return _HASH.unpack(hashlib.blake2b(key_str.encode("utf-8"), digest_size=8).digest())[0]
+
+
+def write_snapshot_file(path: str, baselines: Iterable[BaselineStats]) -> int:
+    """
+    Write baselines (one per key, e.g. BaselineStore.latest_baselines()) to `path`.
+
+    The file is written next to `path` and renamed into place, so readers never map a
+    partially written snapshot. Returns the number of records written.
+    """
+    entries: List[Tuple[int, str, BaselineStats]] = []
+    for b in baselines:
+        key_str = b.key.as_str()
+        entries.append((key_hash(key_str), key_str, b))
+    entries.sort(key=lambda e: (e[0], e[1]))
+
+    records_offset = _HEADER.size
+    heap_offset = records_offset + len(entries) * _RECORD.size
+
+    records = bytearray()
+    heap = bytearray()
+    for h, _, b in entries:
+        entity = b.key.entity_id.encode("utf-8")
+        metric = b.key.metric.encode("utf-8")
+        records += _RECORD.pack(
+            h,
+            len(heap),
+            len(entity),
+            len(metric),
+            -1 if b.key.hour_of_day is None else b.key.hour_of_day,
+            float(b.median),
+            float(b.mad),
+            int(b.sample_count),
+            *datetime_to_epoch_us(b.training_start),
+            *datetime_to_epoch_us(b.training_end),
+            *datetime_to_epoch_us(b.created_at),
+            int(b.version),
+        )
+        heap += entity
+        heap += metric
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _FORMAT, len(entries), records_offset, heap_offset))
+        f.write(records)
+        f.write(heap)
+    os.replace(tmp_path, path)
+    return len(entries)
+
+
+class MappedSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file written by write_snapshot_file().
+
+    Offers get_latest() / get_latest_many() like BaselineStore and BaselineSnapshot,
+    so it can be passed straight to the scoring functions.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"Not a baseline snapshot file: {path}")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, fmt, count, records_offset, heap_offset = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            self._mm.close()
+            raise ValueError(f"Not a baseline snapshot file: {path}")
+        if fmt != _FORMAT:
+            self._mm.close()
+            raise ValueError(f"Unsupported snapshot format version: {fmt}")
+
+        self._count = count
+        self._records = records_offset
+        self._heap = heap_offset
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __enter__(self) -> "MappedSnapshot":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def key_count(self) -> int:
+        return self._count
+
+    def nbytes(self) -> int:
+        """
+        Size of the mapped file (pages are shared, not copied, between processes).
+        """
+        return len(self._mm)
+
+    def _hash_at(self, i: int) -> int:
+        return _HASH.unpack_from(self._mm, self._records + i * _RECORD.size)[0]
+
+    def _key_at(self, fields: tuple) -> BaselineKey:
+        start = self._heap + fields[1]
+        mid = start + fields[2]
+        end = mid + fields[3]
+        return BaselineKey(
+            entity_id=self._mm[start:mid].decode("utf-8"),
+            metric=self._mm[mid:end].decode("utf-8"),
+            hour_of_day=None if fields[4] < 0 else fields[4],
+        )
+
+    def _baseline_at(self, key: BaselineKey, fields: tuple) -> BaselineStats:
+        return BaselineStats(
+            key=key,
+            median=fields[5],
+            mad=fields[6],
+            sample_count=fields[7],
+            training_start=epoch_us_to_datetime(fields[8], fields[9]),
+            training_end=epoch_us_to_datetime(fields[10], fields[11]),
+            created_at=epoch_us_to_datetime(fields[12], fields[13]),
+            version=fields[14],
+        )
+
+    def get_latest(self, key_str: str) -> Optional[BaselineStats]:
+        h = key_hash(key_str)
+
+        # Lower bound of h in the sorted hash column.
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._hash_at(mid) < h:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        # Walk the (almost always single) records sharing this hash.
+        i = lo
+        while i < self._count:
+            fields = _RECORD.unpack_from(self._mm, self._records + i * _RECORD.size)
+            if fields[0] != h:
+                break
+            key = self._key_at(fields)
+            if key.as_str() == key_str:
+                return self._baseline_at(key, fields)
+            i += 1
+        return None
+
+    def get_latest_many(self, key_strs: Iterable[str]) -> Dict[str, BaselineStats]:
+        found: Dict[str, BaselineStats] = {}
+        for key_str in dict.fromkeys(key_strs):
+            baseline = self.get_latest(key_str)
+            if baseline is not None:
+                found[key_str] = baseline
+        return found
+
+    def __iter__(self) -> Iterator[BaselineStats]:
+        for i in range(self._count):
+            fields = _RECORD.unpack_from(self._mm, self._records + i * _RECORD.size)
+            yield self._baseline_at(self._key_at(fields), fields)
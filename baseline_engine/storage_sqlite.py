@@ -1,203 +1,1222 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
+import json
+import os
 import sqlite3
+import struct
+import threading
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Iterable, List, Optional, Sequence
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
 
+from baseline_engine.batch import datetime_to_epoch_us, epoch_us_to_datetime
 from baseline_engine.models import BaselineKey, BaselineStats
+from baseline_engine.sketch import KeySketch, KLLSketch
 
+# Stay well under SQLite's bound-parameter limit for IN (...) lookups.
+_IN_CHUNK = 500
 
-def _dt_to_iso(dt: datetime) -> str:
-    # Store as ISO 8601 text for portability and readability.
-    return dt.isoformat()
+# Stored in PRAGMA user_version. Version 1 is the original layout (ISO text timestamps,
+# key strings repeated on every row); it predates user_version, so it reads as 0.
+# New DBs are created at version 2 and brought up to date by the migrations below.
+SCHEMA_VERSION = 6
 
+GENERATION_PUBLISHED = "published"
+GENERATION_ROLLED_BACK = "rolled_back"
 
-def _iso_to_dt(s: str) -> datetime:
-    # datetime.fromisoformat supports timezone offsets if present.
-    return datetime.fromisoformat(s)
+T = TypeVar("T")
+
+
+def _dt_to_us(dt: datetime) -> Tuple[int, int]:
+    # Integer UTC epoch microseconds plus the UTC offset, so timezones round-trip exactly.
+    return datetime_to_epoch_us(dt)
+
+
+def _us_to_dt(us: int, offset: int) -> datetime:
+    return epoch_us_to_datetime(us, offset)
+
+
+def _now_us() -> int:
+    return datetime_to_epoch_us(datetime.now(timezone.utc))[0]
+
+
+_CONTENT = struct.Struct("<ddq")
+_HASH = struct.Struct("<q")
+
+
+def _content_hash_values(median: float, mad: float, sample_count: int) -> int:
+    digest = hashlib.blake2b(_CONTENT.pack(median, mad, sample_count), digest_size=8).digest()
+    return _HASH.unpack(digest)[0]
+
+
+def content_hash(baseline: BaselineStats) -> int:
+    """
+    Signed 64-bit hash of what a baseline says (median, MAD, sample count), used to skip
+    re-publishing a key whose retrained baseline is identical to the stored one.
+    """
+    return _content_hash_values(float(baseline.median), float(baseline.mad), int(baseline.sample_count))
+
+
+def _chunks(items: Sequence[T], size: int = _IN_CHUNK) -> Iterator[Sequence[T]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _placeholders(n: int) -> str:
+    return ",".join("?" * n)
+
+
+_SCHEMA_V2 = (
+    # Key dimension: each BaselineKey is stored once; other tables refer to its id.
+    """
+    CREATE TABLE IF NOT EXISTS keys (
+        id INTEGER PRIMARY KEY,
+        key_str TEXT NOT NULL UNIQUE,
+        entity_id TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        hour_of_day INTEGER
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_keys_entity_metric ON keys(entity_id, metric);",
+    # Timestamps are UTC epoch microseconds plus the original UTC offset in seconds
+    # (batch.NAIVE for offset-less datetimes).
+    """
+    CREATE TABLE IF NOT EXISTS baselines (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        key_id INTEGER NOT NULL REFERENCES keys(id),
+
+        median REAL NOT NULL,
+        mad REAL NOT NULL,
+        sample_count INTEGER NOT NULL,
+
+        training_start_us INTEGER NOT NULL,
+        training_start_offset INTEGER NOT NULL,
+        training_end_us INTEGER NOT NULL,
+        training_end_offset INTEGER NOT NULL,
+
+        created_at_us INTEGER NOT NULL,
+        created_at_offset INTEGER NOT NULL,
+        version INTEGER NOT NULL,
+
+        UNIQUE(key_id, version, created_at_us)
+    );
+    """,
+    # Pointer to the newest baselines row per key, so latest lookups are a
+    # primary-key probe no matter how many versions have accumulated.
+    """
+    CREATE TABLE IF NOT EXISTS baselines_latest (
+        key_id INTEGER PRIMARY KEY REFERENCES keys(id),
+        baseline_id INTEGER NOT NULL REFERENCES baselines(id),
+        created_at_us INTEGER NOT NULL
+    );
+    """,
+    # Per-key sketch state, so `baseline update` can fold in new events
+    # without re-reading history. One row per key, replaced on every update.
+    """
+    CREATE TABLE IF NOT EXISTS training_state (
+        key_id INTEGER PRIMARY KEY REFERENCES keys(id),
+
+        sample_count INTEGER NOT NULL,
+        training_start_us INTEGER NOT NULL,
+        training_start_offset INTEGER NOT NULL,
+        training_end_us INTEGER NOT NULL,
+        training_end_offset INTEGER NOT NULL,
+
+        sketch BLOB NOT NULL,
+        updated_at_us INTEGER NOT NULL
+    );
+    """,
+    # Per-day, per-key partial aggregates for rolling-window baselines.
+    # day is a proleptic Gregorian ordinal (date.toordinal()).
+    """
+    CREATE TABLE IF NOT EXISTS daily_partials (
+        day INTEGER NOT NULL,
+        key_id INTEGER NOT NULL REFERENCES keys(id),
+
+        sample_count INTEGER NOT NULL,
+        training_start_us INTEGER NOT NULL,
+        training_start_offset INTEGER NOT NULL,
+        training_end_us INTEGER NOT NULL,
+        training_end_offset INTEGER NOT NULL,
+
+        sketch BLOB NOT NULL,
+        updated_at_us INTEGER NOT NULL,
+
+        PRIMARY KEY (day, key_id)
+    );
+    """,
+)
+
+
+_KEY_COLUMNS = "k.key_str, k.entity_id, k.metric, k.hour_of_day"
+
+_SELECT_BASELINES = f"""
+    SELECT {_KEY_COLUMNS}, b.* FROM baselines b
+    JOIN keys k ON k.id = b.key_id
+"""
+
+# "Latest" baseline per key: newest created_at, ties going to the row inserted last.
+# baselines_latest caches the answer; the statements below maintain it.
+_SELECT_LATEST = f"""
+    SELECT {_KEY_COLUMNS}, b.* FROM keys k
+    JOIN baselines_latest l ON l.key_id = k.id
+    JOIN baselines b ON b.id = l.baseline_id
+"""
+
+# As-of view for a pinned generation: per key, the latest row among published
+# generations up to and including the pinned one.
+_SELECT_PINNED = f"""
+    SELECT * FROM (
+        SELECT {_KEY_COLUMNS}, b.*, ROW_NUMBER() OVER (
+            PARTITION BY b.key_id ORDER BY b.created_at_us DESC, b.id DESC
+        ) AS rn
+        FROM keys k
+        JOIN baselines b ON b.key_id = k.id
+        JOIN generations g ON g.id = b.generation_id
+        WHERE g.status = '{GENERATION_PUBLISHED}' AND b.generation_id <= ?
+          AND (k.retired_generation IS NULL OR k.retired_generation > ? OR b.generation_id > k.retired_generation)
+          {{keys}}
+    )
+    WHERE rn = 1
+"""
+
+_INSERT_BASELINE = """
+    INSERT OR IGNORE INTO baselines (
+        key_id, median, mad, sample_count,
+        training_start_us, training_start_offset,
+        training_end_us, training_end_offset,
+        created_at_us, created_at_offset, version,
+        generation_id, content_hash
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+# Fold rows inserted after id ? into the pointers (only if they are newer).
+# The WHERE in the SELECT is required so SQLite parses ON CONFLICT as an upsert.
+_ADVANCE_LATEST_POINTERS = """
+    INSERT INTO baselines_latest (key_id, baseline_id, created_at_us)
+    SELECT key_id, id, created_at_us FROM baselines WHERE id > ? ORDER BY id
+    ON CONFLICT(key_id) DO UPDATE SET
+        baseline_id = excluded.baseline_id,
+        created_at_us = excluded.created_at_us
+    WHERE excluded.created_at_us > baselines_latest.created_at_us
+       OR (excluded.created_at_us = baselines_latest.created_at_us
+           AND excluded.baseline_id > baselines_latest.baseline_id)
+"""
+
+_UPSERT_TRAINING_STATE = """
+    INSERT OR REPLACE INTO training_state (
+        key_id, sample_count,
+        training_start_us, training_start_offset,
+        training_end_us, training_end_offset,
+        sketch, updated_at_us
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+
+_INSERT_DAILY_PARTIAL = """
+    INSERT OR REPLACE INTO daily_partials (
+        day, key_id, sample_count,
+        training_start_us, training_start_offset,
+        training_end_us, training_end_offset,
+        sketch, updated_at_us
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+
+def _refresh_latest_pointers(conn: sqlite3.Connection, key_ids: Optional[Sequence[int]] = None) -> None:
+    """
+    Recompute pointers from the baselines table (all keys, or only `key_ids`), e.g.
+    after a migration, a rollback or after rows were deleted. Rows of rolled-back
+    generations, and rows published before a key was retired, are never pointed at.
+    """
+    select = f"""
+        INSERT INTO baselines_latest (key_id, baseline_id, created_at_us)
+        SELECT key_id, id, created_at_us FROM (
+            SELECT b.key_id, b.id, b.created_at_us, ROW_NUMBER() OVER (
+                PARTITION BY b.key_id ORDER BY b.created_at_us DESC, b.id DESC
+            ) AS rn
+            FROM baselines b
+            JOIN keys k ON k.id = b.key_id
+            JOIN generations g ON g.id = b.generation_id
+            WHERE g.status = '{GENERATION_PUBLISHED}'
+              AND b.generation_id > COALESCE(k.retired_generation, 0) {{keys}}
+        )
+        WHERE rn = 1
+    """
+    if key_ids is None:
+        conn.execute("DELETE FROM baselines_latest")
+        conn.execute(select.format(keys=""))
+        return
+
+    for chunk in _chunks(list(key_ids)):
+        in_list = f"IN ({_placeholders(len(chunk))})"
+        conn.execute(f"DELETE FROM baselines_latest WHERE key_id {in_list}", tuple(chunk))
+        conn.execute(select.format(keys=f"AND b.key_id {in_list}"), tuple(chunk))
+
+
+def _check_pinnable(conn: sqlite3.Connection, generation: int) -> None:
+    if conn.execute("SELECT 1 FROM generations WHERE id = ? AND compacted", (generation,)).fetchone():
+        raise ValueError(f"Generation {generation} was compacted away and can no longer be pinned")
+
+
+def _latest_rows(
+    conn: sqlite3.Connection,
+    key_filter: str,
+    params: Tuple[object, ...],
+    generation: Optional[int],
+) -> List[sqlite3.Row]:
+    """
+    Latest rows for the keys matching `key_filter` (SQL on keys k), optionally as of a
+    pinned generation.
+
+    Pinned lookups still go through the pointers: a pointed-at row from the pinned
+    generation or earlier is also the as-of answer. Only keys republished or retired
+    after the pin fall back to the (key, generation) range query.
+    """
+    where = f" WHERE {key_filter}" if key_filter else ""
+    rows = conn.execute(_SELECT_LATEST + where, params).fetchall()
+    if generation is None:
+        return rows
+    _check_pinnable(conn, generation)
+
+    current = [r for r in rows if r["generation_id"] <= generation]
+    newer = [r["key_str"] for r in rows if r["generation_id"] > generation]
+    newer.extend(
+        r["key_str"]
+        for r in conn.execute(
+            f"""
+            SELECT k.key_str FROM keys k
+            WHERE {f"{key_filter} AND " if key_filter else ""}k.retired_generation > ?
+              AND k.id NOT IN (SELECT key_id FROM baselines_latest)
+            """,
+            (*params, generation),
+        ).fetchall()
+    )
+    for chunk in _chunks(newer):
+        current.extend(
+            conn.execute(
+                _SELECT_PINNED.format(keys=f"AND k.key_str IN ({_placeholders(len(chunk))})"),
+                (generation, generation, *chunk),
+            ).fetchall()
+        )
+    return current
+
+
+def _intern_keys(conn: sqlite3.Connection, keys: Iterable[BaselineKey]) -> Dict[str, int]:
+    """
+    key_str -> keys.id for every key, inserting the ones not stored yet.
+    """
+    by_str = {k.as_str(): k for k in keys}
+    conn.executemany(
+        "INSERT OR IGNORE INTO keys (key_str, entity_id, metric, hour_of_day) VALUES (?, ?, ?, ?)",
+        [(s, k.entity_id, k.metric, k.hour_of_day) for s, k in by_str.items()],
+    )
+    return _key_ids(conn, list(by_str))
+
+
+def _key_ids(conn: sqlite3.Connection, key_strs: Sequence[str]) -> Dict[str, int]:
+    ids: Dict[str, int] = {}
+    for chunk in _chunks(key_strs):
+        rows = conn.execute(
+            f"SELECT id, key_str FROM keys WHERE key_str IN ({_placeholders(len(chunk))})",
+            tuple(chunk),
+        ).fetchall()
+        ids.update((r["key_str"], int(r["id"])) for r in rows)
+    return ids
+
+
+def _baseline_row(b: BaselineStats, key_id: int, generation: int) -> tuple:
+    return (
+        key_id,
+        float(b.median),
+        float(b.mad),
+        int(b.sample_count),
+        *_dt_to_us(b.training_start),
+        *_dt_to_us(b.training_end),
+        *_dt_to_us(b.created_at),
+        int(b.version),
+        generation,
+        content_hash(b),
+    )
+
+
+def _key_sketch_row(s: KeySketch, key_id: int, now_us: int) -> tuple:
+    # Column order shared by training_state and daily_partials (after the day column).
+    return (
+        key_id,
+        int(s.count),
+        s.start_us,
+        s.start_offset,
+        s.end_us,
+        s.end_offset,
+        s.sketch.to_bytes(),
+        now_us,
+    )
+
+
+def _row_key(row: sqlite3.Row) -> BaselineKey:
+    return BaselineKey(entity_id=row["entity_id"], metric=row["metric"], hour_of_day=row["hour_of_day"])
+
+
+def _row_to_key_sketch(row: sqlite3.Row) -> KeySketch:
+    return KeySketch(
+        key=_row_key(row),
+        sketch=KLLSketch.from_bytes(row["sketch"]),
+        count=int(row["sample_count"]),
+        start_us=int(row["training_start_us"]),
+        start_offset=int(row["training_start_offset"]),
+        end_us=int(row["training_end_us"]),
+        end_offset=int(row["training_end_offset"]),
+    )
+
+
+def _schema_version(conn: sqlite3.Connection) -> int:
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version == 0:
+        legacy = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'baselines'"
+        ).fetchone()
+        return 1 if legacy is not None else 0
+    return int(version)
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+    return row is not None
+
+
+def _iso_to_us(s: str) -> Tuple[int, int]:
+    return _dt_to_us(datetime.fromisoformat(s))
+
+
+def _migrate_v1_to_v2(conn: sqlite3.Connection) -> None:
+    """
+    ISO text timestamps -> integer epoch microseconds, key strings -> keys.id.
+
+    Old tables are renamed aside, their rows converted into the v2 tables (baseline
+    ids are kept, so insertion order and "latest" ties are preserved) and then dropped.
+    """
+    conn.execute("DROP TABLE IF EXISTS baselines_latest")
+    legacy = [t for t in ("baselines", "training_state", "daily_partials") if _table_exists(conn, t)]
+    for table in legacy:
+        conn.execute(f"ALTER TABLE {table} RENAME TO {table}_v1")
+    # Old indexes follow their table; drop them so v2 can reuse the names.
+    for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name LIKE '%_v1' AND sql IS NOT NULL"
+    ).fetchall():
+        conn.execute(f"DROP INDEX {name}")
+    for statement in _SCHEMA_V2:
+        conn.execute(statement)
+
+    def intern(rows: List[sqlite3.Row]) -> Dict[str, int]:
+        return _intern_keys(conn, [_row_key(r) for r in rows])
+
+    if "baselines" in legacy:
+        rows = conn.execute("SELECT * FROM baselines_v1 ORDER BY id").fetchall()
+        ids = intern(rows)
+        conn.executemany(
+            """
+            INSERT INTO baselines (
+                id, key_id, median, mad, sample_count,
+                training_start_us, training_start_offset,
+                training_end_us, training_end_offset,
+                created_at_us, created_at_offset, version
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+            """,
+            [
+                (
+                    r["id"],
+                    ids[r["key_str"]],
+                    r["median"],
+                    r["mad"],
+                    r["sample_count"],
+                    *_iso_to_us(r["training_start"]),
+                    *_iso_to_us(r["training_end"]),
+                    *_iso_to_us(r["created_at"]),
+                    r["version"],
+                )
+                for r in rows
+            ],
+        )
+
+    def sketch_rows(rows: List[sqlite3.Row]) -> List[tuple]:
+        ids = intern(rows)
+        return [
+            (
+                ids[r["key_str"]],
+                r["sample_count"],
+                *_iso_to_us(r["training_start"]),
+                *_iso_to_us(r["training_end"]),
+                r["sketch"],
+                _iso_to_us(r["updated_at"])[0],
+            )
+            for r in rows
+        ]
+
+    if "training_state" in legacy:
+        rows = conn.execute("SELECT * FROM training_state_v1").fetchall()
+        conn.executemany(_UPSERT_TRAINING_STATE, sketch_rows(rows))
+
+    if "daily_partials" in legacy:
+        rows = conn.execute("SELECT * FROM daily_partials_v1").fetchall()
+        days = [date.fromisoformat(r["day"]).toordinal() for r in rows]
+        conn.executemany(
+            _INSERT_DAILY_PARTIAL,
+            [(d,) + row for d, row in zip(days, sketch_rows(rows))],
+        )
+
+    for table in legacy:
+        conn.execute(f"DROP TABLE {table}_v1")
+
+
+def _migrate_v2_to_v3(conn: sqlite3.Connection) -> None:
+    """
+    Add training-run generations. Rows already stored become one published generation.
+    """
+    conn.execute(
+        f"""
+        CREATE TABLE generations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at_us INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT '{GENERATION_PUBLISHED}',
+            label TEXT,
+            baseline_count INTEGER NOT NULL DEFAULT 0
+        );
+        """
+    )
+    conn.execute("ALTER TABLE baselines ADD COLUMN generation_id INTEGER NOT NULL DEFAULT 0")
+
+    (count,) = conn.execute("SELECT COUNT(*) FROM baselines").fetchone()
+    if count:
+        cur = conn.execute(
+            "INSERT INTO generations (created_at_us, label, baseline_count) VALUES (?, 'migrated', ?)",
+            (_now_us(), count),
+        )
+        conn.execute("UPDATE baselines SET generation_id = ?", (cur.lastrowid,))
+
+    conn.execute("CREATE INDEX idx_baselines_generation_key ON baselines(generation_id, key_id)")
+
+
+def _migrate_v3_to_v4(conn: sqlite3.Connection) -> None:
+    """
+    Add content hashes (backfilled for existing rows) and re-validation tracking.
+    """
+    conn.execute("ALTER TABLE baselines ADD COLUMN content_hash INTEGER")
+    conn.execute("ALTER TABLE baselines ADD COLUMN validated_at_us INTEGER")
+    conn.execute("ALTER TABLE baselines ADD COLUMN validated_generation INTEGER")
+    conn.execute("ALTER TABLE generations ADD COLUMN unchanged_count INTEGER NOT NULL DEFAULT 0")
+
+    conn.create_function("baseline_content_hash", 3, _content_hash_values, deterministic=True)
+    conn.execute("UPDATE baselines SET content_hash = baseline_content_hash(median, mad, sample_count)")
+
+
+def _migrate_v4_to_v5(conn: sqlite3.Connection) -> None:
+    """
+    Track key retirement: a retired key resolves to no baseline until it is published again.
+    """
+    conn.execute("ALTER TABLE keys ADD COLUMN retired_generation INTEGER")
+
+
+def _migrate_v5_to_v6(conn: sqlite3.Connection) -> None:
+    """
+    Mark generations whose as-of view was pruned by compact() (no longer pinnable).
+    """
+    conn.execute("ALTER TABLE generations ADD COLUMN compacted INTEGER NOT NULL DEFAULT 0")
+
+
+# from_version -> step that upgrades a DB to from_version + 1.
+_MIGRATIONS = {
+    1: _migrate_v1_to_v2,
+    2: _migrate_v2_to_v3,
+    3: _migrate_v3_to_v4,
+    4: _migrate_v4_to_v5,
+    5: _migrate_v5_to_v6,
+}
 
 
 @dataclass(frozen=True)
 class SQLiteConfig:
     path: str = "baselines.db"
 
+    # WAL lets one writer (train/update) and many readers (score) share the DB.
+    journal_mode: str = "WAL"
+    # NORMAL is durable across application crashes in WAL mode, and avoids an fsync per commit.
+    synchronous: str = "NORMAL"
+    # How long a connection waits on a lock held by another process before failing.
+    busy_timeout_ms: int = 5000
+    # Page cache per connection (KiB) and memory-mapped I/O window (bytes).
+    cache_size_kib: int = 64 * 1024
+    mmap_size_bytes: int = 256 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Generation:
+    """
+    One publish (training run) into the store.
+    """
+
+    id: int
+    created_at: datetime
+    status: str
+    label: Optional[str]
+    baseline_count: int
+    unchanged_count: int
+    # Pruned by compact(): can no longer be pinned or rolled back to.
+    compacted: bool = False
+
+
+@dataclass(frozen=True)
+class PublishResult:
+    """
+    Outcome of insert_many(): rows written, and keys re-validated without a new row.
+    """
+
+    generation: int
+    written: int
+    unchanged: int
+
+
+@dataclass(frozen=True)
+class CompactionResult:
+    pruned: int
+    keys: int
+    archive_path: Optional[str]
+    bytes_before: int
+    bytes_after: int
+    # Oldest generation that can still be pinned or rolled back to (None: nothing pruned
+    # that an older generation resolved to).
+    horizon: Optional[int] = None
+
+    @property
+    def reclaimed(self) -> int:
+        return self.bytes_before - self.bytes_after
+
 
 class BaselineStore:
     """
     SQLite-backed baseline artifact store.
+
+    Each thread gets one long-lived, pre-configured connection which is reused by every
+    call, so per-event lookups don't pay for a connect + pragma round trip.
     """
 
-    def __init__(self, db_path: str = "baselines.db") -> None:
+    def __init__(self, db_path: str = "baselines.db", *, config: Optional[SQLiteConfig] = None) -> None:
         self.db_path = db_path
+        self.config = config or SQLiteConfig(path=db_path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[Tuple[int, sqlite3.Connection]] = []
 
     def connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+        """
+        The calling thread's connection (opened on first use).
+
+        Used as `with store.connect() as conn:`, which commits or rolls back but keeps
+        the connection open. Connections are never shared across threads, and a forked
+        child process opens its own instead of reusing the parent's.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        pid = os.getpid()
+        conn = self._open()
+        self._local.conn = conn
+        self._local.pid = pid
+        with self._lock:
+            self._connections.append((pid, conn))
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        cfg = self.config
+        conn = sqlite3.connect(self.db_path, timeout=cfg.busy_timeout_ms / 1000)
         conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(cfg.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA journal_mode = {cfg.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {cfg.synchronous}")
+        conn.execute(f"PRAGMA cache_size = {-int(cfg.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size = {int(cfg.mmap_size_bytes)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
         return conn
 
+    def close(self) -> None:
+        """
+        Close every connection this store opened (in any thread of this process).
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+        pid = os.getpid()
+        for owner, conn in connections:
+            # Connections inherited across fork() belong to the parent; just drop them.
+            if owner == pid:
+                conn.close()
+        self._local = threading.local()
+
+    def __enter__(self) -> "BaselineStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
     def init_db(self) -> None:
+        """
+        Create the schema, or upgrade an existing DB to SCHEMA_VERSION in one transaction.
+
+        An up-to-date DB is detected with a plain read, so readers (score, serve, ...)
+        never wait on the write lock held by a concurrent train.
+        """
+        conn = self.connect()
+        if self._check_schema_version(conn) == SCHEMA_VERSION:
+            return
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Another process may have migrated while we waited for the lock.
+            version = self._check_schema_version(conn)
+            if version == SCHEMA_VERSION:
+                return
+            if version == 0:
+                for statement in _SCHEMA_V2:
+                    conn.execute(statement)
+                version = 2
+            while version < SCHEMA_VERSION:
+                _MIGRATIONS[version](conn)
+                version += 1
+            _refresh_latest_pointers(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _check_schema_version(self, conn: sqlite3.Connection) -> int:
+        version = _schema_version(conn)
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(
+                f"{self.db_path} uses schema version {version}; this build supports up to {SCHEMA_VERSION}"
+            )
+        return version
+
+    def schema_version(self) -> int:
         with self.connect() as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS baselines (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+            return _schema_version(conn)
 
-                    key_str TEXT NOT NULL,
-                    entity_id TEXT NOT NULL,
-                    metric TEXT NOT NULL,
-                    hour_of_day INTEGER,
+    def insert_baseline(self, baseline: BaselineStats) -> None:
+        self.insert_many([baseline])
 
-                    median REAL NOT NULL,
-                    mad REAL NOT NULL,
-                    sample_count INTEGER NOT NULL,
+    def insert_many(
+        self,
+        baselines: Iterable[BaselineStats],
+        *,
+        training_state: Iterable[KeySketch] = (),
+        label: Optional[str] = None,
+        dedup: bool = True,
+        retire: Iterable[str] = (),
+    ) -> PublishResult:
+        """
+        Publish baselines as a new generation, plus (optionally) the training state they
+        were built from. Keys in `retire` stop resolving to a baseline as of this
+        generation (until a later one publishes them again).
 
-                    training_start TEXT NOT NULL,
-                    training_end TEXT NOT NULL,
+        With dedup, a baseline whose content hash equals its key's current latest one is
+        not written again; that row is marked as re-validated by this generation instead.
+        Everything is written in one transaction, so readers see either none or all of
+        the generation, and state and published baselines never drift.
+        """
+        baselines = list(baselines)
+        states = list(training_state)
+        retired = list(dict.fromkeys(retire))
+        now_us = _now_us()
 
-                    created_at TEXT NOT NULL,
-                    version INTEGER NOT NULL,
+        with self.connect() as conn:
+            generation = conn.execute(
+                "INSERT INTO generations (created_at_us, label) VALUES (?, ?)", (now_us, label)
+            ).lastrowid
+            ids = _intern_keys(conn, [b.key for b in baselines] + [s.key for s in states])
 
-                    UNIQUE(key_str, version, created_at)
-                );
-                """
-            )
-            conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_baselines_key_str ON baselines(key_str);"
-            )
+            current: Dict[int, Tuple[int, Optional[int]]] = {}
+            if dedup:
+                key_ids = list(dict.fromkeys(ids[b.key.as_str()] for b in baselines))
+                for chunk in _chunks(key_ids):
+                    current.update(
+                        (r["key_id"], (r["id"], r["content_hash"]))
+                        for r in conn.execute(
+                            f"""
+                            SELECT l.key_id, b.id, b.content_hash FROM baselines_latest l
+                            JOIN baselines b ON b.id = l.baseline_id
+                            WHERE l.key_id IN ({_placeholders(len(chunk))})
+                            """,
+                            tuple(chunk),
+                        ).fetchall()
+                    )
+
+            rows = []
+            unchanged: List[int] = []
+            for b in baselines:
+                row = _baseline_row(b, ids[b.key.as_str()], generation)
+                latest = current.get(row[0])
+                if latest is not None and latest[1] == row[-1]:
+                    unchanged.append(latest[0])
+                else:
+                    rows.append(row)
+
+            (last_id,) = conn.execute("SELECT COALESCE(MAX(id), 0) FROM baselines").fetchone()
+            written = conn.executemany(_INSERT_BASELINE, rows).rowcount if rows else 0
+            conn.execute(_ADVANCE_LATEST_POINTERS, (last_id,))
+            for chunk in _chunks(unchanged):
+                conn.execute(
+                    f"""
+                    UPDATE baselines SET validated_at_us = ?, validated_generation = ?
+                    WHERE id IN ({_placeholders(len(chunk))})
+                    """,
+                    (now_us, generation, *chunk),
+                )
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_baselines_entity_metric ON baselines(entity_id, metric);"
+                "UPDATE generations SET baseline_count = ?, unchanged_count = ? WHERE id = ?",
+                (written, len(unchanged), generation),
             )
+            retired_ids = list(_key_ids(conn, retired).values())
+            for chunk in _chunks(retired_ids):
+                in_list = f"IN ({_placeholders(len(chunk))})"
+                conn.execute(f"UPDATE keys SET retired_generation = ? WHERE id {in_list}", (generation, *chunk))
+                conn.execute(f"DELETE FROM baselines_latest WHERE key_id {in_list}", tuple(chunk))
+            if states:
+                conn.executemany(
+                    _UPSERT_TRAINING_STATE,
+                    [_key_sketch_row(s, ids[s.key.as_str()], now_us) for s in states],
+                )
             conn.commit()
+        return PublishResult(generation=generation, written=written, unchanged=len(unchanged))
 
-    def insert_baseline(self, baseline: BaselineStats) -> None:
-        k = baseline.key
-        key_str = k.as_str()
+    def current_generation(self) -> Optional[int]:
+        """
+        Newest published generation, or None for an empty store.
+        """
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT MAX(id) AS id FROM generations WHERE status = ?", (GENERATION_PUBLISHED,)
+            ).fetchone()
+        return row["id"]
 
+    def check_pinnable(self, generation: int) -> None:
+        """
+        Raise ValueError if lookups can no longer be pinned to `generation` (see compact()).
+        """
         with self.connect() as conn:
-            conn.execute(
-                """
-                INSERT OR IGNORE INTO baselines (
-                    key_str, entity_id, metric, hour_of_day,
-                    median, mad, sample_count,
-                    training_start, training_end,
-                    created_at, version
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
-                """,
-                (
-                    key_str,
-                    k.entity_id,
-                    k.metric,
-                    k.hour_of_day,
-                    float(baseline.median),
-                    float(baseline.mad),
-                    int(baseline.sample_count),
-                    _dt_to_iso(baseline.training_start),
-                    _dt_to_iso(baseline.training_end),
-                    _dt_to_iso(baseline.created_at),
-                    int(baseline.version),
-                ),
+            _check_pinnable(conn, generation)
+
+    def list_generations(self) -> List[Generation]:
+        with self.connect() as conn:
+            rows = conn.execute("SELECT * FROM generations ORDER BY id ASC").fetchall()
+        return [
+            Generation(
+                id=r["id"],
+                created_at=_us_to_dt(r["created_at_us"], 0),
+                status=r["status"],
+                label=r["label"],
+                baseline_count=r["baseline_count"],
+                unchanged_count=r["unchanged_count"],
+                compacted=bool(r["compacted"]),
             )
-            conn.commit()
+            for r in rows
+        ]
 
-    def insert_many(self, baselines: Iterable[BaselineStats]) -> None:
-        rows = []
-        for b in baselines:
-            k = b.key
-            rows.append(
-                (
-                    k.as_str(),
-                    k.entity_id,
-                    k.metric,
-                    k.hour_of_day,
-                    float(b.median),
-                    float(b.mad),
-                    int(b.sample_count),
-                    _dt_to_iso(b.training_start),
-                    _dt_to_iso(b.training_end),
-                    _dt_to_iso(b.created_at),
-                    int(b.version),
+    def rollback(self, generation: int) -> List[int]:
+        """
+        Make `generation` current again by marking every later published generation as
+        rolled back. Returns the rolled-back generation ids.
+
+        Rows are kept (a rolled-back generation is just never resolved), so only the
+        latest pointers of the keys those generations touched are recomputed. Keys they
+        retired are restored. Training state used by `baseline update` is not versioned
+        and is left as is.
+        """
+        with self.connect() as conn:
+            row = conn.execute("SELECT status, compacted FROM generations WHERE id = ?", (generation,)).fetchone()
+            if row is None or row["status"] != GENERATION_PUBLISHED:
+                raise ValueError(f"Generation {generation} does not exist or is not published")
+            if row["compacted"]:
+                raise ValueError(f"Generation {generation} was compacted away and can no longer be restored")
+
+            later = [
+                r["id"]
+                for r in conn.execute(
+                    "SELECT id FROM generations WHERE id > ? AND status = ? ORDER BY id",
+                    (generation, GENERATION_PUBLISHED),
+                ).fetchall()
+            ]
+            key_ids: set = set()
+            for chunk in _chunks(later):
+                in_list = f"IN ({_placeholders(len(chunk))})"
+                conn.execute(
+                    f"UPDATE generations SET status = ? WHERE id {in_list}",
+                    (GENERATION_ROLLED_BACK, *chunk),
                 )
-            )
+                key_ids.update(
+                    r["key_id"]
+                    for r in conn.execute(
+                        f"""
+                        SELECT key_id FROM baselines WHERE generation_id {in_list}
+                        UNION SELECT id FROM keys WHERE retired_generation {in_list}
+                        """,
+                        (*chunk, *chunk),
+                    ).fetchall()
+                )
+                conn.execute(
+                    f"UPDATE keys SET retired_generation = NULL WHERE retired_generation {in_list}", tuple(chunk)
+                )
+            _refresh_latest_pointers(conn, sorted(key_ids))
+            conn.commit()
+        return later
 
+    def _db_bytes(self) -> int:
         with self.connect() as conn:
-            conn.executemany(
-                """
-                INSERT OR IGNORE INTO baselines (
-                    key_str, entity_id, metric, hour_of_day,
-                    median, mad, sample_count,
-                    training_start, training_end,
-                    created_at, version
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+            (pages,) = conn.execute("PRAGMA page_count").fetchone()
+            (page_size,) = conn.execute("PRAGMA page_size").fetchone()
+        return int(pages) * int(page_size)
+
+    def compact(
+        self,
+        *,
+        keep_last: Optional[int] = None,
+        older_than: Optional[datetime] = None,
+        archive_path: Optional[str] = None,
+        vacuum: bool = True,
+    ) -> CompactionResult:
+        """
+        Prune old baseline versions, optionally archiving them first, then reclaim space.
+
+        A row is pruned only when every given rule allows it: it is not among its key's
+        `keep_last` newest published versions, and/or it was created before `older_than`.
+        The current latest baseline of a key is never pruned; rows of rolled-back
+        generations are never resolved, so they don't count toward `keep_last`. Pruned
+        rows are appended to `archive_path` as gzip-compressed JSONL before they are deleted.
+
+        Older generations resolved some of the pruned rows, so every generation before
+        the first one whose as-of view is still complete is marked compacted: pinning or
+        rolling back to it raises ValueError instead of silently losing keys.
+        """
+        if keep_last is None and older_than is None:
+            raise ValueError("compact() needs keep_last and/or older_than")
+        if keep_last is not None and keep_last < 1:
+            raise ValueError("keep_last must be >= 1")
+
+        conditions = ["id NOT IN (SELECT baseline_id FROM baselines_latest)"]
+        params: List[object] = []
+        if keep_last is not None:
+            conditions.append("(rn IS NULL OR rn > ?)")
+            params.append(keep_last)
+        if older_than is not None:
+            conditions.append("created_at_us < ?")
+            params.append(_dt_to_us(older_than)[0])
+
+        bytes_before = self._db_bytes()
+        with self.connect() as conn:
+            # superseded_by: generation of the next newer published row of the key (or
+            # the one that retired it); a row is the as-of answer up to just before it.
+            rows = conn.execute(
+                f"""
+                SELECT id, key_id, superseded_by FROM (
+                    SELECT b.id, b.key_id, b.created_at_us, ROW_NUMBER() OVER w AS rn,
+                        COALESCE(LAG(b.generation_id) OVER w, k.retired_generation) AS superseded_by
+                    FROM baselines b
+                    JOIN generations g ON g.id = b.generation_id
+                    JOIN keys k ON k.id = b.key_id
+                    WHERE g.status = '{GENERATION_PUBLISHED}'
+                    WINDOW w AS (PARTITION BY b.key_id ORDER BY b.created_at_us DESC, b.id DESC)
+                    UNION ALL
+                    SELECT b.id, b.key_id, b.created_at_us, NULL, NULL
+                    FROM baselines b
+                    JOIN generations g ON g.id = b.generation_id
+                    WHERE g.status != '{GENERATION_PUBLISHED}'
+                )
+                WHERE {" AND ".join(conditions)}
+                ORDER BY id
                 """,
-                rows,
-            )
+                params,
+            ).fetchall()
+            ids = [r["id"] for r in rows]
+            key_ids = sorted({r["key_id"] for r in rows})
+            horizon = max((r["superseded_by"] for r in rows if r["superseded_by"] is not None), default=None)
+
+            if archive_path is not None and ids:
+                with gzip.open(archive_path, "at", encoding="utf-8") as f:
+                    for chunk in _chunks(ids):
+                        for r in conn.execute(
+                            f"{_SELECT_BASELINES} WHERE b.id IN ({_placeholders(len(chunk))}) ORDER BY b.id",
+                            tuple(chunk),
+                        ):
+                            record = self._row_to_baseline(r).model_dump(mode="json")
+                            record["generation"] = r["generation_id"]
+                            f.write(json.dumps(record) + "\n")
+
+            for chunk in _chunks(ids):
+                conn.execute(f"DELETE FROM baselines WHERE id IN ({_placeholders(len(chunk))})", tuple(chunk))
+            if horizon is not None:
+                conn.execute("UPDATE generations SET compacted = 1 WHERE id < ?", (horizon,))
             conn.commit()
 
+        if vacuum:
+            conn = self.connect()
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        bytes_after = self._db_bytes()
+        if vacuum:
+            # Planner statistics for the rebuilt file (a few pages, not part of the reclaim).
+            self.connect().execute("ANALYZE")
+
+        return CompactionResult(
+            pruned=len(ids),
+            keys=len(key_ids),
+            archive_path=archive_path if ids else None,
+            bytes_before=bytes_before,
+            bytes_after=bytes_after,
+            horizon=horizon,
+        )
+
     def list_baselines(self, key_str: Optional[str] = None) -> List[BaselineStats]:
-        query = "SELECT * FROM baselines"
+        query = _SELECT_BASELINES
         params: Sequence[object] = ()
         if key_str is not None:
-            query += " WHERE key_str = ?"
+            query += " WHERE k.key_str = ?"
             params = (key_str,)
-        query += " ORDER BY created_at ASC"
+        query += " ORDER BY b.created_at_us ASC, b.id ASC"
 
         with self.connect() as conn:
             rows = conn.execute(query, params).fetchall()
 
         return [self._row_to_baseline(r) for r in rows]
 
-    def get_latest(self, key_str: str) -> Optional[BaselineStats]:
+    def get_latest(self, key_str: str, *, generation: Optional[int] = None) -> Optional[BaselineStats]:
+        """
+        Latest baseline for a key, or the one current as of a pinned `generation`.
+        """
         with self.connect() as conn:
-            row = conn.execute(
-                """
-                SELECT * FROM baselines
-                WHERE key_str = ?
-                ORDER BY created_at DESC
-                LIMIT 1
-                """,
-                (key_str,),
-            ).fetchone()
+            rows = _latest_rows(conn, "k.key_str = ?", (key_str,), generation)
+
+        return self._row_to_baseline(rows[0]) if rows else None
+
+    def latest_baselines(
+        self,
+        key_strs: Optional[Iterable[str]] = None,
+        *,
+        generation: Optional[int] = None,
+    ) -> Dict[str, BaselineStats]:
+        """
+        Latest baseline per key, for every key or only `key_strs` (see get_latest_many()).
+        """
+        if key_strs is not None:
+            return self.get_latest_many(key_strs, generation=generation)
+        with self.connect() as conn:
+            rows = _latest_rows(conn, "", (), generation)
+        return {r["key_str"]: self._row_to_baseline(r) for r in rows}
+
+    def get_latest_many(
+        self,
+        key_strs: Iterable[str],
+        *,
+        generation: Optional[int] = None,
+    ) -> Dict[str, BaselineStats]:
+        """
+        Batched get_latest(); keys without baselines are omitted.
 
-        return self._row_to_baseline(row) if row is not None else None
+        Up to _IN_CHUNK keys go in one IN (...) query; larger sets are loaded into a
+        temp table and resolved with a single join against the latest pointers, so
+        thousands of keys cost one round trip instead of one query each.
+        """
+        keys = list(dict.fromkeys(key_strs))
+        if not keys:
+            return {}
+
+        with self.connect() as conn:
+            if len(keys) <= _IN_CHUNK:
+                rows = _latest_rows(conn, f"k.key_str IN ({_placeholders(len(keys))})", tuple(keys), generation)
+            else:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS lookup_keys (key_str TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM temp.lookup_keys")
+                conn.executemany("INSERT INTO temp.lookup_keys (key_str) VALUES (?)", [(k,) for k in keys])
+                rows = _latest_rows(conn, "k.key_str IN (SELECT key_str FROM temp.lookup_keys)", (), generation)
+                conn.execute("DELETE FROM temp.lookup_keys")
+
+        return {r["key_str"]: self._row_to_baseline(r) for r in rows}
 
     def list_keys(self) -> List[str]:
         with self.connect() as conn:
             rows = conn.execute(
                 """
-                SELECT DISTINCT key_str
-                FROM baselines
-                ORDER BY key_str ASC
+                SELECT k.key_str
+                FROM baselines_latest l
+                JOIN keys k ON k.id = l.key_id
+                ORDER BY k.key_str ASC
                 """
             ).fetchall()
         return [r["key_str"] for r in rows]
 
+    def keys_published_by(self, label: str) -> List[str]:
+        """
+        Keys whose latest baseline was last published (or re-validated) by a generation
+        with this label.
+        """
+        with self.connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT k.key_str
+                FROM baselines_latest l
+                JOIN keys k ON k.id = l.key_id
+                JOIN baselines b ON b.id = l.baseline_id
+                JOIN generations g ON g.id = COALESCE(b.validated_generation, b.generation_id)
+                WHERE g.label = ?
+                ORDER BY k.key_str ASC
+                """,
+                (label,),
+            ).fetchall()
+        return [r["key_str"] for r in rows]
+
     def count_by_key(self) -> List[tuple[str, int]]:
         with self.connect() as conn:
             rows = conn.execute(
                 """
-                SELECT key_str, COUNT(*) as cnt
-                FROM baselines
-                GROUP BY key_str
-                ORDER BY key_str ASC
+                SELECT k.key_str, COUNT(*) as cnt
+                FROM baselines b
+                JOIN keys k ON k.id = b.key_id
+                GROUP BY b.key_id
+                ORDER BY k.key_str ASC
                 """
             ).fetchall()
         return [(r["key_str"], int(r["cnt"])) for r in rows]
 
-    def _row_to_baseline(self, row: sqlite3.Row) -> BaselineStats:
-        key = BaselineKey(
-            entity_id=row["entity_id"],
-            metric=row["metric"],
-            hour_of_day=row["hour_of_day"],
-        )
+    def latest_versions(self, key_strs: Iterable[str]) -> Dict[str, int]:
+        """
+        Highest stored version per key (keys without baselines are omitted).
+        """
+        keys = list(dict.fromkeys(key_strs))
+        versions: Dict[str, int] = {}
+        with self.connect() as conn:
+            for chunk in _chunks(keys):
+                rows = conn.execute(
+                    f"""
+                    SELECT k.key_str, MAX(b.version) AS version
+                    FROM keys k
+                    JOIN baselines b ON b.key_id = k.id
+                    WHERE k.key_str IN ({_placeholders(len(chunk))})
+                    GROUP BY k.id
+                    """,
+                    tuple(chunk),
+                ).fetchall()
+                versions.update((r["key_str"], int(r["version"])) for r in rows)
+        return versions
+
+    def save_training_state(self, states: Iterable[KeySketch]) -> None:
+        states = list(states)
+        now_us = _now_us()
+        with self.connect() as conn:
+            ids = _intern_keys(conn, [s.key for s in states])
+            conn.executemany(
+                _UPSERT_TRAINING_STATE,
+                [_key_sketch_row(s, ids[s.key.as_str()], now_us) for s in states],
+            )
+            conn.commit()
+
+    def keys_without_training_state(self, key_strs: Iterable[str]) -> List[str]:
+        """
+        Keys whose latest baseline is not described by their stored training state: there
+        is no state, or the baseline was published after it (e.g. by a rolling or
+        merge-partials run). Folding new events into such state would drop history.
+        """
+        keys = list(dict.fromkeys(key_strs))
+        stale: List[str] = []
+        with self.connect() as conn:
+            for chunk in _chunks(keys):
+                rows = conn.execute(
+                    f"""
+                    SELECT k.key_str
+                    FROM keys k
+                    JOIN baselines_latest l ON l.key_id = k.id
+                    LEFT JOIN training_state t ON t.key_id = k.id
+                    WHERE k.key_str IN ({_placeholders(len(chunk))})
+                      AND (t.key_id IS NULL OR t.updated_at_us < l.created_at_us)
+                    """,
+                    chunk,
+                ).fetchall()
+                stale.extend(r["key_str"] for r in rows)
+        return stale
+
+    def load_training_state(self, key_strs: Optional[Iterable[str]] = None) -> Dict[str, KeySketch]:
+        """
+        Load persisted per-key training state, for all keys or only `key_strs`.
+        """
+        query = f"SELECT {_KEY_COLUMNS}, t.* FROM training_state t JOIN keys k ON k.id = t.key_id"
+        with self.connect() as conn:
+            if key_strs is None:
+                rows = conn.execute(query).fetchall()
+            else:
+                keys = list(dict.fromkeys(key_strs))
+                rows = []
+                for chunk in _chunks(keys):
+                    rows.extend(
+                        conn.execute(
+                            f"{query} WHERE k.key_str IN ({_placeholders(len(chunk))})",
+                            tuple(chunk),
+                        ).fetchall()
+                    )
+
+        return {r["key_str"]: _row_to_key_sketch(r) for r in rows}
+
+    def replace_daily_partials(self, partials: Dict[Tuple[date, str], KeySketch]) -> None:
+        """
+        Store per-day, per-key partial aggregates.
 
+        Every day present in `partials` is replaced wholesale, so re-running a day's
+        input is idempotent (each input should therefore contain whole days).
+        """
+        now_us = _now_us()
+        days = sorted({d.toordinal() for d, _ in partials})
+
+        with self.connect() as conn:
+            ids = _intern_keys(conn, [s.key for s in partials.values()])
+            rows = [
+                (d.toordinal(),) + _key_sketch_row(s, ids[key_str], now_us)
+                for (d, key_str), s in partials.items()
+            ]
+            conn.executemany("DELETE FROM daily_partials WHERE day = ?", [(d,) for d in days])
+            conn.executemany(_INSERT_DAILY_PARTIAL, rows)
+            conn.commit()
+
+    def latest_partial_day(self) -> Optional[date]:
+        with self.connect() as conn:
+            row = conn.execute("SELECT MAX(day) AS day FROM daily_partials").fetchone()
+        return date.fromordinal(row["day"]) if row["day"] is not None else None
+
+    def expire_daily_partials(self, before: date) -> int:
+        """
+        Delete partitions older than `before`. Returns the number of rows removed.
+        """
+        with self.connect() as conn:
+            cur = conn.execute("DELETE FROM daily_partials WHERE day < ?", (before.toordinal(),))
+            conn.commit()
+            return cur.rowcount
+
+    def load_daily_partials(self, start: date, end: date) -> List[Tuple[date, KeySketch]]:
+        """
+        Partitions with start <= day <= end, oldest day first.
+        """
+        with self.connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {_KEY_COLUMNS}, p.* FROM daily_partials p
+                JOIN keys k ON k.id = p.key_id
+                WHERE p.day >= ? AND p.day <= ?
+                ORDER BY p.day ASC
+                """,
+                (start.toordinal(), end.toordinal()),
+            ).fetchall()
+        return [(date.fromordinal(r["day"]), _row_to_key_sketch(r)) for r in rows]
+
+    def _row_to_baseline(self, row: sqlite3.Row) -> BaselineStats:
         return BaselineStats(
-            key=key,
+            key=_row_key(row),
             median=float(row["median"]),
             mad=float(row["mad"]),
             sample_count=int(row["sample_count"]),
-            training_start=_iso_to_dt(row["training_start"]),
-            training_end=_iso_to_dt(row["training_end"]),
-            created_at=_iso_to_dt(row["created_at"]),
+            training_start=_us_to_dt(row["training_start_us"], row["training_start_offset"]),
+            training_end=_us_to_dt(row["training_end_us"], row["training_end_offset"]),
+            created_at=_us_to_dt(row["created_at_us"], row["created_at_offset"]),
             version=int(row["version"]),
         )
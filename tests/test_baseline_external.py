@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from baseline_engine.baseline import train_baselines
+from baseline_engine.baseline_external import BYTES_PER_ROW, train_baselines_external
+from baseline_engine.batch import EventBatch
+from baseline_engine.cli import main
+from baseline_engine.config import BaselineConfig
+
+
+def _batches(n_batches: int = 4, rows: int = 500):
+    base = datetime(2026, 1, 1)
+    for b in range(n_batches):
+        batch = EventBatch()
+        for i in range(rows):
+            n = b * rows + i
+            batch.append(base + timedelta(minutes=n), f"/e{n % 23}", "m", float((n * 17) % 97))
+        yield batch
+
+
+def _by_key(baselines):
+    return {b.key.as_str(): b.model_dump(exclude={"created_at"}) for b in baselines}
+
+
+def test_external_training_matches_in_memory(tmp_path) -> None:
+    cfg = BaselineConfig(use_hour_of_day=True, min_samples=3)
+    expected = train_baselines(EventBatch.concat(_batches()), cfg)
+
+    # Budget of ~300 rows forces several partitions, plus re-splits (no expected_rows hint).
+    actual = train_baselines_external(
+        _batches(),
+        cfg,
+        memory_budget_bytes=300 * BYTES_PER_ROW,
+        tmp_dir=str(tmp_path),
+        engine="python",
+    )
+    assert len(actual) == len(expected) > 0
+    assert _by_key(actual) == _by_key(expected)
+
+    # Spill files are cleaned up.
+    assert os.listdir(tmp_path) == []
+
+
+def test_cli_train_memory_budget(tmp_path, capsys) -> None:
+    train_csv = tmp_path / "train.csv"
+    train_csv.write_text(
+        "timestamp,entity_id,metric,value\n"
+        "2026-01-01T14:00:00,/login,latency_p95_ms,100\n"
+        "2026-01-01T14:01:00,/login,latency_p95_ms,110\n"
+        "2026-01-01T14:02:00,/login,latency_p95_ms,90\n",
+        encoding="utf-8",
+    )
+    db_path = tmp_path / "baselines.db"
+
+    rc = main(["train", "--input", str(train_csv), "--db", str(db_path), "--min-samples", "3", "--memory-budget-mb", "1"])
+    assert rc == 0
+    assert "Trained baselines: 1" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "extra",
+    [
+        ["--memory-budget-mb", "8", "--window-days", "7"],
+        ["--memory-budget-mb", "8", "--emit-partials", "p.bin"],
+        ["--window-days", "7", "--emit-partials", "p.bin"],
+        ["--memory-budget-mb", "8", "--engine", "sketch"],
+        ["--window-days", "7", "--engine", "numpy"],
+        ["--emit-partials", "p.bin", "--keep-state"],
+        ["--as-of", "2026-01-01"],
+    ],
+)
+def test_cli_train_rejects_conflicting_modes(tmp_path, capsys, extra) -> None:
+    with pytest.raises(SystemExit) as exc:
+        main(["train", "--input", str(tmp_path / "events.csv")] + extra)
+    assert exc.value.code == 2
+    assert "baseline train: error:" in capsys.readouterr().err
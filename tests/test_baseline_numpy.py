@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from baseline_engine.baseline import train_baselines
+from baseline_engine.batch import EventBatch
+from baseline_engine.config import BaselineConfig
+from baseline_engine.models import Event
+
+pytest.importorskip("numpy")
+
+from baseline_engine.baseline_numpy import train_baselines_numpy  # noqa: E402
+
+
+def _without_created_at(baselines):
+    return [b.model_dump(exclude={"created_at"}) for b in baselines]
+
+
+@pytest.mark.parametrize("use_hour_of_day", [True, False])
+def test_numpy_engine_matches_python_engine(use_hour_of_day: bool) -> None:
+    cfg = BaselineConfig(use_hour_of_day=use_hour_of_day, min_samples=4, min_mad=1e-6)
+    rng = random.Random(3)
+
+    base = datetime(2026, 1, 1, 0, 0, 0)
+    events = [
+        Event(
+            timestamp=base + timedelta(minutes=rng.randrange(0, 3 * 24 * 60)),
+            entity_id=f"/e{rng.randrange(6)}",
+            metric=rng.choice(["latency", "errors"]),
+            # Repeated values exercise ties and zero-MAD clamping.
+            value=float(rng.choice([1, 2, 2, 3, 5, 8])) if i % 3 else rng.gauss(100, 15),
+        )
+        for i in range(2000)
+    ]
+
+    expected = train_baselines(events, cfg)
+    actual = train_baselines_numpy(EventBatch.from_events(events), cfg)
+
+    assert len(expected) > 10
+    assert _without_created_at(actual) == _without_created_at(expected)
+
+
+def test_numpy_engine_picks_training_window_from_aware_timestamps() -> None:
+    cfg = BaselineConfig(use_hour_of_day=True, min_samples=2)
+    tz = timezone(timedelta(hours=2))
+    events = [
+        Event(timestamp=datetime(2026, 1, 2, 14, 30, tzinfo=tz), entity_id="/a", metric="m", value=3.0),
+        Event(timestamp=datetime(2026, 1, 1, 14, 10, tzinfo=tz), entity_id="/a", metric="m", value=1.0),
+        Event(timestamp=datetime(2026, 1, 3, 14, 0, tzinfo=tz), entity_id="/a", metric="m", value=2.0),
+        Event(timestamp=datetime(2026, 1, 1, 14, 20, tzinfo=tz), entity_id="/a", metric="m", value=4.0),
+    ]
+
+    [b] = train_baselines_numpy(EventBatch.from_events(events), cfg)
+    assert b.key.as_str() == "/a:m:hour=14"
+    assert b.median == 2.5
+    assert b.training_start == events[1].timestamp
+    assert b.training_end == events[2].timestamp
+    assert _without_created_at([b]) == _without_created_at(train_baselines(events, cfg))
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from baseline_engine.baseline import train_baselines
+from baseline_engine.baseline_parallel import shard_batch, train_baselines_parallel
+from baseline_engine.batch import EventBatch
+from baseline_engine.config import BaselineConfig
+
+
+def _batch() -> EventBatch:
+    batch = EventBatch()
+    base = datetime(2026, 1, 1)
+    for i in range(3000):
+        batch.append(base + timedelta(minutes=7 * i), f"/e{i % 17}", f"m{i % 3}", float((i * 31) % 101))
+    return batch
+
+
+def _by_key(baselines):
+    return {b.key.as_str(): b.model_dump(exclude={"created_at"}) for b in baselines}
+
+
+def test_shard_batch_keeps_keys_together() -> None:
+    cfg = BaselineConfig(use_hour_of_day=True)
+    batch = _batch()
+    shards = shard_batch(batch, cfg, 4)
+
+    assert sum(len(s) for s in shards) == len(batch)
+    seen = {}
+    for n, shard in enumerate(shards):
+        for i in range(len(shard)):
+            key = shard.key(i, cfg).as_str()
+            assert seen.setdefault(key, n) == n
+
+
+def test_parallel_training_matches_serial() -> None:
+    cfg = BaselineConfig(use_hour_of_day=True, min_samples=5)
+    batch = _batch()
+
+    expected = train_baselines(batch, cfg)
+    actual = train_baselines_parallel(batch, cfg, workers=3)
+    assert len(actual) == len(expected) > 0
+    assert _by_key(actual) == _by_key(expected)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from baseline_engine.baseline import train_baselines
+from baseline_engine.batch import EventBatch
+from baseline_engine.config import BaselineConfig
+from baseline_engine.ingest import iter_event_batches, load_event_batch, load_events
+from baseline_engine.models import Event
+
+
+def _stats_fields(baselines):
+    return sorted(
+        (b.key.as_str(), b.median, b.mad, b.sample_count, b.training_start, b.training_end)
+        for b in baselines
+    )
+
+
+def test_event_batch_roundtrips_events() -> None:
+    tz = timezone(timedelta(hours=2))
+    events = [
+        Event(timestamp=datetime(2026, 1, 1, 14, 0, 0, 123), entity_id="/login", metric="latency_p95_ms", value=1.5),
+        Event(timestamp=datetime(2026, 1, 1, 1, 30, tzinfo=tz), entity_id="/search", metric="errors", value=2.0, tags={"dc": "eu"}),
+    ]
+    batch = EventBatch.from_events(events)
+
+    assert len(batch) == 2
+    assert batch.entities == ["/login", "/search"]
+    assert list(batch.iter_events()) == events
+    # Hour-of-day follows the timestamp's own offset, like datetime.hour does.
+    assert batch.hour_of_day(1) == 1
+    assert batch.find(timestamp=events[1].timestamp, entity_id="/search", metric="errors") == 1
+    assert batch.find(timestamp=events[1].timestamp, entity_id="/login", metric="errors") is None
+
+
+def test_batch_reader_matches_event_reader(tmp_path) -> None:
+    jsonl = tmp_path / "events.jsonl"
+    jsonl.write_text(
+        '{"timestamp": "2026-01-01T14:00:00Z", "entity_id": "/login", "metric": "m", "value": 100}\n'
+        '{"timestamp": 1767276000, "entity_id": "/login", "metric": "m", "value": "101.5"}\n'
+        '{"timestamp": "2026-01-01T14:02:00+01:00", "entity_id": "/login", "metric": "m", "value": 99.0, "tags": {"a": 1}}\n',
+        encoding="utf-8",
+    )
+    csv_path = tmp_path / "events.csv"
+    csv_path.write_text(
+        "timestamp,entity_id,metric,value,tags\n"
+        "2026-01-01T14:00:00,/login,m,100,\n"
+        '2026-01-01T14:01:00,/login,m,110,"{""a"": 1}"\n',
+        encoding="utf-8",
+    )
+
+    for path in (jsonl, csv_path):
+        assert list(load_event_batch(str(path)).iter_events()) == load_events(str(path))
+
+    sizes = [len(b) for b in iter_event_batches(str(jsonl), batch_size=2)]
+    assert sizes == [2, 1]
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    [
+        "2026-01-01T14:00:00+05",
+        "2026-W01-1T14:00:00",
+        "2026-01-01T14:00:00+05:30:15",
+        "2026-01-01T14:00:00,5",
+        "2026-01-01 14:00",
+        "9999-12-31T23:00:00-05:00",
+    ],
+)
+def test_batch_reader_accepts_and_rejects_like_event_reader(tmp_path, timestamp: str) -> None:
+    path = tmp_path / "events.jsonl"
+    path.write_text(
+        f'{{"timestamp": "{timestamp}", "entity_id": "/login", "metric": "m", "value": 1}}\n'
+        f'{{"timestamp": "2026-01-01T14:00:00", "entity_id": "/login", "metric": "m", "value": 1{"0" * 400}}}\n',
+        encoding="utf-8",
+    )
+
+    def outcome(load):
+        try:
+            return list(load())
+        except ValueError as e:
+            return type(e)
+
+    expected = outcome(lambda: load_events(str(path)))
+    assert outcome(lambda: load_event_batch(str(path)).iter_events()) == expected
+
+    path.write_text(f'{{"timestamp": "{timestamp}", "entity_id": "/login", "metric": "m", "value": 1}}\n', encoding="utf-8")
+    expected = outcome(lambda: load_events(str(path)))
+    assert outcome(lambda: load_event_batch(str(path)).iter_events()) == expected
+
+
+def test_train_baselines_batch_matches_events() -> None:
+    cfg = BaselineConfig(use_hour_of_day=True, min_samples=3, mad_threshold=3.5, min_mad=1e-6)
+
+    base = datetime(2026, 1, 1, 14, 0, 0)
+    events = [
+        Event(timestamp=base + timedelta(minutes=(i * 7) % 120), entity_id=f"/e{i % 3}", metric="m", value=float(i % 11))
+        for i in range(200)
+    ]
+
+    expected = train_baselines(events, cfg)
+    actual = train_baselines(EventBatch.from_events(events), cfg)
+    assert _stats_fields(actual) == _stats_fields(expected)
+
+
+def test_trimmed_keeps_only_used_codes() -> None:
+    batch = EventBatch()
+    for i in range(1000):
+        batch.append(datetime(2026, 1, 1, i % 24), f"/e{i}", f"m{i % 3}", float(i), {"n": i} if i == 7 else None)
+
+    piece = batch.take([7, 500, 7])
+    trimmed = piece.trimmed()
+
+    assert (len(piece.entities), len(trimmed.entities), len(trimmed.metrics)) == (1000, 2, 2)
+    assert list(trimmed.iter_events()) == list(piece.iter_events())
+    assert trimmed.entity_code("/e500") == 1
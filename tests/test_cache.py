@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from baseline_engine.cache import BaselineCache
+from baseline_engine.cli import main
+from baseline_engine.models import BaselineKey, BaselineStats
+from baseline_engine.storage_sqlite import BaselineStore
+
+
+def _baseline(entity: str) -> BaselineStats:
+    base = datetime(2026, 1, 1)
+    return BaselineStats(
+        key=BaselineKey(entity_id=entity, metric="m"),
+        median=10.0,
+        mad=1.0,
+        sample_count=30,
+        training_start=base,
+        training_end=base + timedelta(hours=1),
+        created_at=base + timedelta(days=1),
+        version=1,
+    )
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_and_counters(tmp_path) -> None:
+    store = BaselineStore(str(tmp_path / "baselines.db"))
+    store.init_db()
+    store.insert_many([_baseline("/a"), _baseline("/b"), _baseline("/c")])
+
+    cache = BaselineCache(store, max_size=2)
+    assert cache.get_latest("/a:m").median == 10.0
+    cache.get_latest("/b:m")
+    cache.get_latest("/a:m")  # /a is now most recently used
+    cache.get_latest("/c:m")  # evicts /b
+
+    assert len(cache) == 2
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 3
+    assert cache.stats.evictions == 1
+
+    cache.get_latest("/b:m")
+    assert cache.stats.misses == 4
+
+
+def test_negative_entries_expire(tmp_path) -> None:
+    store = BaselineStore(str(tmp_path / "baselines.db"))
+    store.init_db()
+    clock = _Clock()
+    cache = BaselineCache(store, negative_ttl=30.0, clock=clock)
+
+    assert cache.get_latest("/a:m") is None
+    store.insert_many([_baseline("/a")])
+
+    clock.now = 29.0
+    assert cache.get_latest("/a:m") is None
+    assert cache.stats.negative_hits == 1
+
+    clock.now = 31.0
+    assert cache.get_latest("/a:m") is not None
+    assert cache.stats.misses == 2
+
+
+def test_score_verbose_prints_cache_stats(tmp_path, capsys) -> None:
+    db_path = tmp_path / "baselines.db"
+    store = BaselineStore(str(db_path))
+    store.init_db()
+    store.insert_many([_baseline("/a")])
+
+    events = tmp_path / "score.csv"
+    events.write_text(
+        "timestamp,entity_id,metric,value\n"
+        + "".join(f"2026-01-02T0{i}:00:00,{e},m,10\n" for i, e in enumerate(["/a", "/x", "/a", "/x"])),
+        encoding="utf-8",
+    )
+
+    rc = main(
+        ["score", "--input", str(events), "--db", str(db_path), "--no-hour-of-day", "--cache-size", "8", "--verbose"]
+    )
+    assert rc == 0
+    out = capsys.readouterr().out
+    assert "Baseline cache: hits=0 (negative=0) misses=2 evictions=0" in out
+    assert "Scored: 2 | Skipped (no baseline): 2" in out
+
+
+def test_get_latest_many_counts_each_key_once(tmp_path) -> None:
+    store = BaselineStore(str(tmp_path / "baselines.db"))
+    store.init_db()
+    store.insert_many([_baseline("/a"), _baseline("/b")])
+
+    cache = BaselineCache(store, max_size=8)
+    assert set(cache.get_latest_many(["/a:m", "/b:m", "/x:m"])) == {"/a:m", "/b:m"}
+    assert cache.stats.misses == 3
+
+    assert set(cache.get_latest_many(["/a:m", "/x:m"])) == {"/a:m"}
+    assert cache.stats.hits == 2
+    assert cache.stats.negative_hits == 1
+    assert cache.stats.misses == 3
+
+
+def test_score_cache_respects_pinned_generation(tmp_path, capsys) -> None:
+    db_path = tmp_path / "baselines.db"
+    store = BaselineStore(str(db_path))
+    store.init_db()
+    first = store.insert_many([_baseline("/a")]).generation
+    store.insert_many([_baseline("/a").model_copy(update={"median": 50.0, "created_at": datetime(2026, 1, 3)})])
+
+    events = tmp_path / "score.csv"
+    events.write_text("timestamp,entity_id,metric,value\n2026-01-04T00:00:00,/a,m,10\n", encoding="utf-8")
+
+    args = ["score", "--input", str(events), "--db", str(db_path), "--no-hour-of-day", "--cache-size", "8"]
+    assert main(args + ["--generation", str(first)]) == 0
+    assert '"median":10.0' in capsys.readouterr().out
+    assert main(args) == 0
+    assert '"median":50.0' in capsys.readouterr().out
@@ -35,3 +35,25 @@ def test_cli_keys_list_show(tmp_path, capsys) -> None:
     out = capsys.readouterr().out
     assert '"median"' in out
     assert '"mad"' in out
+
+
+def test_generations_and_rollback_commands(tmp_path, capsys) -> None:
+    events = tmp_path / "train.csv"
+    db_path = str(tmp_path / "baselines.db")
+    for value in (100, 200):
+        rows = "".join(f"2026-01-01T14:{m:02d}:00,/login,latency_p95_ms,{value}\n" for m in range(3))
+        events.write_text("timestamp,entity_id,metric,value\n" + rows, encoding="utf-8")
+        assert main(["train", "--input", str(events), "--db", db_path, "--min-samples", "3"]) == 0
+
+    assert main(["rollback", "--db", db_path, "--to", "1"]) == 0
+    assert "Rolled back generations: 2" in capsys.readouterr().out
+
+    assert main(["show", "--db", db_path, "--key", "/login:latency_p95_ms:hour=14"]) == 0
+    assert '"median": 100.0' in capsys.readouterr().out
+
+    assert main(["generations", "--db", db_path]) == 0
+    out = capsys.readouterr().out
+    assert "rolled_back\ttrain\t1" in out
+    assert "Generations: 2 | current: 1" in out
+
+    assert main(["rollback", "--db", db_path, "--to", "2"]) == 1
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from baseline_engine.baseline import train_baselines
+from baseline_engine.batch import EventBatch
+from baseline_engine.cli import main
+from baseline_engine.config import BaselineConfig
+from baseline_engine.incremental import update_baselines
+from baseline_engine.storage_sqlite import BaselineStore
+
+
+def _batch(start: datetime, n: int, offset: int = 0) -> EventBatch:
+    batch = EventBatch()
+    for i in range(n):
+        batch.append(start + timedelta(minutes=i), "/login", "latency_p95_ms", float((i + offset) % 13))
+    return batch
+
+
+def test_update_folds_new_events_into_stored_state(tmp_path) -> None:
+    cfg = BaselineConfig(use_hour_of_day=False, min_samples=5)
+    store = BaselineStore(str(tmp_path / "baselines.db"))
+    store.init_db()
+
+    history = _batch(datetime(2026, 1, 1), 40)
+    new = _batch(datetime(2026, 1, 2), 25, offset=5)
+
+    first = update_baselines(history, store, cfg)
+    assert first.keys == 1
+    assert first.baselines[0].version == 1
+
+    [b] = update_baselines(new, store, cfg).baselines
+    [expected] = train_baselines(EventBatch.concat([history, new]), cfg)
+
+    # Small keys are exact, so the incremental result matches a full retrain.
+    assert b.version == 2
+    assert (b.median, b.mad, b.sample_count) == (expected.median, expected.mad, expected.sample_count)
+    assert b.training_start == expected.training_start
+    assert b.training_end == expected.training_end
+
+    state = store.load_training_state(["/login:latency_p95_ms"])["/login:latency_p95_ms"]
+    assert state.count == 65
+
+
+def test_cli_update_after_sketch_train(tmp_path, capsys) -> None:
+    train_csv = tmp_path / "train.csv"
+    train_csv.write_text(
+        "timestamp,entity_id,metric,value\n"
+        "2026-01-01T14:00:00,/login,latency_p95_ms,100\n"
+        "2026-01-01T14:01:00,/login,latency_p95_ms,110\n"
+        "2026-01-01T14:02:00,/login,latency_p95_ms,90\n",
+        encoding="utf-8",
+    )
+    new_jsonl = tmp_path / "new.jsonl"
+    new_jsonl.write_text(
+        '{"timestamp": "2026-01-02T14:00:00", "entity_id": "/login", "metric": "latency_p95_ms", "value": 200}\n',
+        encoding="utf-8",
+    )
+    db_path = tmp_path / "baselines.db"
+
+    rc = main(["train", "--input", str(train_csv), "--db", str(db_path), "--min-samples", "3", "--engine", "sketch"])
+    assert rc == 0
+
+    rc = main(["update", "--input", str(new_jsonl), "--db", str(db_path), "--min-samples", "3"])
+    assert rc == 0
+    assert "Updated keys: 1 | Published baselines: 1" in capsys.readouterr().out
+
+    latest = BaselineStore(str(db_path)).get_latest("/login:latency_p95_ms:hour=14")
+    assert latest is not None
+    assert latest.version == 2
+    assert latest.sample_count == 4
+    assert latest.median == 105.0
+
+
+def test_cli_update_after_keep_state_train_keeps_history(tmp_path, capsys) -> None:
+    train_csv = tmp_path / "train.csv"
+    train_csv.write_text(
+        "timestamp,entity_id,metric,value\n"
+        + "".join(f"2026-01-01T14:{m:02d}:00,/login,latency_p95_ms,{100 + m % 5}\n" for m in range(20)),
+        encoding="utf-8",
+    )
+    new_jsonl = tmp_path / "new.jsonl"
+    new_jsonl.write_text(
+        "".join(
+            f'{{"timestamp": "2026-01-02T14:0{m}:00", "entity_id": "/login", "metric": "latency_p95_ms", "value": 500}}\n'
+            for m in range(5)
+        ),
+        encoding="utf-8",
+    )
+    db_path = tmp_path / "baselines.db"
+
+    train = ["train", "--input", str(train_csv), "--db", str(db_path), "--min-samples", "3"]
+    update = ["update", "--input", str(new_jsonl), "--db", str(db_path), "--min-samples", "3"]
+
+    # Without --keep-state the exact engines store no state: update leaves the key alone.
+    assert main(train) == 0
+    assert main(update) == 0
+    assert "Skipped keys without training state: 1" in capsys.readouterr().out
+
+    assert main(train + ["--keep-state"]) == 0
+    assert main(update) == 0
+    assert "Updated keys: 1 | Published baselines: 1" in capsys.readouterr().out
+
+    latest = BaselineStore(str(db_path)).get_latest("/login:latency_p95_ms:hour=14")
+    assert latest.version == 2
+    assert latest.sample_count == 25
+    assert latest.median == 103.0
+
+
+def test_update_skips_keys_published_without_state(tmp_path) -> None:
+    cfg = BaselineConfig(use_hour_of_day=False, min_samples=5)
+    store = BaselineStore(str(tmp_path / "baselines.db"))
+    store.init_db()
+    store.insert_many(train_baselines(_batch(datetime(2026, 1, 1), 40), cfg))
+
+    result = update_baselines(_batch(datetime(2026, 1, 2), 25), store, cfg)
+
+    assert (result.baselines, result.keys, result.skipped) == ([], 0, ["/login:latency_p95_ms"])
+    assert store.get_latest("/login:latency_p95_ms").sample_count == 40
+
+
+@pytest.mark.parametrize("command", ["train", "update"])
+@pytest.mark.parametrize("value", ["0", "1", "-0.1", "nan"])
+def test_cli_rejects_sketch_error_outside_unit_interval(tmp_path, capsys, command: str, value: str) -> None:
+    with pytest.raises(SystemExit) as exc:
+        main([command, "--input", str(tmp_path / "events.csv"), "--sketch-error", value])
+    assert exc.value.code == 2
+    assert "--sketch-error: must be between 0 and 1" in capsys.readouterr().err
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import pytest
+
+from baseline_engine.ingest import iter_events, load_events, peek_events
+
+
+def test_iter_events_is_lazy(tmp_path) -> None:
+    path = tmp_path / "events.jsonl"
+    path.write_text(
+        '{"timestamp": "2026-01-01T14:00:00", "entity_id": "/login", "metric": "latency_p95_ms", "value": 100}\n'
+        "\n"
+        "not json\n",
+        encoding="utf-8",
+    )
+
+    events = iter_events(str(path))
+    first = next(events)
+    assert first.entity_id == "/login"
+    assert first.value == 100.0
+
+    # The broken line is only reached once the iterator gets that far.
+    with pytest.raises(ValueError, match="line 3"):
+        next(events)
+
+
+def test_iter_events_validates_path_eagerly(tmp_path) -> None:
+    with pytest.raises(FileNotFoundError):
+        iter_events(str(tmp_path / "missing.csv"))
+
+    bad = tmp_path / "events.txt"
+    bad.write_text("", encoding="utf-8")
+    with pytest.raises(ValueError, match="Unsupported input format"):
+        iter_events(str(bad))
+
+
+def test_peek_events_empty_and_non_empty(tmp_path) -> None:
+    empty = tmp_path / "empty.csv"
+    empty.write_text("timestamp,entity_id,metric,value\n", encoding="utf-8")
+    assert peek_events(str(empty)) is None
+
+    path = tmp_path / "events.csv"
+    path.write_text(
+        "timestamp,entity_id,metric,value\n"
+        "2026-01-01T14:00:00,/login,latency_p95_ms,100\n"
+        "2026-01-01T14:01:00,/login,latency_p95_ms,110\n",
+        encoding="utf-8",
+    )
+    events = peek_events(str(path))
+    assert events is not None
+    assert [e.value for e in events] == [e.value for e in load_events(str(path))] == [100.0, 110.0]
+
+
+def _write_jsonl(path, n: int) -> None:
+    lines = [
+        f'{{"timestamp": "2026-01-01T{i // 60 % 24:02d}:{i % 60:02d}:00", "entity_id": "/e{i % 5}", "metric": "m", "value": {i}}}'
+        for i in range(n)
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_parallel_batches_match_sequential(tmp_path, monkeypatch) -> None:
+    import baseline_engine.ingest as ingest
+
+    # Force many small ranges so the process pool path is exercised.
+    monkeypatch.setattr(ingest, "_MIN_RANGE_BYTES", 256)
+
+    jsonl = tmp_path / "events.jsonl"
+    _write_jsonl(jsonl, 500)
+
+    csv_path = tmp_path / "events.csv"
+    csv_path.write_text(
+        "timestamp,entity_id,metric,value\n"
+        + "".join(f"2026-01-01T14:{i % 60:02d}:00,/e{i % 3},m,{i}\n" for i in range(500)),
+        encoding="utf-8",
+    )
+
+    for path in (jsonl, csv_path):
+        parallel = ingest.load_event_batch(str(path), workers=3)
+        sequential = ingest.load_event_batch(str(path))
+        assert list(parallel.iter_events()) == list(sequential.iter_events())
+        assert len(list(ingest.iter_event_batches(str(path), workers=3))) > 1
+
+
+def test_parallel_batches_report_file_line_numbers(tmp_path, monkeypatch) -> None:
+    import baseline_engine.ingest as ingest
+
+    monkeypatch.setattr(ingest, "_MIN_RANGE_BYTES", 256)
+
+    path = tmp_path / "events.jsonl"
+    _write_jsonl(path, 300)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    lines[250] = "{broken"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="Invalid JSON on line 251 "):
+        ingest.load_event_batch(str(path), workers=2)
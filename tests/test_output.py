@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import csv
+import io
+from datetime import datetime, timedelta, timezone
+
+from baseline_engine.batch import EventBatch
+from baseline_engine.cli import main
+from baseline_engine.config import BaselineConfig
+from baseline_engine.models import BaselineStats
+from baseline_engine.output import DELIMITED_COLUMNS, ResultWriter
+from baseline_engine.scoring import score_event_batch
+from baseline_engine.snapshot import BaselineSnapshot
+
+
+def _scored_batch():
+    cfg = BaselineConfig(use_hour_of_day=True)
+    batch = EventBatch()
+    batch.append(datetime(2026, 1, 3, 14, 0, 0, 250), "/ü \"login\"", "m", 3e-5, tags={"region": "eu", "w": 1e-7})
+    batch.append(datetime(2026, 1, 3, 14, tzinfo=timezone.utc), "/ü \"login\"", "m", 1e17)
+    batch.append(datetime(2026, 1, 3, 14, tzinfo=timezone(timedelta(hours=-3))), "/b", "m", -0.5)
+
+    baselines = {}
+    for i in range(len(batch)):
+        key = batch.key(i, cfg)
+        baselines[key.as_str()] = BaselineStats(
+            key=key,
+            median=0.25,
+            mad=1e-6,
+            sample_count=30,
+            training_start=datetime(2026, 1, 1, tzinfo=timezone.utc),
+            training_end=datetime(2026, 1, 2, 0, 0, 0, 1),
+            created_at=datetime(2026, 1, 2, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+            version=3,
+        )
+    return score_event_batch(batch, BaselineSnapshot(baselines), cfg)
+
+
+def test_jsonl_matches_model_dump_json() -> None:
+    scores = _scored_batch()
+    buf = io.StringIO()
+    writer = ResultWriter(buf, "jsonl", chunk_lines=2)
+    writer.write_rows(scores, scores.scored_rows())
+    writer.write_result(scores.scored(0))
+    writer.flush()
+
+    expected = [scores.result(i).model_dump_json() for i in range(3)] + [scores.result(0).model_dump_json()]
+    assert buf.getvalue().splitlines() == expected
+    assert writer.lines_written == 4
+
+
+def test_csv_and_tsv_rows() -> None:
+    scores = _scored_batch()
+    for fmt, delimiter in (("csv", ","), ("tsv", "\t")):
+        buf = io.StringIO()
+        with ResultWriter(buf, fmt) as writer:
+            writer.write_rows(scores, [1, 2])
+            writer.flush()
+            rows = list(csv.DictReader(io.StringIO(buf.getvalue()), delimiter=delimiter))
+
+        assert list(rows[0]) == list(DELIMITED_COLUMNS)
+        assert [r["entity_id"] for r in rows] == ['/ü "login"', "/b"]
+        assert float(rows[0]["value"]) == 1e17
+        assert rows[1]["explanation"] == scores.result(2).explanation
+
+
+def test_score_command_writes_output_file(tmp_path, capsys) -> None:
+    train_csv = tmp_path / "train.csv"
+    train_csv.write_text(
+        "timestamp,entity_id,metric,value\n"
+        + "".join(f"2026-01-01T14:0{i}:00,/login,latency,{100 + i}\n" for i in range(5)),
+        encoding="utf-8",
+    )
+    score_csv = tmp_path / "score.csv"
+    score_csv.write_text(
+        "timestamp,entity_id,metric,value\n"
+        "2026-01-02T14:00:00,/login,latency,150\n"
+        "2026-01-02T14:00:00,/other,latency,1\n",
+        encoding="utf-8",
+    )
+    db_path = tmp_path / "baselines.db"
+    out_path = tmp_path / "scores.tsv"
+
+    assert main(["train", "--input", str(train_csv), "--db", str(db_path), "--min-samples", "3"]) == 0
+    capsys.readouterr()
+
+    rc = main(
+        [
+            "score",
+            "--input",
+            str(score_csv),
+            "--db",
+            str(db_path),
+            "--format",
+            "tsv",
+            "--output",
+            str(out_path),
+            "--verbose",
+        ]
+    )
+    assert rc == 0
+
+    stdout = capsys.readouterr().out
+    assert "SKIP (no baseline): /other:latency:hour=14" in stdout
+    assert "Scored: 1 | Skipped (no baseline): 1" in stdout
+
+    lines = out_path.read_text(encoding="utf-8").splitlines()
+    assert lines[0].split("\t") == list(DELIMITED_COLUMNS)
+    assert len(lines) == 2
+    assert lines[1].split("\t")[:3] == ["2026-01-02T14:00:00", "/login", "latency"]
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from baseline_engine.baseline import train_baselines
+from baseline_engine.batch import EventBatch
+from baseline_engine.cli import main
+from baseline_engine.config import BaselineConfig
+from baseline_engine.partials import merge_partial_files, read_partials, write_partials
+from baseline_engine.sketch import baselines_from_sketches, train_sketches
+from baseline_engine.storage_sqlite import BaselineStore
+
+
+def _shard(start: int, n: int) -> EventBatch:
+    batch = EventBatch()
+    base = datetime(2026, 1, 1)
+    for i in range(start, start + n):
+        batch.append(base + timedelta(minutes=13 * i), f"/e{i % 4}", "m", float((i * 7) % 31))
+    return batch
+
+
+def _by_key(baselines):
+    return {b.key.as_str(): b.model_dump(exclude={"created_at"}) for b in baselines}
+
+
+def test_exact_partials_merge_identically(tmp_path) -> None:
+    cfg = BaselineConfig(use_hour_of_day=True, min_samples=5)
+    shards = [_shard(0, 700), _shard(700, 400), _shard(1100, 900)]
+
+    paths = []
+    for n, shard in enumerate(shards):
+        path = str(tmp_path / f"node{n}.bin")
+        write_partials(path, train_sketches(shard, cfg, rank_error=None), cfg)
+        paths.append(path)
+
+    merged = baselines_from_sketches(merge_partial_files(paths, cfg), cfg)
+    expected = train_baselines(EventBatch.concat(shards), cfg)
+    assert _by_key(merged) == _by_key(expected)
+
+
+def test_partials_roundtrip_and_config_check(tmp_path) -> None:
+    cfg = BaselineConfig(use_hour_of_day=False, min_samples=1)
+    states = train_sketches(_shard(0, 50), cfg, rank_error=0.05)
+    path = str(tmp_path / "p.bin")
+    write_partials(path, states, cfg)
+
+    loaded = read_partials(path)
+    assert loaded.use_hour_of_day is False
+    assert loaded.states.keys() == states.keys()
+    for key, state in states.items():
+        assert loaded.states[key].count == state.count
+        assert loaded.states[key].sketch.compactors == state.sketch.compactors
+
+    with pytest.raises(ValueError, match="use_hour_of_day"):
+        merge_partial_files([path], BaselineConfig(use_hour_of_day=True))
+
+
+def test_cli_emit_and_merge_partials(tmp_path) -> None:
+    rows = [f"2026-01-01T14:{m:02d}:00,/login,latency_p95_ms,{100 + m}\n" for m in range(6)]
+    paths = []
+    for n, chunk in enumerate((rows[:2], rows[2:])):
+        csv_path = tmp_path / f"node{n}.csv"
+        csv_path.write_text("timestamp,entity_id,metric,value\n" + "".join(chunk), encoding="utf-8")
+        out = tmp_path / f"node{n}.bin"
+        rc = main(["train", "--input", str(csv_path), "--emit-partials", str(out)])
+        assert rc == 0
+        paths.append(str(out))
+
+    db_path = tmp_path / "baselines.db"
+    rc = main(["merge-partials", "--input", *paths, "--db", str(db_path), "--min-samples", "5"])
+    assert rc == 0
+
+    latest = BaselineStore(str(db_path)).get_latest("/login:latency_p95_ms:hour=14")
+    assert latest is not None
+    assert latest.sample_count == 6
+    assert latest.median == 102.5
@@ -1,6 +1,14 @@
 from __future__ import annotations
 
+from datetime import datetime, timedelta
+
+from baseline_engine.batch import EventBatch
 from baseline_engine.cli import main
+from baseline_engine.config import BaselineConfig
+from baseline_engine.models import AnomalyResult, BaselineKey, BaselineStats, Event
+from baseline_engine.reporting import score_batches_with_store, score_events_lazy_with_store, score_events_with_store
+from baseline_engine.scoring import score_event
+from baseline_engine.storage_sqlite import BaselineStore
 
 
 def test_report_command_writes_markdown(tmp_path) -> None:
@@ -58,3 +66,38 @@ def test_report_command_writes_markdown(tmp_path) -> None:
     assert "# Baseline Engine Report" in text
     assert "## Coverage" in text
     assert "## Top anomalies" in text
+
+
+def test_score_with_store_returns_anomaly_results(tmp_path) -> None:
+    cfg = BaselineConfig(use_hour_of_day=False)
+    store = BaselineStore(str(tmp_path / "baselines.db"))
+    store.init_db()
+    key = BaselineKey(entity_id="/login", metric="latency")
+    store.insert_many(
+        [
+            BaselineStats(
+                key=key,
+                median=100.0,
+                mad=5.0,
+                sample_count=30,
+                training_start=datetime(2026, 1, 1),
+                training_end=datetime(2026, 1, 2),
+            )
+        ]
+    )
+    events = [
+        Event(timestamp=datetime(2026, 1, 3) + timedelta(hours=i), entity_id="/login", metric="latency", value=v)
+        for i, v in enumerate([101.0, 180.0])
+    ]
+    expected = [score_event(e, store.get_latest(key.as_str()), cfg) for e in events]
+
+    results, stats = score_events_with_store(iter(events), store, cfg)
+    assert all(type(r) is AnomalyResult for r in results)
+    assert results == expected
+    assert stats.anomalies == 1
+
+    batch_results, _ = score_batches_with_store([EventBatch.from_events(events)], store, cfg)
+    assert batch_results == expected
+
+    lazy, _ = score_events_lazy_with_store(events, store, cfg, only_anomalies=True)
+    assert [r.to_result() for r in lazy] == expected[1:]
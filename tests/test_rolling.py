@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+from baseline_engine.baseline import train_baselines
+from baseline_engine.batch import EventBatch
+from baseline_engine.cli import main
+from baseline_engine.config import BaselineConfig
+from baseline_engine.rolling import update_rolling_baselines
+from baseline_engine.storage_sqlite import BaselineStore
+
+
+def _day(day: date, level: float) -> EventBatch:
+    batch = EventBatch()
+    start = datetime(day.year, day.month, day.day)
+    for i in range(24):
+        batch.append(start + timedelta(hours=i), "/login", "latency", level + i % 3)
+    return batch
+
+
+def test_rolling_window_combines_partitions_and_expires_old_days(tmp_path) -> None:
+    cfg = BaselineConfig(use_hour_of_day=False, min_samples=10)
+    store = BaselineStore(str(tmp_path / "baselines.db"))
+    store.init_db()
+
+    days = [date(2026, 1, 1) + timedelta(days=d) for d in range(5)]
+    batches = [_day(d, 100.0 + 10 * n) for n, d in enumerate(days)]
+
+    # One day at a time, like a nightly job.
+    for batch in batches:
+        result = update_rolling_baselines(batch, store, cfg, window_days=3)
+
+    assert result.window_start == days[2]
+    assert result.window_end == days[4]
+    assert result.partitions_written == 1
+    assert result.partitions_expired == 1
+
+    [b] = result.baselines
+    [expected] = train_baselines(EventBatch.concat(batches[2:]), cfg)
+    assert (b.median, b.mad, b.sample_count) == (expected.median, expected.mad, expected.sample_count)
+    assert b.training_start == expected.training_start
+    assert b.training_end == expected.training_end
+    assert b.version == 5
+
+    assert [d for d, _ in store.load_daily_partials(date.min, date.max)] == days[2:]
+
+
+def test_rolling_rerun_of_a_day_is_idempotent(tmp_path) -> None:
+    cfg = BaselineConfig(use_hour_of_day=False, min_samples=10)
+    store = BaselineStore(str(tmp_path / "baselines.db"))
+    store.init_db()
+
+    batch = _day(date(2026, 1, 1), 100.0)
+    first = update_rolling_baselines(batch, store, cfg, window_days=7)
+    again = update_rolling_baselines(batch, store, cfg, window_days=7)
+    assert first.baselines[0].sample_count == again.baselines[0].sample_count == 24
+
+
+def test_cli_train_window_days(tmp_path, capsys) -> None:
+    train_csv = tmp_path / "train.csv"
+    train_csv.write_text(
+        "timestamp,entity_id,metric,value\n"
+        "2026-01-01T14:00:00,/login,latency_p95_ms,100\n"
+        "2026-01-02T14:01:00,/login,latency_p95_ms,110\n"
+        "2026-01-03T14:02:00,/login,latency_p95_ms,90\n",
+        encoding="utf-8",
+    )
+    db_path = tmp_path / "baselines.db"
+
+    rc = main(["train", "--input", str(train_csv), "--db", str(db_path), "--min-samples", "2", "--window-days", "2"])
+    assert rc == 0
+    out = capsys.readouterr().out
+    assert "Window: 2026-01-02 .. 2026-01-03 (2 days)" in out
+
+    latest = BaselineStore(str(db_path)).get_latest("/login:latency_p95_ms:hour=14")
+    assert latest is not None
+    assert latest.sample_count == 2
+
+
+def test_rolling_retires_keys_whose_partitions_expired(tmp_path) -> None:
+    cfg = BaselineConfig(use_hour_of_day=False, min_samples=10)
+    store = BaselineStore(str(tmp_path / "baselines.db"))
+    store.init_db()
+
+    days = [date(2026, 1, 1) + timedelta(days=d) for d in range(4)]
+    signup = _day(days[0], 50.0)
+    signup.entities[0] = "/signup"
+    update_rolling_baselines(EventBatch.concat([_day(days[0], 100.0), signup]), store, cfg, window_days=2)
+    before = store.current_generation()
+    assert store.get_latest("/signup:latency") is not None
+
+    update_rolling_baselines(_day(days[1], 100.0), store, cfg, window_days=2)
+    assert store.get_latest("/signup:latency") is not None
+    kept = store.current_generation()
+
+    # Day 0 leaves the window: /signup has no data left and stops resolving.
+    result = update_rolling_baselines(_day(days[2], 100.0), store, cfg, window_days=2)
+    assert result.retired == ["/signup:latency"]
+    assert store.get_latest("/signup:latency") is None
+    assert store.list_keys() == ["/login:latency"]
+    assert store.get_latest("/signup:latency", generation=before).median == 51.0
+
+    # Rolling back the retiring run restores the key; new data publishes it again.
+    store.rollback(kept)
+    assert store.get_latest("/signup:latency") is not None
+    revived = _day(days[3], 70.0)
+    revived.entities[0] = "/signup"
+    result = update_rolling_baselines(revived, store, cfg, window_days=2)
+    assert result.retired == []
+    assert store.get_latest("/signup:latency").median == 71.0
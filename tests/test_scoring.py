@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import math
 from datetime import datetime
 
+import pytest
+
+from baseline_engine import scoring
+from baseline_engine.batch import EventBatch
 from baseline_engine.config import BaselineConfig
 from baseline_engine.models import BaselineKey, BaselineStats, Event
-from baseline_engine.scoring import score_event
+from baseline_engine.scoring import score_event, score_event_batch, score_event_lazy
+from baseline_engine.snapshot import BaselineSnapshot
 
 
 def test_score_event_normal() -> None:
@@ -60,3 +66,85 @@ def test_score_event_anomalous() -> None:
     assert result.is_anomaly is True
     assert result.score == 5.0
     assert "MAD above baseline" in result.explanation
+
+
+def _batch_fixture():
+    cfg = BaselineConfig(use_hour_of_day=False, mad_threshold=3.5)
+    baselines = {}
+    for entity, median in (("/a", 100.0), ("/b", 10.0)):
+        key = BaselineKey(entity_id=entity, metric="m", hour_of_day=None)
+        baselines[key.as_str()] = BaselineStats(
+            key=key,
+            median=median,
+            mad=2.0,
+            sample_count=30,
+            training_start=datetime(2026, 1, 1),
+            training_end=datetime(2026, 1, 1, 1),
+            created_at=datetime(2026, 1, 2),
+            version=1,
+        )
+
+    batch = EventBatch()
+    for i, (entity, value) in enumerate([("/a", 101.0), ("/b", 30.0), ("/c", 1.0), ("/a", 90.0), ("/b", 10.0)]):
+        batch.append(datetime(2026, 1, 3, i), entity, "m", value)
+    return cfg, BaselineSnapshot(baselines), batch
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_score_event_batch_matches_score_event(monkeypatch, use_numpy: bool) -> None:
+    if not use_numpy:
+        monkeypatch.setattr(scoring, "np", None)
+    elif scoring.np is None:
+        pytest.skip("NumPy not installed")
+
+    cfg, snapshot, batch = _batch_fixture()
+    scores = score_event_batch(batch, snapshot, cfg)
+
+    assert len(scores) == 5
+    assert scores.skipped_rows() == [2]
+    assert scores.scored_rows() == [0, 1, 3, 4]
+    assert scores.anomaly_rows() == [1, 3]
+    assert [int(a) for a in scores.above] == [1, 1, 0, 0, 0]
+    assert math.isnan(scores.scores[2])
+
+    for i in scores.scored_rows():
+        expected = score_event(batch.event(i), scores.baseline(i), cfg)
+        assert scores.scores[i] == expected.score
+        assert bool(scores.is_anomaly[i]) is expected.is_anomaly
+        assert scores.result(i) == expected
+
+    with pytest.raises(ValueError):
+        scores.result(2)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_score_event_batch_zero_mad_raises_like_score_event(monkeypatch, use_numpy: bool) -> None:
+    if not use_numpy:
+        monkeypatch.setattr(scoring, "np", None)
+    elif scoring.np is None:
+        pytest.skip("NumPy not installed")
+
+    cfg, snapshot, batch = _batch_fixture()
+    b = snapshot.get_latest("/a:m").model_copy(update={"mad": 0.0})
+    snapshot = BaselineSnapshot({"/a:m": b, "/b:m": snapshot.get_latest("/b:m")})
+
+    with pytest.raises(ZeroDivisionError):
+        score_event(batch.event(0), b, cfg)
+    with pytest.raises(ZeroDivisionError):
+        score_event_batch(batch, snapshot, cfg)
+
+
+def test_scored_event_renders_like_anomaly_result() -> None:
+    cfg, snapshot, batch = _batch_fixture()
+    scores = score_event_batch(batch, snapshot, cfg)
+
+    scored = scores.scored(1)
+    assert scored._event is None
+    expected = score_event(batch.event(1), scored.baseline, cfg)
+    assert (scored.score, scored.is_anomaly, scored.value) == (expected.score, expected.is_anomaly, 30.0)
+    assert scored.explanation == expected.explanation
+    assert scored.to_result() == expected
+
+    lazy = score_event_lazy(batch.event(1), scored.baseline, cfg)
+    assert lazy.to_result() == expected
+    assert not hasattr(lazy, "__dict__")
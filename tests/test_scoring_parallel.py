@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from baseline_engine import ingest
+from baseline_engine.cli import main
+from baseline_engine.scoring_parallel import ViewStats
+
+
+def _write_inputs(tmp_path):
+    train = tmp_path / "train.csv"
+    train.write_text(
+        "timestamp,entity_id,metric,value\n"
+        + "".join(f"2026-01-01T{h:02d}:{m:02d}:00,/e{m % 3},latency,{100 + m % 7}\n" for h in range(24) for m in range(9)),
+        encoding="utf-8",
+    )
+    score = tmp_path / "score.jsonl"
+    score.write_text(
+        "".join(
+            f'{{"timestamp":"2026-01-02T{i % 24:02d}:30:00","entity_id":"/e{i % 5}","metric":"latency","value":{90 + i % 40}}}\n'
+            for i in range(300)
+        ),
+        encoding="utf-8",
+    )
+    return train, score
+
+
+def test_parallel_score_matches_sequential(tmp_path, monkeypatch, capsys) -> None:
+    monkeypatch.setattr(ingest, "_MIN_RANGE_BYTES", 512)
+    train, score = _write_inputs(tmp_path)
+    db = str(tmp_path / "baselines.db")
+    assert main(["train", "--input", str(train), "--db", db, "--min-samples", "3"]) == 0
+    capsys.readouterr()
+
+    outputs = {}
+    for workers in ("1", "3"):
+        args = ["score", "--input", str(score), "--db", db, "--verbose", "--workers", workers]
+        assert main(args) == 0
+        # Lookup stats are per process, so only the results and counters must match.
+        outputs[workers] = [line for line in capsys.readouterr().out.splitlines() if not line.startswith("Baseline ")]
+
+        out_path = tmp_path / f"anomalies-{workers}.csv"
+        assert main(args + ["--only-anomalies", "--format", "csv", "--output", str(out_path)]) == 0
+        capsys.readouterr()
+
+    assert outputs["3"] == outputs["1"]
+    assert any(line.startswith("SKIP (no baseline): /e3:latency") for line in outputs["1"])
+    assert outputs["1"][-1] == "Scored: 180 | Skipped (no baseline): 120"
+
+    sequential = (tmp_path / "anomalies-1.csv").read_text(encoding="utf-8")
+    assert (tmp_path / "anomalies-3.csv").read_text(encoding="utf-8") == sequential
+    assert sequential.count("\n") > 1
+
+
+def test_view_stats_merge_sums_cache_counters_only() -> None:
+    cache = ViewStats("cache", (3, 1, 2, 0)).merge(ViewStats("cache", (5, 0, 4, 1)))
+    assert cache.values == (8, 1, 6, 1)
+
+    # Every worker holds its own copy of the snapshot: 72 keys, not 4 x 72.
+    snapshot = ViewStats("snapshot", (72, 4096))
+    for _ in range(3):
+        snapshot = snapshot.merge(ViewStats("snapshot", (72, 4096)))
+    assert snapshot.describe() == "Baseline snapshot: 72 keys | 4096 bytes"
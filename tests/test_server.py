@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+import threading
+from datetime import datetime
+
+from baseline_engine.config import BaselineConfig
+from baseline_engine.models import BaselineKey, BaselineStats, Event
+from baseline_engine.scoring import score_event
+from baseline_engine.server import ScoringServer
+from baseline_engine.snapshot import BaselineSnapshot
+from baseline_engine.storage_sqlite import BaselineStore
+
+
+def _start(tmp_path, **kwargs):
+    store = BaselineStore(str(tmp_path / "baselines.db"))
+    store.init_db()
+    store.insert_many(
+        [
+            BaselineStats(
+                key=BaselineKey(entity_id="/login", metric="latency", hour_of_day=None),
+                median=100.0,
+                mad=5.0,
+                sample_count=30,
+                training_start=datetime(2026, 1, 1),
+                training_end=datetime(2026, 1, 2),
+            )
+        ]
+    )
+    cfg = BaselineConfig(use_hour_of_day=False)
+    server = ScoringServer(BaselineSnapshot.load(store), cfg, **kwargs)
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve()), daemon=True)
+    thread.start()
+    assert server.ready.wait(5)
+    return server, thread, cfg, store
+
+
+def _event(entity: str, value: float) -> Event:
+    return Event(timestamp=datetime(2026, 1, 3, 14), entity_id=entity, metric="latency", value=value)
+
+
+def test_server_answers_each_line_in_order(tmp_path) -> None:
+    server, thread, cfg, store = _start(tmp_path, socket_path=str(tmp_path / "s.sock"), max_batch=2)
+    events = [_event("/login", 150.0), _event("/missing", 1.0), _event("/login", 101.0)]
+    payload = "\n".join([events[0].model_dump_json(), events[1].model_dump_json(), "not json", events[2].model_dump_json()])
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(server.socket_path)
+        sock.sendall(payload.encode("utf-8"))
+        sock.shutdown(socket.SHUT_WR)
+        data = b"".join(iter(lambda: sock.recv(65536), b""))
+
+    server.stop()
+    thread.join(5)
+
+    lines = data.decode("utf-8").splitlines()
+    baseline = store.get_latest("/login:latency")
+    assert lines[0] == score_event(events[0], baseline, cfg).model_dump_json()
+    assert json.loads(lines[1]) == {"skipped": True, "key": "/missing:latency"}
+    assert "error" in json.loads(lines[2])
+    assert lines[3] == score_event(events[2], baseline, cfg).model_dump_json()
+    assert (server.stats.events, server.stats.scored, server.stats.skipped, server.stats.errors) == (4, 2, 1, 1)
+
+
+def test_server_flushes_partial_batch_after_deadline(tmp_path) -> None:
+    server, thread, _, _ = _start(tmp_path, port=0, max_batch=1000, max_delay_ms=5)
+
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+        sock.sendall((_event("/login", 150.0).model_dump_json() + "\n").encode("utf-8"))
+        # The connection stays open: the answer must come from the deadline, not EOF.
+        reply = sock.makefile("r", encoding="utf-8").readline()
+
+    server.stop()
+    thread.join(5)
+
+    assert json.loads(reply)["is_anomaly"] is True
+    assert server.stats.batches == 1
+
+
+def test_server_answers_around_poisoned_lines(tmp_path) -> None:
+    server, thread, cfg, store = _start(tmp_path, socket_path=str(tmp_path / "s.sock"), max_batch=100)
+    first, last = _event("/login", 150.0), _event("/login", 101.0)
+    payload = "\n".join(
+        [
+            first.model_dump_json(),
+            '{"timestamp":"2026-01-03T14:00:00","entity_id":"/login","metric":"latency","value":1' + "0" * 400 + "}",
+            "[" * 100_000,
+            '{"timestamp":"9999-12-31T23:00:00-05:00","entity_id":"/login","metric":"latency","value":100}',
+            last.model_dump_json(),
+        ]
+    )
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(5)
+        sock.connect(server.socket_path)
+        sock.sendall(payload.encode("utf-8"))
+        sock.shutdown(socket.SHUT_WR)
+        data = b"".join(iter(lambda: sock.recv(65536), b""))
+
+    server.stop()
+    thread.join(5)
+
+    lines = data.decode("utf-8").splitlines()
+    baseline = store.get_latest("/login:latency")
+    assert len(lines) == 5
+    assert lines[0] == score_event(first, baseline, cfg).model_dump_json()
+    assert "error" in json.loads(lines[1])
+    assert "error" in json.loads(lines[2])
+    assert json.loads(lines[3])["event"]["timestamp"] == "9999-12-31T23:00:00-05:00"
+    assert lines[4] == score_event(last, baseline, cfg).model_dump_json()
+    assert (server.stats.batches, server.stats.scored, server.stats.errors) == (1, 3, 2)
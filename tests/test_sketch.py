@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import random
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from statistics import median
+
+from baseline_engine.baseline import compute_median_and_mad, train_baselines
+from baseline_engine.batch import EventBatch
+from baseline_engine.config import BaselineConfig
+from baseline_engine.sketch import (
+    KLLSketch,
+    k_for_rank_error,
+    merge_sketches,
+    train_baselines_sketch,
+    train_sketches,
+    weighted_median,
+)
+
+
+def _rank(sorted_values, x: float) -> float:
+    return bisect_left(sorted_values, x) / len(sorted_values)
+
+
+def test_weighted_median_matches_statistics_median() -> None:
+    assert weighted_median([(v, 1) for v in [5, 1, 3]]) == median([5, 1, 3])
+    assert weighted_median([(v, 1) for v in [4, 1, 3, 2]]) == median([4, 1, 3, 2])
+    assert weighted_median([(1.0, 3), (10.0, 1)]) == 1.0
+
+
+def test_kll_sketch_median_and_mad_within_error_bound() -> None:
+    rng = random.Random(5)
+    values = [rng.lognormvariate(3, 0.5) for _ in range(50_000)]
+    eps = 0.01
+
+    sketch = KLLSketch(k_for_rank_error(eps))
+    sketch.extend(values)
+    assert sketch.retained() < 3 * sketch.k
+
+    exact_med, exact_mad = compute_median_and_mad(values, min_mad=0.0)
+    ordered = sorted(values)
+    assert abs(_rank(ordered, sketch.median()) - 0.5) <= eps
+
+    abs_devs = sorted(abs(v - exact_med) for v in values)
+    assert abs(_rank(abs_devs, sketch.mad(sketch.median())) - 0.5) <= 2 * eps
+    assert abs(sketch.mad(sketch.median()) - exact_mad) / exact_mad < 0.05
+
+
+def test_sketch_training_is_exact_for_small_keys() -> None:
+    cfg = BaselineConfig(use_hour_of_day=True, min_samples=3)
+    base = datetime(2026, 1, 1, 14, 0, 0)
+    batch = EventBatch()
+    for i in range(60):
+        batch.append(base + timedelta(minutes=i), f"/e{i % 2}", "m", float(i % 7))
+
+    def fields(baselines):
+        return {b.key.as_str(): b.model_dump(exclude={"created_at"}) for b in baselines}
+
+    assert fields(train_baselines_sketch(batch, cfg)) == fields(train_baselines(batch, cfg))
+
+
+def test_sketches_from_shards_merge() -> None:
+    cfg = BaselineConfig(use_hour_of_day=False, min_samples=1)
+    rng = random.Random(9)
+    base = datetime(2026, 1, 1)
+
+    shards = []
+    for s in range(3):
+        batch = EventBatch()
+        for i in range(20_000):
+            batch.append(base + timedelta(seconds=s * 20_000 + i), "/login", "latency", rng.gauss(100, 10))
+        shards.append(batch)
+
+    merged = train_sketches(shards[0], cfg)
+    for shard in shards[1:]:
+        merge_sketches(merged, train_sketches(shard, cfg))
+
+    [state] = merged.values()
+    assert state.count == 60_000
+    assert state.start_us == shards[0].timestamps[0]
+    assert state.end_us == shards[-1].timestamps[-1]
+
+    ordered = sorted(v for b in shards for v in b.values)
+    assert abs(_rank(ordered, state.sketch.median()) - 0.5) <= 0.01
+
+
+def test_kll_sketch_serialization_roundtrip() -> None:
+    sketch = KLLSketch(16)
+    sketch.extend(float(i) for i in range(1000))
+
+    loaded = KLLSketch.from_bytes(sketch.to_bytes())
+    assert loaded.k == sketch.k
+    assert loaded.n == sketch.n
+    assert loaded.compactors == sketch.compactors
+    assert loaded.median() == sketch.median()
+
+    loaded.update(5.0)
+    assert loaded.n == 1001
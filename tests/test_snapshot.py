@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from baseline_engine.batch import EventBatch
+from baseline_engine.config import BaselineConfig
+from baseline_engine.models import BaselineKey, BaselineStats
+from baseline_engine.scoring import iter_batch_scores
+from baseline_engine.snapshot import BaselineSnapshot
+from baseline_engine.storage_sqlite import BaselineStore
+
+
+def _baseline(entity: str, median: float, created_day: int) -> BaselineStats:
+    base = datetime(2026, 1, 1)
+    return BaselineStats(
+        key=BaselineKey(entity_id=entity, metric="m", hour_of_day=None),
+        median=median,
+        mad=1.0,
+        sample_count=30,
+        training_start=base,
+        training_end=base + timedelta(hours=1),
+        created_at=base + timedelta(days=created_day),
+        version=1,
+    )
+
+
+def _store(tmp_path) -> BaselineStore:
+    store = BaselineStore(str(tmp_path / "baselines.db"))
+    store.init_db()
+    store.insert_many([_baseline("/a", 1.0, 1), _baseline("/a", 2.0, 2), _baseline("/b", 5.0, 1)])
+    return store
+
+
+def test_full_snapshot_matches_get_latest(tmp_path) -> None:
+    store = _store(tmp_path)
+    snapshot = BaselineSnapshot.load(store)
+
+    assert snapshot.key_count == 2
+    assert snapshot.nbytes() > 0
+    for key_str in ("/a:m", "/b:m"):
+        assert snapshot.get_latest(key_str) == store.get_latest(key_str)
+    assert snapshot.get_latest("/c:m") is None
+
+
+def test_lazy_snapshot_loads_only_needed_keys(tmp_path) -> None:
+    store = _store(tmp_path)
+    snapshot = BaselineSnapshot.load(store, key_strs=["/a:m", "/missing:m"])
+
+    assert snapshot.key_count == 1
+    assert snapshot.get_latest("/a:m").median == 2.0
+    # Known-missing keys are not queried again.
+    assert snapshot.prefetch(["/a:m", "/missing:m"]) == 0
+    assert snapshot.get_latest("/b:m").median == 5.0
+    assert snapshot.key_count == 2
+
+
+def test_batch_scoring_with_snapshot_matches_store(tmp_path) -> None:
+    store = _store(tmp_path)
+    cfg = BaselineConfig(use_hour_of_day=False)
+    batch = EventBatch()
+    for i, entity in enumerate(["/a", "/b", "/c", "/a"]):
+        batch.append(datetime(2026, 2, 1, i), entity, "m", float(i))
+
+    expected = list(iter_batch_scores(batch, store, cfg))
+    got = list(iter_batch_scores(batch, BaselineSnapshot.load(store, key_strs=()), cfg))
+    assert [(r.key_str, r.baseline, r.is_anomaly) for r in got] == [
+        (r.key_str, r.baseline, r.is_anomaly) for r in expected
+    ]
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from baseline_engine.cli import main
+from baseline_engine.models import BaselineKey, BaselineStats
+from baseline_engine.snapshot_file import MappedSnapshot, write_snapshot_file
+from baseline_engine.storage_sqlite import BaselineStore
+
+
+def _baselines(n: int):
+    base = datetime(2026, 1, 1)
+    for i in range(n):
+        yield BaselineStats(
+            key=BaselineKey(entity_id=f"/é{i}", metric="latency", hour_of_day=None if i % 3 == 0 else i % 24),
+            median=float(i),
+            mad=0.5 + i,
+            sample_count=30 + i,
+            training_start=base,
+            training_end=(base + timedelta(hours=i)).replace(tzinfo=timezone(timedelta(hours=-5))),
+            created_at=datetime(2026, 1, 2, tzinfo=timezone.utc),
+            version=i % 4 + 1,
+        )
+
+
+def test_snapshot_file_roundtrip(tmp_path) -> None:
+    path = str(tmp_path / "baselines.snap")
+    expected = {b.key.as_str(): b for b in _baselines(1000)}
+    assert write_snapshot_file(path, expected.values()) == 1000
+
+    with MappedSnapshot(path) as snap:
+        assert len(snap) == 1000
+        for key_str, b in expected.items():
+            assert snap.get_latest(key_str) == b
+        assert snap.get_latest("/missing:latency") is None
+        assert sorted(b.key.as_str() for b in snap) == sorted(expected)
+
+        some = list(expected)[:3] + ["/missing:latency"]
+        assert set(snap.get_latest_many(some)) == set(some[:3])
+
+
+def test_snapshot_file_rejects_other_files(tmp_path) -> None:
+    path = tmp_path / "not-a-snapshot"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError, match="Not a baseline snapshot"):
+        MappedSnapshot(str(path))
+
+
+def test_cli_export_snapshot_and_score(tmp_path, capsys) -> None:
+    db_path = str(tmp_path / "baselines.db")
+    store = BaselineStore(db_path)
+    store.init_db()
+    store.insert_many(_baselines(3))
+
+    snap_path = str(tmp_path / "baselines.snap")
+    assert main(["export-snapshot", "--db", db_path, "--output", snap_path]) == 0
+
+    events = tmp_path / "score.csv"
+    events.write_text("timestamp,entity_id,metric,value\n2026-01-03T00:00:00,/é0,latency,0.1\n", encoding="utf-8")
+    capsys.readouterr()
+
+    args = ["score", "--input", str(events), "--no-hour-of-day"]
+    assert main(args + ["--db", db_path]) == 0
+    from_db = capsys.readouterr().out
+    assert main(args + ["--snapshot-file", snap_path, "--db", str(tmp_path / "unused.db")]) == 0
+    assert capsys.readouterr().out == from_db
+    assert not (tmp_path / "unused.db").exists()
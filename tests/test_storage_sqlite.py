@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import gzip
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
 
 from baseline_engine.models import BaselineKey, BaselineStats
-from baseline_engine.storage_sqlite import BaselineStore
+from baseline_engine.sketch import KLLSketch
+from baseline_engine.storage_sqlite import SCHEMA_VERSION, BaselineStore, SQLiteConfig
 
 
 def test_sqlite_store_roundtrip(tmp_path) -> None:
@@ -76,3 +82,300 @@ def test_sqlite_store_latest(tmp_path) -> None:
     assert latest.median == 110.0
     assert latest.mad == 6.0
     assert latest.sample_count == 60
+
+
+def test_sqlite_store_reuses_connection_in_wal_mode(tmp_path) -> None:
+    db_path = str(tmp_path / "test_baselines.db")
+    store = BaselineStore(db_path)
+    store.init_db()
+
+    conn = store.connect()
+    assert store.connect() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+    store.close()
+    assert store.connect() is not conn
+    store.close()
+
+
+def test_sqlite_store_reader_sees_writes_from_other_store(tmp_path) -> None:
+    db_path = str(tmp_path / "test_baselines.db")
+    base = datetime(2026, 1, 1, 14, 0, 0)
+    key = BaselineKey(entity_id="/login", metric="latency_p95_ms", hour_of_day=14)
+
+    with BaselineStore(db_path) as writer, BaselineStore(db_path) as reader:
+        writer.init_db()
+        assert reader.get_latest(key.as_str()) is None
+
+        # An open read transaction must not block the writer under WAL.
+        reader.connect().execute("BEGIN")
+        reader.connect().execute("SELECT COUNT(*) FROM baselines").fetchone()
+        writer.insert_many(
+            [
+                BaselineStats(
+                    key=key,
+                    median=100.0,
+                    mad=5.0,
+                    sample_count=50,
+                    training_start=base,
+                    training_end=base + timedelta(hours=1),
+                    created_at=base + timedelta(days=1),
+                    version=1,
+                )
+            ]
+        )
+        reader.connect().execute("COMMIT")
+
+        latest = reader.get_latest(key.as_str())
+        assert latest is not None
+        assert latest.median == 100.0
+
+
+def test_sqlite_store_init_db_does_not_wait_for_a_writer(tmp_path) -> None:
+    db_path = str(tmp_path / "test_baselines.db")
+    key = BaselineKey(entity_id="/login", metric="latency_p95_ms", hour_of_day=14)
+
+    with BaselineStore(db_path) as writer, BaselineStore(
+        db_path, config=SQLiteConfig(path=db_path, busy_timeout_ms=50)
+    ) as reader:
+        writer.init_db()
+        # A train holding the write lock must not make score/serve/report fail on startup.
+        writer.connect().execute("BEGIN IMMEDIATE")
+        writer.connect().execute("INSERT INTO keys (key_str, entity_id, metric) VALUES ('x', 'x', 'x')")
+
+        reader.init_db()
+        assert reader.get_latest(key.as_str()) is None
+        writer.connect().execute("ROLLBACK")
+
+
+def test_sqlite_store_get_latest_many(tmp_path) -> None:
+    store = BaselineStore(str(tmp_path / "test_baselines.db"))
+    store.init_db()
+
+    base = datetime(2026, 1, 1, 14, 0, 0)
+    baselines = []
+    for i in range(700):
+        key = BaselineKey(entity_id=f"/e{i}", metric="m", hour_of_day=None)
+        for day in (1, 2):
+            baselines.append(
+                BaselineStats(
+                    key=key,
+                    median=float(i * 10 + day),
+                    mad=1.0,
+                    sample_count=30,
+                    training_start=base,
+                    training_end=base + timedelta(hours=1),
+                    created_at=base + timedelta(days=day),
+                    version=day,
+                )
+            )
+    store.insert_many(baselines)
+
+    # Small sets use IN (...); large ones go through the temp-table join.
+    for keys in (["/e1:m", "/e2:m", "/nope:m"], [f"/e{i}:m" for i in range(700)] + ["/nope:m"]):
+        latest = store.get_latest_many(keys)
+        assert "/nope:m" not in latest
+        assert len(latest) == len(keys) - 1
+        for key_str, b in latest.items():
+            assert b == store.get_latest(key_str)
+            assert b.version == 2
+
+
+def _stats(key: BaselineKey, median: float, created_at: datetime) -> BaselineStats:
+    return BaselineStats(
+        key=key,
+        median=median,
+        mad=1.0,
+        sample_count=30,
+        training_start=created_at - timedelta(days=1),
+        training_end=created_at,
+        created_at=created_at,
+        version=1,
+    )
+
+
+def test_sqlite_store_latest_pointer_ignores_older_inserts(tmp_path) -> None:
+    store = BaselineStore(str(tmp_path / "test_baselines.db"))
+    store.init_db()
+    key = BaselineKey(entity_id="/login", metric="latency_p95_ms", hour_of_day=14)
+    base = datetime(2026, 1, 1)
+
+    store.insert_many([_stats(key, 2.0, base + timedelta(days=2))])
+    # A backfilled, older version must not become "latest".
+    store.insert_baseline(_stats(key, 1.0, base + timedelta(days=1)))
+
+    assert store.get_latest(key.as_str()).median == 2.0
+    assert store.get_latest_many([key.as_str()])[key.as_str()].median == 2.0
+
+
+def test_sqlite_store_migrates_v1_schema(tmp_path) -> None:
+    db_path = str(tmp_path / "test_baselines.db")
+
+    # Original layout: ISO text timestamps and key strings on every row, no user_version.
+    conn = sqlite3.connect(db_path)
+    conn.executescript(
+        """
+        CREATE TABLE baselines (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key_str TEXT NOT NULL, entity_id TEXT NOT NULL, metric TEXT NOT NULL, hour_of_day INTEGER,
+            median REAL NOT NULL, mad REAL NOT NULL, sample_count INTEGER NOT NULL,
+            training_start TEXT NOT NULL, training_end TEXT NOT NULL,
+            created_at TEXT NOT NULL, version INTEGER NOT NULL,
+            UNIQUE(key_str, version, created_at)
+        );
+        CREATE INDEX idx_baselines_key_str ON baselines(key_str);
+        CREATE TABLE training_state (
+            key_str TEXT PRIMARY KEY, entity_id TEXT NOT NULL, metric TEXT NOT NULL, hour_of_day INTEGER,
+            sample_count INTEGER NOT NULL, training_start TEXT NOT NULL, training_end TEXT NOT NULL,
+            sketch BLOB NOT NULL, updated_at TEXT NOT NULL
+        );
+        """
+    )
+    rows = [
+        ("/login:latency_p95_ms:hour=14", "/login", "latency_p95_ms", 14, median, 5.0, 50,
+         "2026-01-01T14:00:00", "2026-01-01T15:00:00+02:00", created, 1)
+        for median, created in ((100.0, "2026-01-02T00:00:00+00:00"), (110.0, "2026-01-03T00:00:00+00:00"))
+    ]
+    conn.executemany(
+        "INSERT INTO baselines (key_str, entity_id, metric, hour_of_day, median, mad, sample_count, "
+        "training_start, training_end, created_at, version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    sketch = KLLSketch(None)
+    sketch.extend([1.0, 2.0])
+    conn.execute(
+        "INSERT INTO training_state VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ("/login:latency_p95_ms", "/login", "latency_p95_ms", None, 2,
+         "2026-01-01T00:00:00", "2026-01-01T01:00:00", sketch.to_bytes(), "2026-01-02T00:00:00+00:00"),
+    )
+    conn.commit()
+    conn.close()
+
+    store = BaselineStore(db_path)
+    store.init_db()
+    assert store.schema_version() == SCHEMA_VERSION
+
+    latest = store.get_latest("/login:latency_p95_ms:hour=14")
+    assert latest.median == 110.0
+    assert latest.training_start == datetime(2026, 1, 1, 14)
+    assert latest.training_end == datetime(2026, 1, 1, 15, tzinfo=timezone(timedelta(hours=2)))
+    assert latest.created_at == datetime(2026, 1, 3, tzinfo=timezone.utc)
+    assert [b.median for b in store.list_baselines()] == [100.0, 110.0]
+
+    state = store.load_training_state()["/login:latency_p95_ms"]
+    assert state.count == 2
+    assert state.sketch.median() == 1.5
+
+    # Re-running init_db on a current DB is a no-op.
+    store.init_db()
+    assert len(store.list_baselines()) == 2
+
+
+def test_sqlite_store_generations_pin_and_rollback(tmp_path) -> None:
+    store = BaselineStore(str(tmp_path / "test_baselines.db"))
+    store.init_db()
+    a = BaselineKey(entity_id="/a", metric="m")
+    b = BaselineKey(entity_id="/b", metric="m")
+    base = datetime(2026, 1, 1)
+
+    g1 = store.insert_many([_stats(a, 1.0, base), _stats(b, 10.0, base)], label="train").generation
+    g2 = store.insert_many([_stats(a, 2.0, base + timedelta(days=1))], label="update").generation
+    assert (g1, g2) == (1, 2)
+    assert store.current_generation() == g2
+
+    # Pinned lookups see the store as it was right after that generation was published.
+    assert store.get_latest("/a:m", generation=g1).median == 1.0
+    assert store.get_latest("/a:m").median == 2.0
+    pinned = store.get_latest_many(["/a:m", "/b:m"], generation=g1)
+    assert {k: v.median for k, v in pinned.items()} == {"/a:m": 1.0, "/b:m": 10.0}
+
+    assert store.rollback(g1) == [g2]
+    assert store.current_generation() == g1
+    assert store.get_latest("/a:m").median == 1.0
+    assert [g.status for g in store.list_generations()] == ["published", "rolled_back"]
+
+    # Later generations build on the rollback target; rolled-back rows stay invisible.
+    g3 = store.insert_many([_stats(b, 20.0, base + timedelta(days=2))]).generation
+    assert store.latest_baselines(generation=g3)["/a:m"].median == 1.0
+    assert store.latest_baselines()["/b:m"].median == 20.0
+
+
+def test_sqlite_store_compact_keeps_latest_and_archives(tmp_path) -> None:
+    store = BaselineStore(str(tmp_path / "test_baselines.db"))
+    store.init_db()
+    a = BaselineKey(entity_id="/a", metric="m")
+    b = BaselineKey(entity_id="/b", metric="m")
+    base = datetime(2026, 1, 1)
+    for day in range(5):
+        store.insert_many([_stats(a, float(day), base + timedelta(days=day))])
+    store.insert_many([_stats(b, 9.0, base)])
+
+    archive = tmp_path / "pruned.jsonl.gz"
+    result = store.compact(keep_last=2, archive_path=str(archive))
+    assert (result.pruned, result.keys) == (3, 1)
+    assert result.reclaimed == result.bytes_before - result.bytes_after
+
+    assert [x.median for x in store.list_baselines("/a:m")] == [3.0, 4.0]
+    assert store.get_latest("/b:m").median == 9.0
+    with gzip.open(archive, "rt", encoding="utf-8") as f:
+        assert [json.loads(line)["median"] for line in f] == [0.0, 1.0, 2.0]
+
+    # Age-only retention never drops a key's latest baseline.
+    result = store.compact(older_than=base + timedelta(days=10), vacuum=False)
+    assert result.pruned == 1
+    assert store.get_latest("/a:m").median == 4.0
+    assert store.get_latest("/b:m").median == 9.0
+
+
+def test_sqlite_store_compact_fences_off_pruned_generations(tmp_path) -> None:
+    store = BaselineStore(str(tmp_path / "test_baselines.db"))
+    store.init_db()
+    a = BaselineKey(entity_id="/a", metric="m")
+    base = datetime(2026, 1, 1)
+    g1 = store.insert_many([_stats(a, 1.0, base)]).generation
+    g2 = store.insert_many([_stats(a, 2.0, base + timedelta(days=1))]).generation
+    g3 = store.insert_many([_stats(a, 3.0, base + timedelta(days=2))]).generation
+    store.rollback(g2)
+
+    # The rolled-back row doesn't count toward keep_last: g1's row is the one pruned.
+    result = store.compact(keep_last=1)
+    assert (result.pruned, result.horizon) == (2, g2)
+    assert result.reclaimed >= 0
+    assert [x.median for x in store.list_baselines("/a:m")] == [2.0]
+
+    # g1's as-of view is gone: pinning or restoring it fails instead of losing the key.
+    with pytest.raises(ValueError, match="compacted"):
+        store.rollback(g1)
+    with pytest.raises(ValueError, match="compacted"):
+        store.get_latest("/a:m", generation=g1)
+    assert store.get_latest("/a:m", generation=g2).median == 2.0
+    assert [g.compacted for g in store.list_generations()] == [True, False, False]
+    assert g3 not in {g.id for g in store.list_generations() if g.status == "published"}
+
+
+def test_sqlite_store_skips_unchanged_baselines(tmp_path) -> None:
+    store = BaselineStore(str(tmp_path / "test_baselines.db"))
+    store.init_db()
+    a = BaselineKey(entity_id="/a", metric="m")
+    b = BaselineKey(entity_id="/b", metric="m")
+    base = datetime(2026, 1, 1)
+
+    first = store.insert_many([_stats(a, 1.0, base), _stats(b, 2.0, base)])
+    assert (first.written, first.unchanged) == (2, 0)
+
+    # Retraining yields the same stats for /a (new created_at) and new stats for /b.
+    second = store.insert_many([_stats(a, 1.0, base + timedelta(days=1)), _stats(b, 3.0, base + timedelta(days=1))])
+    assert (second.written, second.unchanged) == (1, 1)
+    assert len(store.list_baselines("/a:m")) == 1
+    assert store.get_latest("/b:m").median == 3.0
+
+    with store.connect() as conn:
+        row = conn.execute(
+            "SELECT validated_generation FROM baselines b JOIN keys k ON k.id = b.key_id WHERE k.key_str = '/a:m'"
+        ).fetchone()
+    assert row["validated_generation"] == second.generation
+    assert [(g.baseline_count, g.unchanged_count) for g in store.list_generations()] == [(2, 0), (1, 1)]
+
+    forced = store.insert_many([_stats(a, 1.0, base + timedelta(days=2))], dedup=False)
+    assert (forced.written, forced.unchanged) == (1, 0)